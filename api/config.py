@@ -5,11 +5,15 @@ Provides Pydantic-based settings management with environment variable validation
 All sensitive configuration is loaded from environment variables or .env file.
 """
 
+from dataclasses import dataclass, fields
 from functools import lru_cache
-from typing import List, Optional, Self
+from typing import Annotated, Any, List, Optional
 
-from pydantic import Field, field_validator, model_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import AliasChoices, Field, field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+# Required scheme for Supabase project URLs
+_HTTPS_PREFIX = "https://"
 
 
 class Settings(BaseSettings):
@@ -23,6 +27,8 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
+        frozen=True,
+        populate_by_name=True,
     )
 
     # Application settings
@@ -35,16 +41,26 @@ class Settings(BaseSettings):
     # Server settings
     host: str = Field(default="0.0.0.0", description="Server bind host")
     port: int = Field(default=5000, description="Server port")
+    workers: Optional[int] = Field(
+        default=None,
+        description="Uvicorn worker processes when not in debug mode "
+        "(defaults to 1). Caches, risk jobs and memory:// rate limits are "
+        "per worker",
+    )
 
     # Supabase settings - support both direct URL or project ref construction
     supabase_url: Optional[str] = Field(
         default=None, description="Supabase project URL"
     )
     supabase_key: Optional[str] = Field(
-        default=None, description="Supabase API key (service role or anon)"
+        default=None, description="Supabase API key (service role or anon)", repr=False
     )
+    # Only an input alias: copied into supabase_key and cleared during validation
     supabase_service_key: Optional[str] = Field(
-        default=None, description="Supabase service role key (alias for supabase_key)"
+        default=None,
+        description="Supabase service role key (alias for supabase_key)",
+        repr=False,
+        exclude=True,
     )
     supabase_project_ref: Optional[str] = Field(
         default=None, description="Supabase project reference (for URL construction)"
@@ -54,19 +70,23 @@ class Settings(BaseSettings):
     )
 
     # CORS settings
-    cors_origins: List[str] = Field(
+    # NoDecode lets the validators below parse comma-separated env values
+    cors_origins: Annotated[List[str], NoDecode] = Field(
         default=["http://localhost:3000", "http://localhost:5173"],
         description="Allowed CORS origins",
     )
     cors_allow_credentials: bool = Field(
         default=True, description="Allow credentials in CORS"
     )
-    cors_allow_methods: List[str] = Field(
+    cors_allow_methods: Annotated[List[str], NoDecode] = Field(
         default=["GET", "POST", "PUT", "DELETE"], description="Allowed HTTP methods"
     )
     cors_allow_headers: List[str] = Field(
         default=["*"], description="Allowed HTTP headers"
     )
+    cors_max_age: int = Field(
+        default=3600, description="Seconds browsers may cache CORS preflight results"
+    )
 
     # Security settings
     api_rate_limit: int = Field(default=100, description="API rate limit per minute")
@@ -78,11 +98,144 @@ class Settings(BaseSettings):
         description="Trust X-Forwarded-For header for client IP extraction. "
         "Only enable if behind a trusted reverse proxy (nginx, cloudflare, etc.)",
     )
+    burst_limit_rate: float = Field(
+        default=0.0,
+        ge=0,
+        description="Sustained requests per second per client allowed by the "
+        "burst limiter in front of the app (0 disables it)",
+    )
+    burst_limit_capacity: int = Field(
+        default=20,
+        ge=1,
+        description="Requests a client may burst before the burst limiter applies",
+    )
+    rate_limit_storage_uri: str = Field(
+        default="memory://",
+        validation_alias=AliasChoices("rate_limit_storage_uri", "redis_url"),
+        description="Rate limit counter storage. memory:// is per process; use "
+        "redis://host:6379 to share limits across workers and replicas. "
+        "Falls back to REDIS_URL when RATE_LIMIT_STORAGE_URI is not set",
+    )
+    rate_limit_redis_max_connections: int = Field(
+        default=50,
+        ge=1,
+        description="Connection pool size for Redis rate limit storage",
+    )
+    rate_limit_calculate_cost: int = Field(
+        default=10,
+        ge=1,
+        description="Rate limit units spent per risk calculation; cheap cached "
+        "GET endpoints spend 1, so clients can burst reads but not calculations",
+    )
+    rate_limit_strategy: str = Field(
+        default="moving-window",
+        description="Rate limit algorithm: moving-window, sliding-window-counter "
+        "or fixed-window",
+    )
+    internal_metrics_key: Optional[str] = Field(
+        default=None,
+        description="Key monitoring tools must send in the X-Internal-Key header "
+        "to reach internal endpoints such as /api/health/detailed (unset leaves "
+        "them open)",
+    )
+
+    # Logging settings
+    log_format: str = Field(
+        default="text",
+        description="Log output format: text, or json for one JSON object per line",
+    )
+    log_dir: str = Field(
+        default="logs", description="Directory for the rotating api.log file"
+    )
+
+    # Compression settings (applied once per cached response, not per request)
+    gzip_minimum_size: int = Field(
+        default=1000,
+        description="Minimum cached response size in bytes to store gzipped",
+    )
+    gzip_compress_level: int = Field(
+        default=6,
+        description="gzip level (1-9) for cached responses. Bodies are compressed "
+        "once when cached, so this does not cost CPU per request",
+    )
 
     # Database settings
     verify_indexes_on_startup: bool = Field(
         default=False,
-        description="Verify database indexes exist during startup (requires SUPABASE_DB_URL or DB_PASSWORD)",
+        description="Verify database indexes exist during startup "
+        "(requires the check_required_indexes RPC from migration 002)",
+    )
+    pg_pool_min_size: int = Field(
+        default=2, description="Min asyncpg connections (used when SUPABASE_DB_URL set)"
+    )
+    pg_pool_max_size: int = Field(
+        default=10,
+        description="Max asyncpg connections (used when SUPABASE_DB_URL set)",
+    )
+    pg_acquire_timeout: float = Field(
+        default=2.0, description="Seconds to wait for a pooled PostgreSQL connection"
+    )
+    db_max_connections: int = Field(
+        default=200, description="Max open HTTP connections to Supabase/PostgREST"
+    )
+    db_max_keepalive_connections: int = Field(
+        default=100, description="Max idle keep-alive connections kept in the pool"
+    )
+    db_keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle pooled connection is kept alive"
+    )
+    db_http2: bool = Field(
+        default=True,
+        description="Use HTTP/2 to multiplex PostgREST requests (requires httpx[http2])",
+    )
+    db_timeout: float = Field(
+        default=10.0, description="Timeout in seconds for Supabase HTTP requests"
+    )
+    db_connect_timeout: float = Field(
+        default=5.0, description="Timeout in seconds for establishing a connection"
+    )
+    db_connect_retries: int = Field(
+        default=1,
+        ge=0,
+        description="Retries for failed connection attempts (never for sent requests)",
+    )
+
+    # Health checks
+    health_check_cache_ttl: float = Field(
+        default=5.0,
+        ge=0,
+        description="Seconds a database connectivity check result is reused by "
+        "/health, /health/detailed and /ready (0 checks on every request)",
+    )
+    health_check_timeout: float = Field(
+        default=0.5,
+        gt=0,
+        description="Seconds a database connectivity check may take before it "
+        "counts as failed (keep below the orchestrator's probe timeout)",
+    )
+
+    # Risk calculation back-pressure
+    calculate_risk_max_concurrency: int = Field(
+        default=20,
+        ge=1,
+        description="Risk calculations allowed to run at once per process",
+    )
+    calculate_risk_queue_timeout: float = Field(
+        default=0.1,
+        ge=0,
+        description="Seconds a risk calculation waits for a free slot before "
+        "the request is rejected with 503",
+    )
+
+    calculate_risk_max_jobs: int = Field(
+        default=100,
+        ge=1,
+        description="Unfinished background risk calculation jobs allowed per process",
+    )
+    calculate_risk_job_ttl: int = Field(
+        default=600,
+        ge=1,
+        description="Seconds a background risk calculation job stays pollable",
     )
 
     # Cache settings (Agent 1 - Response Caching)
@@ -105,15 +258,33 @@ class Settings(BaseSettings):
     cache_max_size: int = Field(
         default=1000, description="Maximum number of cached responses"
     )
+    cache_stale_while_revalidate: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds CDNs and browsers may serve a stale cached response "
+        "while revalidating it (0 disables stale-while-revalidate)",
+    )
 
     @field_validator("cors_origins", mode="before")
     @classmethod
     def parse_cors_origins(cls, v):
-        """Parse CORS origins from string or list."""
+        """Parse CORS origins from string or list.
+
+        Origins are normalized to the form browsers send in the Origin header
+        (lowercase, no trailing slash) so matching is a plain set lookup.
+        """
         if isinstance(v, str):
             # Handle comma-separated string
-            return [origin.strip() for origin in v.split(",") if origin.strip()]
-        return v
+            v = v.split(",")
+        return [origin.strip().rstrip("/").lower() for origin in v if origin.strip()]
+
+    @field_validator("cors_allow_methods", mode="before")
+    @classmethod
+    def parse_cors_allow_methods(cls, v):
+        """Parse allowed CORS methods, upper-cased to match request methods."""
+        if isinstance(v, str):
+            v = v.split(",")
+        return [method.strip().upper() for method in v if method.strip()]
 
     @field_validator("port")
     @classmethod
@@ -123,41 +294,79 @@ class Settings(BaseSettings):
             raise ValueError("Port must be between 1 and 65535")
         return v
 
-    @field_validator("supabase_url")
+    @field_validator("gzip_compress_level")
     @classmethod
-    def validate_supabase_url_format(cls, v):
-        """Validate Supabase URL format if provided."""
-        if v is not None and not v.startswith("https://"):
-            raise ValueError("Supabase URL must start with https://")
+    def validate_gzip_compress_level(cls, v):
+        """Validate gzip compression level is in zlib's range."""
+        if not 1 <= v <= 9:
+            raise ValueError("gzip compress level must be between 1 and 9")
+        return v
+
+    @field_validator("log_format")
+    @classmethod
+    def validate_log_format(cls, v):
+        """Validate the log format is text or json."""
+        v = v.lower()
+        if v not in ("text", "json"):
+            raise ValueError("log format must be 'text' or 'json'")
         return v
 
-    @model_validator(mode="after")
-    def validate_supabase_config(self) -> Self:
-        """Validate and construct Supabase configuration after all fields are set.
+    @field_validator("rate_limit_strategy")
+    @classmethod
+    def validate_rate_limit_strategy(cls, v):
+        """Validate the rate limit strategy is one the limits library provides."""
+        allowed = {"moving-window", "sliding-window-counter", "fixed-window"}
+        if v not in allowed:
+            raise ValueError(
+                f"rate limit strategy must be one of: {', '.join(sorted(allowed))}"
+            )
+        return v
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_supabase_config(cls, data: Any) -> Any:
+        """Resolve Supabase configuration from the raw input before field validation.
 
         This validator:
         1. Constructs SUPABASE_URL from SUPABASE_PROJECT_REF if URL not provided
-        2. Uses SUPABASE_SERVICE_KEY as fallback for SUPABASE_KEY
+        2. Validates that a provided SUPABASE_URL uses https://
+        3. Uses SUPABASE_SERVICE_KEY as fallback for SUPABASE_KEY
+
+        Resolving on the raw dict lets the model be frozen and avoids a
+        second pass that rewrites fields after validation.
         """
+        if not isinstance(data, dict):
+            return data
+
+        data = dict(data)
+
         # Handle URL construction from project ref
-        if self.supabase_url is None:
-            if self.supabase_project_ref:
-                self.supabase_url = f"https://{self.supabase_project_ref}.supabase.co"
+        supabase_url = data.get("supabase_url")
+        if not supabase_url:
+            project_ref = data.get("supabase_project_ref")
+            if project_ref:
+                data["supabase_url"] = f"{_HTTPS_PREFIX}{project_ref}.supabase.co"
             else:
                 raise ValueError(
                     "Either SUPABASE_URL or SUPABASE_PROJECT_REF must be provided"
                 )
+        elif isinstance(supabase_url, str) and not supabase_url.startswith(
+            _HTTPS_PREFIX
+        ):
+            raise ValueError("Supabase URL must start with https://")
 
-        # Handle key alias - use SUPABASE_SERVICE_KEY if SUPABASE_KEY not set
-        if self.supabase_key is None:
-            if self.supabase_service_key:
-                self.supabase_key = self.supabase_service_key
+        # Handle key alias - use SUPABASE_SERVICE_KEY if SUPABASE_KEY not set.
+        # The alias is dropped afterwards so the secret is held only once.
+        service_key = data.pop("supabase_service_key", None)
+        if not data.get("supabase_key"):
+            if service_key:
+                data["supabase_key"] = service_key
             else:
                 raise ValueError(
                     "Either SUPABASE_KEY or SUPABASE_SERVICE_KEY must be provided"
                 )
 
-        return self
+        return data
 
 
 @lru_cache()
@@ -179,27 +388,52 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Convenience function for direct access
-def get_setting(name: str, default=None):
-    """Get a specific setting value by name.
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    """Read-only snapshot of the settings read on request hot paths.
+
+    Built once from the validated Settings so per-request reads are plain
+    slot lookups with no Pydantic machinery involved.
+    """
+
+    app_name: str
+    app_version: str
+    debug: bool
+    trust_proxy: bool
+    internal_metrics_key: Optional[str]
+    api_rate_limit: int
+    cache_enabled: bool
+    cache_stale_while_revalidate: int
+    health_check_cache_ttl: float
+    health_check_timeout: float
+    gzip_minimum_size: int
+    gzip_compress_level: int
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RuntimeSettings":
+        """Copy the hot-path fields from validated settings."""
+        return cls(
+            **{field.name: getattr(settings, field.name) for field in fields(cls)}
+        )
+
 
-    Args:
-        name: Setting attribute name
-        default: Default value if setting not found
+@lru_cache()
+def get_runtime_settings() -> RuntimeSettings:
+    """Get the cached runtime settings snapshot.
 
     Returns:
-        Setting value or default
+        RuntimeSettings: Frozen snapshot of hot-path settings
 
     Example:
-        >>> from api.config import get_setting
-        >>> port = get_setting("port", 5000)
+        >>> from api.config import get_runtime_settings
+        >>> get_runtime_settings().app_version
+        '1.0.0'
     """
-    settings = get_settings()
-    return getattr(settings, name, default)
+    return RuntimeSettings.from_settings(get_settings())
 
 
-if __name__ == "__main__":
-    # Test settings loading
+def _selftest() -> None:
+    """Print the resolved settings for manual verification."""
     settings = get_settings()
     print(f"App Name: {settings.app_name}")
     print(f"Version: {settings.app_version}")
@@ -211,3 +445,7 @@ if __name__ == "__main__":
         else "Not configured"
     )
     print(f"Supabase URL: {url_display}")
+
+
+if __name__ == "__main__":
+    _selftest()
@@ -9,15 +9,18 @@ to avoid creating new connections for each request (which would exhaust connecti
 under load).
 """
 
+import asyncio
+import hmac
 import logging
-import os
-from typing import AsyncGenerator, Optional
-from urllib.parse import urlparse
+from typing import Optional
 
-from fastapi import HTTPException, status
+import httpx
+from fastapi import Header, HTTPException, Request, status
+from postgrest.exceptions import APIError
 from supabase import AsyncClient, create_async_client
+from supabase.lib.client_options import AsyncClientOptions
 
-from api.config import get_settings
+from api.config import get_runtime_settings, get_settings
 from api.validation import sanitize_error_message
 
 logger = logging.getLogger(__name__)
@@ -41,17 +44,106 @@ REQUIRED_INDEXES = {
     ],
 }
 
+# Flattened '<table>.<index>' names passed to the check_required_indexes RPC
+REQUIRED_INDEX_NAMES = [
+    f"{table_name}.{index_name}"
+    for table_name, index_names in REQUIRED_INDEXES.items()
+    for index_name in index_names
+]
+
 # Global Supabase client instance (singleton pattern)
 # Initialized at startup, reused across requests
 _supabase_client: Optional[AsyncClient] = None
 
+# Shared httpx client backing every Supabase sub-client (postgrest, auth, storage)
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Serializes client creation so concurrent first requests cannot build two clients
+_supabase_client_lock = asyncio.Lock()
+
+# Optional asyncpg pool for direct PostgreSQL work (requires SUPABASE_DB_URL)
+_pg_pool = None
+
+# Memoized verdict of the last successful index check (process lifetime)
+_index_check_result: Optional[tuple[bool, list[str]]] = None
+_index_check_lock = asyncio.Lock()
+
+# PostgREST error code for an RPC function that does not exist
+_RPC_NOT_FOUND = "PGRST202"
+
+# Optional RPC functions found missing; callers use their fallback queries
+# for the rest of the process lifetime instead of retrying
+_missing_rpcs: set[str] = set()
+
+# pg_indexes lookup for the required (table, index) pairs in one round-trip
+_EXISTING_INDEXES_QUERY = """
+    SELECT tablename || '.' || indexname AS name
+    FROM pg_indexes
+    WHERE schemaname = 'public'
+      AND tablename = ANY($1::text[])
+      AND indexname = ANY($2::text[])
+"""
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _create_http_client(settings) -> httpx.AsyncClient:
+    """Create the pooled httpx client shared by all Supabase sub-clients.
+
+    httpx defaults (100 connections, 20 keep-alive) churn TCP/TLS connections
+    under concurrent load, so pool limits and timeouts come from settings.
+    HTTP/2 is enabled when configured and the h2 package is available.
+    Failed connection attempts are retried by the transport; requests that
+    were already sent are never retried. New connections are logged by
+    httpcore at DEBUG level ("httpcore.connection") to verify pool reuse.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        httpx.AsyncClient with explicit pool limits
+    """
+    http2 = settings.db_http2
+    if http2 and not _http2_available():
+        logger.warning(
+            "h2 not installed, falling back to HTTP/1.1. "
+            "Install with: pip install 'httpx[http2]'"
+        )
+        http2 = False
+
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.db_max_connections,
+            max_keepalive_connections=settings.db_max_keepalive_connections,
+            keepalive_expiry=settings.db_keepalive_expiry,
+        ),
+        retries=settings.db_connect_retries,
+    )
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.db_timeout, connect=settings.db_connect_timeout),
+    )
+
 
 async def init_supabase_client() -> AsyncClient:
     """Initialize the global Supabase client.
 
     Called once during application startup to create a shared client instance.
-    The Supabase async client uses httpx under the hood, which manages
-    connection pooling automatically.
+    The Supabase async client uses httpx under the hood; a single pooled
+    httpx client with explicit limits is injected so keep-alive connections
+    are reused across requests.
+
+    Creation is guarded by a lock with a double check, so concurrent callers
+    (e.g. a burst of requests after a failed startup init) share one client.
 
     Returns:
         AsyncClient: Initialized Supabase client
@@ -59,31 +151,39 @@ async def init_supabase_client() -> AsyncClient:
     Raises:
         RuntimeError: If initialization fails
     """
-    global _supabase_client
+    global _supabase_client, _http_client
 
     if _supabase_client is not None:
-        logger.warning(
-            "Supabase client already initialized, returning existing instance"
-        )
         return _supabase_client
 
-    settings = get_settings()
+    async with _supabase_client_lock:
+        # Another coroutine may have finished initialization while we waited
+        if _supabase_client is not None:
+            logger.debug("Supabase client initialized by a concurrent caller")
+            return _supabase_client
 
-    # Settings validation ensures these are never None after initialization
-    if not settings.supabase_url or not settings.supabase_key:
-        raise RuntimeError("Supabase URL and key must be configured")
+        settings = get_settings()
 
-    try:
-        logger.info("Initializing Supabase client...")
-        _supabase_client = await create_async_client(
-            settings.supabase_url,
-            settings.supabase_key,
-        )
-        logger.info("Supabase client initialized successfully")
-        return _supabase_client
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase client: {e}")
-        raise RuntimeError(f"Supabase client initialization failed: {e}")
+        # Settings validation ensures these are never None after initialization
+        if not settings.supabase_url or not settings.supabase_key:
+            raise RuntimeError("Supabase URL and key must be configured")
+
+        try:
+            logger.info("Initializing Supabase client...")
+            _http_client = _create_http_client(settings)
+            _supabase_client = await create_async_client(
+                settings.supabase_url,
+                settings.supabase_key,
+                options=AsyncClientOptions(httpx_client=_http_client),
+            )
+            logger.info("Supabase client initialized successfully")
+            return _supabase_client
+        except Exception as e:
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
+            logger.error(f"Failed to initialize Supabase client: {e}")
+            raise RuntimeError(f"Supabase client initialization failed: {e}")
 
 
 async def close_supabase_client() -> None:
@@ -91,41 +191,48 @@ async def close_supabase_client() -> None:
 
     Called during application shutdown to clean up resources.
     """
-    global _supabase_client
+    global _supabase_client, _http_client
 
     if _supabase_client is not None:
         logger.info("Closing Supabase client...")
         # The Supabase AsyncClient doesn't have a close method directly,
-        # but we can close the underlying postgrest client if needed
+        # but all sub-clients share our httpx client, so closing it
+        # releases the whole connection pool
         try:
-            if hasattr(_supabase_client, "postgrest") and hasattr(
-                _supabase_client.postgrest, "aclose"
-            ):
-                await _supabase_client.postgrest.aclose()
+            if _http_client is not None:
+                await _http_client.aclose()
         except Exception as e:
             logger.warning(f"Error closing Supabase client: {e}")
         finally:
             _supabase_client = None
+            _http_client = None
             logger.info("Supabase client closed")
 
 
 def get_supabase_client_sync() -> Optional[AsyncClient]:
     """Get the current Supabase client instance (non-async).
 
+    Route handlers should prefer get_db, which reads the client from
+    app.state; this accessor is for code without a request in scope.
+
     Returns:
         The global Supabase client or None if not initialized
     """
     return _supabase_client
 
 
-async def get_supabase_client() -> AsyncGenerator[AsyncClient, None]:
+async def get_supabase_client() -> AsyncClient:
     """Get Supabase async client for database operations.
 
     Uses the shared client instance initialized at startup.
     This avoids creating a new connection for each request,
     which would exhaust database connections under load.
 
-    Yields:
+    Declared as a plain coroutine rather than a generator dependency: the
+    shared client needs no per-request teardown, so FastAPI can skip the
+    exit-stack bookkeeping and resolve it with a single await.
+
+    Returns:
         AsyncClient: Shared Supabase client instance
 
     Raises:
@@ -137,130 +244,303 @@ async def get_supabase_client() -> AsyncGenerator[AsyncClient, None]:
             response = await client.table("diseases").select("*").execute()
             return response.data
     """
-    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
 
-    if _supabase_client is None:
-        # Client should be initialized at startup, but handle edge case
-        logger.warning(
-            "Supabase client not initialized, attempting late initialization"
+    # Client should be initialized at startup, but handle edge case.
+    # init_supabase_client is lock-guarded, so concurrent requests
+    # arriving here wait for a single initialization.
+    logger.warning("Supabase client not initialized, attempting late initialization")
+    try:
+        return await init_supabase_client()
+    except Exception as e:
+        safe_message = sanitize_error_message(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection not available: {safe_message}",
         )
-        try:
-            await init_supabase_client()
-        except Exception as e:
-            safe_message = sanitize_error_message(str(e))
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Database connection not available: {safe_message}",
-            )
 
-    # After init, client should be available
-    if _supabase_client is None:
+
+async def get_db(request: Request) -> AsyncClient:
+    """Get the shared Supabase client stored on app.state at startup.
+
+    The lifespan handler stores the client as app.state.supabase, so the
+    common path is a single attribute read. If startup initialization
+    failed, this falls back to lock-guarded late initialization and
+    caches the result on app.state.
+
+    Args:
+        request: The incoming HTTP request
+
+    Returns:
+        AsyncClient: Shared Supabase client instance
+
+    Raises:
+        HTTPException: If the client cannot be initialized (503)
+
+    Example:
+        @router.get("/diseases")
+        async def list_diseases(client: AsyncClient = Depends(get_db)):
+            response = await client.table("diseases").select("*").execute()
+            return response.data
+    """
+    client = getattr(request.app.state, "supabase", None)
+    if client is None:
+        client = await get_supabase_client()
+        request.app.state.supabase = client
+    return client
+
+
+async def require_internal_key(
+    x_internal_key: Optional[str] = Header(None, include_in_schema=False),
+) -> None:
+    """Restrict internal endpoints to callers holding INTERNAL_METRICS_KEY.
+
+    Rejected callers are turned away before the endpoint runs any checks or
+    spends rate limit. When no key is configured the endpoint stays open.
+
+    Args:
+        x_internal_key: Value of the X-Internal-Key request header
+
+    Raises:
+        HTTPException: If a key is configured and the header does not match (403)
+    """
+    expected = get_runtime_settings().internal_metrics_key
+    if expected is None:
+        return
+    if x_internal_key is None or not hmac.compare_digest(
+        x_internal_key.encode(), expected.encode()
+    ):
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection not available",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing X-Internal-Key header",
         )
 
-    yield _supabase_client
 
+async def call_optional_rpc(
+    client: AsyncClient, name: str, params: Optional[dict] = None, *, migration: str
+):
+    """Call an RPC function that may not be deployed yet.
 
-async def verify_database_indexes() -> tuple[bool, list[str]]:
-    """Verify that all required database indexes exist.
+    Optional RPCs replace multi-query fallbacks that work without them. The
+    first call that finds the function missing logs which migration creates
+    it and records the name, so later calls skip the round-trip.
 
-    Uses direct PostgreSQL connection to check pg_indexes.
-    Requires either SUPABASE_DB_URL or (SUPABASE_URL + DB_PASSWORD).
+    Args:
+        client: Supabase client
+        name: RPC function name
+        params: RPC arguments
+        migration: File under scripts/migrations/ that creates the function
 
     Returns:
-        Tuple of (all_indexes_exist, list_of_missing_indexes)
+        The PostgREST response, or None if the function is not deployed
 
-    Note:
-        This is a non-blocking check that logs warnings for missing indexes
-        but does not prevent the application from starting.
+    Raises:
+        APIError: For any error other than a missing function
     """
+    if name in _missing_rpcs:
+        return None
+
     try:
-        import psycopg2
-    except ImportError:
+        return await client.rpc(name, params or {}).execute()
+    except APIError as e:
+        if e.code != _RPC_NOT_FOUND:
+            raise
         logger.warning(
-            "psycopg2 not installed, skipping index verification. "
-            "Install with: pip install psycopg2-binary"
+            f"{name} RPC not found, using the fallback queries. "
+            f"Apply 'scripts/migrations/{migration}' to enable it."
         )
-        return True, []
+        _missing_rpcs.add(name)
+        return None
+
+
+async def load_icd_to_id(client: AsyncClient, page_size: int = 1000) -> dict[str, int]:
+    """Load the ICD code -> disease id mapping for in-memory lookups.
+
+    The diseases table is small and only changes on re-import, so the
+    mapping is loaded once at startup and stored as app.state.icd_to_id.
+    Pages are requested until an empty one is returned, so a PostgREST
+    max-rows cap below page_size cannot truncate the mapping.
+
+    Args:
+        client: Supabase client
+        page_size: Rows requested per round-trip
+
+    Returns:
+        Dictionary mapping icd_code -> id
+    """
+    icd_to_id: dict[str, int] = {}
+    offset = 0
+    while True:
+        response = await (
+            client.table("diseases")
+            .select("id, icd_code")
+            .order("id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        rows = response.data or []
+        if not rows:
+            return icd_to_id
+        icd_to_id.update((row["icd_code"], row["id"]) for row in rows)
+        offset += len(rows)
+
+
+async def _warm_pg_connection(conn) -> None:
+    """Run a trivial query so pooled connections are ready before first use."""
+    await conn.execute("SELECT 1")
+
+
+async def init_pg_pool():
+    """Initialize the optional asyncpg connection pool.
+
+    Only created when SUPABASE_DB_URL is configured and asyncpg is installed.
+    Connections are warmed on creation so the first query avoids cold-start
+    latency. Failures are logged and leave the pool disabled, since the API
+    serves all requests through the Supabase client.
+
+    Returns:
+        asyncpg.Pool or None if the pool is not available
+    """
+    global _pg_pool
+
+    if _pg_pool is not None:
+        return _pg_pool
 
-    # Get database connection info
-    db_url = os.getenv("SUPABASE_DB_URL", "")
-    db_password = os.getenv("DB_PASSWORD", "")
     settings = get_settings()
+    if not settings.supabase_db_url:
+        logger.debug("SUPABASE_DB_URL not set, direct PostgreSQL pool disabled")
+        return None
 
-    if not db_url and not db_password:
+    try:
+        import asyncpg
+    except ImportError:
         logger.warning(
-            "Index verification requires SUPABASE_DB_URL or DB_PASSWORD. "
-            "Skipping verification. Run 'python scripts/verify_indexes.py' manually."
+            "asyncpg not installed, direct PostgreSQL pool disabled. "
+            "Install with: pip install asyncpg"
         )
-        return True, []
+        return None
 
     try:
-        # Determine connection parameters
-        if db_url:
-            parsed = urlparse(db_url)
-            if parsed.scheme == "https" and "supabase.co" in (parsed.hostname or ""):
-                # Supabase API URL, need to construct DB URL
-                project_ref = (parsed.hostname or "").replace(".supabase.co", "")
-                db_host = f"db.{project_ref}.supabase.co"
-                conn_params = {
-                    "host": db_host,
-                    "port": 5432,
-                    "database": "postgres",
-                    "user": "postgres",
-                    "password": db_password,
-                }
-            else:
-                # Direct PostgreSQL URL
-                conn_params = {
-                    "host": parsed.hostname,
-                    "port": parsed.port or 5432,
-                    "database": parsed.path.lstrip("/") if parsed.path else "postgres",
-                    "user": parsed.username or "postgres",
-                    "password": parsed.password or db_password,
-                }
-        elif settings.supabase_url:
-            # Use Supabase URL + DB_PASSWORD
-            parsed = urlparse(settings.supabase_url)
-            project_ref = (parsed.hostname or "").replace(".supabase.co", "")
-            db_host = f"db.{project_ref}.supabase.co"
-            conn_params = {
-                "host": db_host,
-                "port": 5432,
-                "database": "postgres",
-                "user": "postgres",
-                "password": db_password,
-            }
-        else:
-            logger.warning(
-                "Could not determine database connection for index verification"
-            )
-            return True, []
+        _pg_pool = await asyncpg.create_pool(
+            dsn=settings.supabase_db_url,
+            min_size=settings.pg_pool_min_size,
+            max_size=settings.pg_pool_max_size,
+            init=_warm_pg_connection,
+            # Supabase's pooler runs in transaction mode, which does not
+            # support server-side prepared statement caching
+            statement_cache_size=0,
+        )
+        logger.info("PostgreSQL connection pool initialized")
+    except Exception as e:
+        logger.warning(f"Failed to initialize PostgreSQL connection pool: {e}")
+        _pg_pool = None
 
-        # Connect and verify indexes
-        conn = psycopg2.connect(**conn_params)
-        missing_indexes = []
+    return _pg_pool
 
+
+def get_pg_pool():
+    """Get the asyncpg pool without creating it.
+
+    Returns:
+        asyncpg.Pool, or None if SUPABASE_DB_URL is unset, asyncpg is not
+        installed or the pool failed to initialize
+    """
+    return _pg_pool
+
+
+async def close_pg_pool() -> None:
+    """Close the asyncpg connection pool if it was created."""
+    global _pg_pool
+
+    if _pg_pool is not None:
         try:
-            with conn.cursor() as cursor:
-                for table_name, required_indexes in REQUIRED_INDEXES.items():
-                    # Get existing indexes for this table
-                    cursor.execute(
-                        """
-                        SELECT indexname FROM pg_indexes WHERE tablename = %s;
-                        """,
-                        (table_name,),
-                    )
-                    existing = {row[0] for row in cursor.fetchall()}
-
-                    # Check which required indexes are missing
-                    for index_name in required_indexes:
-                        if index_name not in existing:
-                            missing_indexes.append(f"{table_name}.{index_name}")
+            await _pg_pool.close()
+        except Exception as e:
+            logger.warning(f"Error closing PostgreSQL connection pool: {e}")
         finally:
-            conn.close()
+            _pg_pool = None
+            logger.info("PostgreSQL connection pool closed")
+
+
+async def _find_missing_indexes_pg(pool) -> list[str]:
+    """Find missing required indexes over a pooled asyncpg connection."""
+    tables = list(REQUIRED_INDEXES)
+    indexes = [name for names in REQUIRED_INDEXES.values() for name in names]
+
+    async with pool.acquire(timeout=get_settings().pg_acquire_timeout) as conn:
+        rows = await conn.fetch(_EXISTING_INDEXES_QUERY, tables, indexes)
+
+    existing = {row["name"] for row in rows}
+    return [name for name in REQUIRED_INDEX_NAMES if name not in existing]
+
+
+async def _find_missing_indexes_rpc(client: AsyncClient) -> list[str]:
+    """Find missing required indexes via the check_required_indexes RPC."""
+    response = await client.rpc(
+        "check_required_indexes", {"required": REQUIRED_INDEX_NAMES}
+    ).execute()
+    return list(response.data or [])
+
+
+def get_index_check_result() -> Optional[tuple[bool, list[str]]]:
+    """Get the memoized index verification result without querying.
+
+    Returns:
+        Tuple of (all_indexes_exist, missing_indexes), or None if no check
+        has completed successfully yet
+    """
+    return _index_check_result
+
+
+async def verify_database_indexes(refresh: bool = False) -> tuple[bool, list[str]]:
+    """Verify that all required database indexes exist.
+
+    Queries pg_indexes over the asyncpg pool when one is configured,
+    otherwise calls the check_required_indexes RPC through the shared
+    Supabase client (requires migration 002_check_required_indexes.sql).
+    Neither path blocks the event loop.
+
+    Indexes are a deployment concern, so a successful result is memoized
+    for the process lifetime; later calls return it without touching the
+    database unless refresh is set. Skipped or failed checks are not cached.
+
+    Args:
+        refresh: Re-run the check even if a result is cached
+
+    Returns:
+        Tuple of (all_indexes_exist, list_of_missing_indexes)
+
+    Note:
+        This is a non-blocking check that logs warnings for missing indexes
+        but does not prevent the application from starting.
+    """
+    global _index_check_result
+
+    if _index_check_result is not None and not refresh:
+        return _index_check_result
+
+    async with _index_check_lock:
+        if _index_check_result is not None and not refresh:
+            return _index_check_result
+
+        try:
+            if _pg_pool is not None:
+                missing_indexes = await _find_missing_indexes_pg(_pg_pool)
+            elif _supabase_client is not None:
+                missing_indexes = await _find_missing_indexes_rpc(_supabase_client)
+            else:
+                logger.warning(
+                    "No database connection available, skipping index verification. "
+                    "Run 'python scripts/verify_indexes.py' manually."
+                )
+                return True, []
+        except Exception as e:
+            logger.warning(
+                f"Index verification failed: {e}. Continuing without verification. "
+                f"Apply 'scripts/migrations/002_check_required_indexes.sql' to enable it."
+            )
+            return True, []
 
         if missing_indexes:
             logger.warning(
@@ -268,13 +548,9 @@ async def verify_database_indexes() -> tuple[bool, list[str]]:
                 f"Run 'python scripts/migrations/001_add_composite_index.sql' or "
                 f"'python scripts/import_to_database.py' to create indexes."
             )
-            return False, missing_indexes
+            _index_check_result = (False, missing_indexes)
         else:
             logger.info("All required database indexes verified")
-            return True, []
+            _index_check_result = (True, [])
 
-    except Exception as e:
-        logger.warning(
-            f"Index verification failed: {e}. Continuing without verification."
-        )
-        return True, []
+        return _index_check_result
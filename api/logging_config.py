@@ -0,0 +1,239 @@
+"""
+Logging configuration for Disease-Relater API.
+
+Routes all log records through a queue so request handlers never block on
+console or file I/O. A QueueListener thread drains the queue and writes
+records to the actual handlers. The rotating file handler is attached at
+application startup.
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+import orjson
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Shared queue between the logging call sites and the listener thread
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_running = False
+_formatter: Optional[logging.Formatter] = None
+_file_handler: Optional[logging.Handler] = None
+
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formatter emitting one compact JSON object per record.
+
+    Fields passed with extra= (e.g. the request logging middleware's method,
+    path, status, duration_ms and client_ip) become top-level keys, so log
+    ingestion does not have to parse them back out of the message text.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serialize the record and its extra fields as JSON."""
+        entry = {
+            "t": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class ExcInfoQueueHandler(QueueHandler):
+    """QueueHandler that leaves exception formatting to the listener thread.
+
+    The stock prepare() formats the record on the calling thread, folds the
+    traceback into msg and clears exc_info, so JSONFormatter could never
+    emit it as its own "exc" field. This handler only merges the arguments
+    into the message (they may be mutated after the call returns) and keeps
+    exc_info and stack_info for the listener's formatters. Records never
+    leave the process, so the traceback objects need not be picklable.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copy the record with its message resolved and exc_info kept."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that batches writes instead of flushing per record.
+
+    The stock handler flushes after every record and re-checks the file size
+    with a seek, so each log line costs at least one write syscall. This
+    handler writes through a large buffer, tracks the file size itself, and
+    flushes when a record at flush_level or above arrives or flush_interval
+    seconds after the first unflushed record, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        maxBytes: int = 0,
+        backupCount: int = 0,
+        buffer_size: int = 65536,
+        flush_interval: float = 0.5,
+        flush_level: int = logging.ERROR,
+        **kwargs,
+    ):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._bytes_written = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, **kwargs)
+
+    def _open(self):
+        """Open the log file with a large write buffer and record its size."""
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+        self._bytes_written = os.path.getsize(self.baseFilename)
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a record to the buffer, rolling over and flushing as needed."""
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            # maxBytes counts bytes; non-ASCII text (e.g. German disease
+            # names) encodes to more bytes than characters
+            size = len(msg.encode(self.stream.encoding, self.stream.errors))
+            if self.maxBytes > 0 and self._bytes_written + size >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(msg)
+            self._bytes_written += size
+
+            if record.levelno >= self.flush_level:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        with self.lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self.stream is not None and not self.stream.closed:
+                self.stream.flush()
+
+
+def configure_logging(level: int = logging.INFO, json_format: bool = False) -> None:
+    """Install the queue-based logging pipeline on the root logger.
+
+    The root logger only gets a QueueHandler, so a logging call on the event
+    loop is a non-blocking queue put. The console handler runs on the
+    listener's background thread, which is also where records are formatted.
+    The file handler is attached later by add_file_handler, at application
+    startup. Safe to call more than once.
+
+    Args:
+        level: Root logger level
+        json_format: Emit JSON lines instead of the plain text LOG_FORMAT
+    """
+    global _listener, _formatter
+
+    if _listener is not None:
+        return
+
+    _formatter = JSONFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(_formatter)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(ExcInfoQueueHandler(_log_queue))
+
+    _listener = QueueListener(_log_queue, console_handler, respect_handler_level=True)
+    start_log_listener()
+    atexit.register(stop_log_listener)
+
+
+def add_file_handler(log_dir: str) -> None:
+    """Attach the buffered rotating file handler to the logging pipeline.
+
+    Called from the application lifespan rather than at import, so importing
+    the app (tests, tooling, reloads) does not touch the filesystem. The
+    directory is only created when it does not exist yet. Records INFO and
+    above are written, for request tracking. Does nothing before
+    configure_logging or when the handler is already attached.
+
+    Args:
+        log_dir: Directory for api.log and its rotated backups
+    """
+    global _file_handler
+
+    if _listener is None or _file_handler is not None:
+        return
+
+    if not os.path.isdir(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+
+    _file_handler = BufferedRotatingFileHandler(
+        os.path.join(log_dir, "api.log"), maxBytes=10_000_000, backupCount=5
+    )
+    _file_handler.setLevel(logging.INFO)
+    _file_handler.setFormatter(_formatter)
+
+    # The listener thread reads this tuple per record; rebinding it is atomic
+    _listener.handlers = (*_listener.handlers, _file_handler)
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and stop the listener thread.
+
+    Called on application shutdown (and at exit); records still queued are
+    written before the thread stops, and buffered handlers are flushed.
+    """
+    global _listener_running
+
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
+        for handler in _listener.handlers:
+            handler.flush()
+
+
+def start_log_listener() -> None:
+    """Start the listener thread if it is not already running."""
+    global _listener_running
+
+    if _listener is not None and not _listener_running:
+        _listener.start()
+        _listener_running = True
@@ -6,20 +6,26 @@ network analysis, and 3D visualization coordinates.
 """
 
 import logging
-import os
 from contextlib import asynccontextmanager
-from logging.handlers import RotatingFileHandler
 
 from fastapi import FastAPI, Request
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 
 from api.config import get_settings
+from api.logging_config import (
+    add_file_handler,
+    configure_logging,
+    start_log_listener,
+    stop_log_listener,
+)
+from api.middleware.burst_limit import BurstLimitMiddleware
 from api.middleware.error_handlers import setup_exception_handlers
+from api.middleware.fast_path import FastPathMiddleware
 from api.middleware.request_logging import RequestLoggingMiddleware
-from api.rate_limit import limiter, get_rate_limit_string, custom_rate_limit_handler
+from api.rate_limit import RATE_LIMIT_STRING, limiter, custom_rate_limit_handler
+from api.responses import ORJSONResponse, json_bytes_response, prerender_json
 from api.routes import calculate, chapters, diseases, health, network
 
 # OpenAPI tags metadata for organized API documentation
@@ -58,20 +64,6 @@ tags_metadata = [
     },
 ]
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-
-# Add rotating file handler for request/error logging (INFO level for request tracking)
-os.makedirs("logs", exist_ok=True)
-file_handler = RotatingFileHandler("logs/api.log", maxBytes=10_000_000, backupCount=5)
-file_handler.setLevel(logging.INFO)  # Log INFO and above to file for request tracking
-file_handler.setFormatter(
-    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-)
-logging.getLogger().addHandler(file_handler)
-
 logger = logging.getLogger(__name__)
 
 
@@ -86,24 +78,63 @@ async def lifespan(app: FastAPI):
     from api.dependencies import (
         init_supabase_client,
         close_supabase_client,
+        init_pg_pool,
+        close_pg_pool,
+        load_icd_to_id,
         verify_database_indexes,
     )
 
     # Startup
-    logger.info("Starting Disease-Relater API...")
     settings = get_settings()
+    # Configure logging here rather than at import, so importing the app
+    # (tests, tooling) leaves the root logger alone and starts no thread.
+    # Queue-based so request handlers never block on log I/O
+    configure_logging(json_format=settings.log_format == "json")
+    start_log_listener()
+    add_file_handler(settings.log_dir)
+    logger.info("Starting Disease-Relater API...")
     logger.info(f"App: {settings.app_name} v{settings.app_version}")
     logger.info(f"Debug mode: {settings.debug}")
 
     # Initialize Supabase client (connection pooling via httpx)
+    # Stash the shared client on app.state so routes resolve it with a single
+    # attribute read (see api.dependencies.get_db)
+    app.state.supabase = None
     try:
-        await init_supabase_client()
+        app.state.supabase = await init_supabase_client()
         logger.info("Database connection pool initialized")
     except Exception as e:
         logger.error(f"Failed to initialize database connection: {e}")
         # Don't fail startup - allow late initialization for graceful degradation
         logger.warning("API will attempt to connect to database on first request")
 
+    # ICD code -> id mapping so disease routes skip the id lookup round-trip.
+    # Left as None if it cannot be loaded; routes then resolve codes in SQL
+    app.state.icd_to_id = None
+    if app.state.supabase is not None:
+        try:
+            app.state.icd_to_id = await load_icd_to_id(app.state.supabase)
+            logger.info(f"Loaded {len(app.state.icd_to_id)} ICD code mappings")
+        except Exception as e:
+            logger.warning(f"Failed to load ICD code mappings: {e}")
+
+    # Static chapter list, served from memory by the chapters route; the
+    # code -> name mapping replaces the chapter embed in disease queries
+    app.state.chapters = None
+    app.state.chapter_names = None
+    if app.state.supabase is not None:
+        try:
+            app.state.chapters = await chapters.load_chapters(app.state.supabase)
+            app.state.chapter_names = {
+                c.chapter_code: c.chapter_name for c in app.state.chapters
+            }
+            logger.info(f"Loaded {len(app.state.chapters)} ICD chapters")
+        except Exception as e:
+            logger.warning(f"Failed to load ICD chapters: {e}")
+
+    # Optional direct PostgreSQL pool (only when SUPABASE_DB_URL is configured)
+    app.state.pg = await init_pg_pool()
+
     # Optionally verify database indexes
     if settings.verify_indexes_on_startup:
         logger.info("Verifying database indexes...")
@@ -122,8 +153,17 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Disease-Relater API...")
+    await calculate.job_store.cancel_all()
+    await close_pg_pool()
+    app.state.pg = None
     await close_supabase_client()
+    app.state.supabase = None
+    app.state.icd_to_id = None
+    app.state.chapters = None
+    app.state.chapter_names = None
     logger.info("Cleanup complete")
+    # Drain queued log records to their handlers before exiting
+    stop_log_listener()
 
 
 def create_application() -> FastAPI:
@@ -133,6 +173,7 @@ def create_application() -> FastAPI:
         Configured FastAPI application instance
     """
     settings = get_settings()
+    docs_url = "/docs" if settings.debug else None
 
     app = FastAPI(
         title=settings.app_name,
@@ -173,34 +214,58 @@ def create_application() -> FastAPI:
             "identifier": "MIT",
         },
         openapi_tags=tags_metadata,
-        docs_url="/docs" if settings.debug else None,
+        docs_url=docs_url,
         redoc_url="/redoc" if settings.debug else None,
         openapi_url="/openapi.json" if settings.debug else None,
         lifespan=lifespan,
+        # Wrapped in Default so routes with a response_model keep FastAPI's
+        # fast path, which dumps the validated model straight to JSON bytes
+        # in pydantic-core; a plain class would force a dict round-trip
+        # through orjson. Routes without a response model render with orjson.
+        default_response_class=Default(ORJSONResponse),
     )
 
     # Setup exception handlers
     setup_exception_handlers(app)
 
-    # Add rate limiting middleware with custom 429 handler
+    # Rate limiting with custom 429 handler. The @limiter.limit decorators
+    # enforce the per-route limits themselves, so no SlowAPIMiddleware (a
+    # BaseHTTPMiddleware that would only re-check default limits) is installed
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
-    app.add_middleware(SlowAPIMiddleware)
 
-    # Add CORS middleware
+    # Optional per-client token bucket that rejects floods before routing
+    if settings.burst_limit_rate > 0:
+        app.add_middleware(
+            BurstLimitMiddleware,
+            rate=settings.burst_limit_rate,
+            capacity=settings.burst_limit_capacity,
+        )
+
+    # Add CORS middleware. Origins are pre-normalized in settings and passed
+    # as a frozenset so each request's origin check is a hash lookup, and
+    # preflight results are cached by browsers for cors_max_age seconds.
+    # In debug mode all methods are allowed so local frontends never trip over
+    # the method list; production keeps the explicit allow-list, trading a
+    # slightly longer header for not advertising methods the API doesn't serve
+    cors_methods = ("*",) if settings.debug else tuple(settings.cors_allow_methods)
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.cors_origins,
+        allow_origins=frozenset(settings.cors_origins),
         allow_credentials=settings.cors_allow_credentials,
-        allow_methods=settings.cors_allow_methods,
-        allow_headers=settings.cors_allow_headers,
+        allow_methods=cors_methods,
+        allow_headers=tuple(settings.cors_allow_headers),
+        max_age=settings.cors_max_age,
     )
 
     # Add request logging middleware (logs requests with timing info)
     app.add_middleware(RequestLoggingMiddleware)
 
-    # Add compression middleware
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # No compression middleware: the large cacheable responses are gzipped
+    # once when cached (see api.services.cache) instead of on every request
+
+    # Outermost: answer the liveness probe before any other middleware runs
+    app.add_middleware(FastPathMiddleware)
 
     # Include routers
     app.include_router(health.router, prefix="/api", tags=["health"])
@@ -209,27 +274,18 @@ def create_application() -> FastAPI:
     app.include_router(chapters.router, prefix="/api", tags=["chapters"])
     app.include_router(calculate.router, prefix="/api", tags=["risk-calculation"])
 
-    # Root endpoint with rate limiting
-    rate_limit = get_rate_limit_string()
-
-    @app.get("/")
-    @limiter.limit(rate_limit)
-    async def root(request: Request):
-        """API root endpoint with basic information."""
-        return {
+    # Static payloads for the info endpoints, serialized once instead of per request
+    root_body = prerender_json(
+        {
             "name": settings.app_name,
             "version": settings.app_version,
             "status": "operational",
-            "documentation": "/docs" if settings.debug else None,
+            "documentation": docs_url,
             "health": "/api/health",
         }
-
-    # API info endpoint
-    @app.get("/api")
-    @limiter.limit(rate_limit)
-    async def api_info(request: Request):
-        """API information and available endpoints."""
-        return {
+    )
+    api_info_body = prerender_json(
+        {
             "name": settings.app_name,
             "version": settings.app_version,
             "endpoints": {
@@ -239,8 +295,28 @@ def create_application() -> FastAPI:
                 "chapters": "/api/chapters",
                 "calculate-risk": "/api/calculate-risk",
             },
-            "documentation": "/docs" if settings.debug else None,
+            "documentation": docs_url,
         }
+    )
+
+    # Root endpoint with rate limiting
+    @app.get("/")
+    @limiter.limit(RATE_LIMIT_STRING)
+    async def root(request: Request):
+        """API root endpoint with basic information."""
+        return json_bytes_response(root_body)
+
+    # API info endpoint
+    @app.get("/api")
+    @limiter.limit(RATE_LIMIT_STRING)
+    async def api_info(request: Request):
+        """API information and available endpoints."""
+        return json_bytes_response(api_info_body)
+
+    # Docs are only served in debug mode; build the OpenAPI schema now so the
+    # first /docs or /openapi.json request doesn't walk every route's models
+    if settings.debug:
+        app.openapi_schema = app.openapi()
 
     return app
 
@@ -250,16 +326,44 @@ app = create_application()
 
 
 if __name__ == "__main__":
+    import importlib.util
+
     import uvicorn
 
     settings = get_settings()
+    configure_logging(json_format=settings.log_format == "json")
+
+    # Prefer the C implementations from uvicorn[standard]; fall back to the
+    # pure-Python stack where they are unavailable (e.g. uvloop on Windows)
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # Reload mode only supports a single process. Multiple workers are opt-in:
+    # caches, background jobs and memory:// rate limit counters are per
+    # process, so each worker would grant every client its own allowance
+    workers = 1 if settings.debug else (settings.workers or 1)
+    if workers > 1 and settings.rate_limit_storage_uri.startswith("memory://"):
+        logger.warning(
+            f"Running {workers} workers with memory:// rate limit storage: each "
+            f"worker counts separately, so clients get up to {workers}x "
+            "API_RATE_LIMIT. Set RATE_LIMIT_STORAGE_URI to a shared store "
+            "(e.g. redis://) to enforce one limit."
+        )
 
-    logger.info(f"Starting server on {settings.host}:{settings.port}")
+    logger.info(
+        f"Starting server on {settings.host}:{settings.port} "
+        f"(loop={loop}, http={http}, workers={workers})"
+    )
 
     uvicorn.run(
         "api.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=workers,
+        loop=loop,
+        http=http,
         log_level="info" if settings.debug else "warning",
+        # RequestLoggingMiddleware already logs every request through the
+        # queue-based pipeline; uvicorn's access log would duplicate it
+        access_log=False,
     )
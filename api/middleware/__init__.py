@@ -1,5 +1,7 @@
 # Middleware module initialization
 
+from api.middleware.burst_limit import BurstLimitMiddleware
+from api.middleware.fast_path import FastPathMiddleware
 from api.middleware.request_logging import RequestLoggingMiddleware
 
-__all__ = ["RequestLoggingMiddleware"]
+__all__ = ["BurstLimitMiddleware", "FastPathMiddleware", "RequestLoggingMiddleware"]
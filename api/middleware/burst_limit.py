@@ -0,0 +1,119 @@
+"""
+Burst Limiting Middleware for Disease-Relater API.
+
+Provides a per-client token bucket that rejects request floods before they
+reach routing, the rate limiter or any Request object construction.
+"""
+
+import math
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.config import get_runtime_settings
+from api.middleware.request_logging import client_ip_from_scope
+from api.responses import prerender_json
+
+# Seconds between sweeps of idle buckets
+_SWEEP_INTERVAL = 60.0
+
+# 429 body, pre-serialized and split around the retry delay
+_RETRY_AFTER_PLACEHOLDER = "__retry_after__"
+_BODY_PREFIX, _BODY_SUFFIX = prerender_json(
+    {
+        "error": {
+            "type": "RateLimitExceeded",
+            "message": "Too many requests in a short period",
+            "details": {"retry_after_seconds": _RETRY_AFTER_PLACEHOLDER},
+            "status_code": 429,
+        }
+    }
+).split(f'"{_RETRY_AFTER_PLACEHOLDER}"'.encode())
+
+
+class BurstLimitMiddleware:
+    """Per-client token bucket limiter implemented as pure ASGI middleware.
+
+    Each client IP gets a bucket holding up to `capacity` tokens that refills
+    at `rate` tokens per second; a request spends one token. An allowed
+    request costs a dict lookup and a little float math. A rejected request
+    gets a pre-serialized 429 sent straight through the ASGI channel.
+
+    This guards against short floods only. The per-route limits from
+    api.rate_limit still apply to every request that gets through.
+    """
+
+    def __init__(self, app: ASGIApp, rate: float, capacity: int) -> None:
+        self.app = app
+        self.rate = rate
+        self.capacity = float(capacity)
+        # Resolved once here instead of on every request
+        self._trust_proxy = get_runtime_settings().trust_proxy
+        # Client IP -> (tokens, last update time)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._next_sweep = time.monotonic() + _SWEEP_INTERVAL
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Spend a token for the client or reject the request with 429.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic()
+        client_ip = client_ip_from_scope(scope, self._trust_proxy)
+        tokens, last = self._buckets.get(client_ip, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+
+        if tokens < 1.0:
+            self._buckets[client_ip] = (tokens, now)
+            await self._reject(send, math.ceil((1.0 - tokens) / self.rate))
+            return
+
+        self._buckets[client_ip] = (tokens - 1.0, now)
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        await self.app(scope, receive, send)
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have been idle long enough to refill completely.
+
+        Args:
+            now: Current monotonic time
+        """
+        refill_time = self.capacity / self.rate
+        self._buckets = {
+            client_ip: bucket
+            for client_ip, bucket in self._buckets.items()
+            if now - bucket[1] < refill_time
+        }
+        self._next_sweep = now + _SWEEP_INTERVAL
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: int) -> None:
+        """Send the pre-serialized 429 response.
+
+        Args:
+            send: ASGI send channel
+            retry_after: Seconds until the client has a token again
+        """
+        retry = str(retry_after).encode("latin-1")
+        body = _BODY_PREFIX + retry + _BODY_SUFFIX
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", retry),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -2,16 +2,19 @@
 Error handling middleware for Disease-Relater API.
 
 Provides custom exception handlers for consistent error responses
-and security (prevents information leakage).
+and security (prevents information leakage). Error bodies are encoded with
+orjson, which matters most during validation-error floods.
 """
 
 import logging
 from typing import Optional
 
+import httpx
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
+from api.config import get_settings
+from api.responses import ORJSONResponse, json_bytes_response, prerender_json
 from api.validation import sanitize_error_message
 
 logger = logging.getLogger(__name__)
@@ -56,19 +59,38 @@ class DatabaseError(APIError):
         )
 
 
+# Generic 500 body, identical for every unhandled error outside debug mode
+_INTERNAL_ERROR_MESSAGE = "An internal server error occurred"
+_INTERNAL_ERROR_BODY = prerender_json(
+    {
+        "error": {
+            "type": "InternalServerError",
+            "message": _INTERNAL_ERROR_MESSAGE,
+            "details": {},
+            "status_code": 500,
+        }
+    }
+)
+
+
 def setup_exception_handlers(app):
     """Configure exception handlers for the FastAPI application.
 
+    The debug flag is read once here, so the unhandled-exception handler does
+    no settings lookup per error and, outside debug mode, returns a
+    pre-serialized body.
+
     Args:
         app: FastAPI application instance
     """
+    debug = get_settings().debug
 
     @app.exception_handler(APIError)
     async def api_error_handler(request: Request, exc: APIError):
         """Handle custom API errors."""
         logger.warning(f"API error: {exc.message} (status={exc.status_code})")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content={
                 "error": {
@@ -80,6 +102,23 @@ def setup_exception_handlers(app):
             },
         )
 
+    @app.exception_handler(httpx.TransportError)
+    async def database_transport_error_handler(
+        request: Request, exc: httpx.TransportError
+    ):
+        """Translate Supabase connection failures into DatabaseError responses.
+
+        All PostgREST queries go through the shared httpx client, so network
+        failures surface here once instead of being wrapped per call.
+        """
+        if isinstance(exc, httpx.TimeoutException):
+            error = DatabaseError("Database request timed out")
+        else:
+            error = DatabaseError("Database connection unavailable")
+        logger.error(f"Database request failed: {exc.__class__.__name__}: {exc}")
+
+        return await api_error_handler(request, error)
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(
         request: Request, exc: RequestValidationError
@@ -97,7 +136,7 @@ def setup_exception_handlers(app):
             }
             errors.append(sanitized_error)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content={
                 "error": {
@@ -114,64 +153,22 @@ def setup_exception_handlers(app):
         """Handle all unhandled exceptions."""
         logger.exception(f"Unhandled exception: {str(exc)}")
 
-        # Sanitize the error message to prevent info leakage
-        safe_message = "An internal server error occurred"
+        # Outside debug mode, return the fixed message to prevent info leakage
+        if not debug:
+            return json_bytes_response(
+                _INTERNAL_ERROR_BODY,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
         # In debug mode, include more details
-        from api.config import get_settings
-
-        settings = get_settings()
-
-        details = {}
-        if settings.debug:
-            details["debug_info"] = str(exc)
-
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "error": {
                     "type": "InternalServerError",
-                    "message": safe_message,
-                    "details": details,
+                    "message": _INTERNAL_ERROR_MESSAGE,
+                    "details": {"debug_info": str(exc)},
                     "status_code": 500,
                 }
             },
         )
-
-
-def handle_database_operation(func):
-    """Decorator for consistent database error handling.
-
-    Wraps database operations to catch common database errors and convert
-    them to standardized DatabaseError exceptions with appropriate logging.
-
-    Args:
-        func: Async function to wrap
-
-    Returns:
-        Wrapped function with error handling
-
-    Example:
-        @handle_database_operation
-        async def get_disease_by_code(client: AsyncClient, code: str):
-            response = await client.table("diseases") \\
-                .select("*").eq("icd_code", code).execute()
-            return response.data
-    """
-    import functools
-
-    @functools.wraps(func)
-    async def wrapper(*args, **kwargs):
-        try:
-            return await func(*args, **kwargs)
-        except ConnectionError as e:
-            logger.exception("Database connection failed")
-            raise DatabaseError("Database connection unavailable") from e
-        except TimeoutError as e:
-            logger.exception("Database query timeout")
-            raise DatabaseError("Database request timed out") from e
-        except Exception as e:
-            logger.exception("Database operation failed")
-            raise DatabaseError("Database operation failed") from e
-
-    return wrapper
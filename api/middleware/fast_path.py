@@ -0,0 +1,61 @@
+"""
+Fast Path Middleware for Disease-Relater API.
+
+Answers constant-response endpoints such as the liveness probe before the
+rest of the middleware stack and routing run.
+"""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.responses import prerender_json
+
+
+def _json_response(content: dict) -> tuple[list[tuple[bytes, bytes]], bytes]:
+    """Pre-encode a JSON response as ASGI headers and body."""
+    body = prerender_json(content)
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    return headers, body
+
+
+# GET paths served directly: path -> (headers, body)
+FAST_PATHS: dict[str, tuple[list[tuple[bytes, bytes]], bytes]] = {
+    "/api/live": _json_response({"status": "alive"}),
+}
+
+
+class FastPathMiddleware:
+    """Serve constant responses for probe endpoints straight from ASGI.
+
+    Orchestrators poll the liveness probe constantly, and its answer never
+    changes while the process can serve requests at all. Matching requests
+    skip logging, CORS, rate limiting and routing and get a pre-encoded
+    response; everything else passes through untouched. Endpoints whose
+    answer depends on state (e.g. /api/health, which queries the database)
+    are deliberately not served here.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer fast-path requests directly, otherwise delegate.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] == "http" and scope["method"] == "GET":
+            response = FAST_PATHS.get(scope["path"])
+            if response is not None:
+                headers, body = response
+                await send(
+                    {"type": "http.response.start", "status": 200, "headers": headers}
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        await self.app(scope, receive, send)
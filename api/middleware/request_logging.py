@@ -8,87 +8,130 @@ monitoring and debugging API performance.
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from api.config import get_settings
+from api.config import get_runtime_settings
 
 # Use a dedicated logger for request logging to enable filtering
 logger = logging.getLogger("api.request_logging")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Middleware for logging HTTP requests with response time tracking.
 
-    Logs each request with:
+    Logs a single record per request, when the response starts, with:
     - HTTP method and path
-    - Client IP address
     - Response status code
     - Response time in milliseconds
+    - Client IP address
 
     Also adds X-Response-Time header to all responses.
+
+    Implemented as pure ASGI middleware rather than BaseHTTPMiddleware, so
+    no extra task or Request/Response wrappers are created per request.
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Resolved once here instead of on every request
+        self._trust_proxy = get_runtime_settings().trust_proxy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and log timing information.
 
         Args:
-            request: The incoming HTTP request
-            call_next: Function to call the next middleware/endpoint
-
-        Returns:
-            Response with X-Response-Time header added
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        start_time = time.perf_counter()
-
-        # Get client IP (handle proxy headers securely)
-        client_ip = self._get_client_ip(request)
-
-        # Log incoming request
-        logger.info(f"Request: {request.method} {request.url.path} - IP: {client_ip}")
-
-        # Process the request
-        response = await call_next(request)
-
-        # Calculate response time
-        duration_ms = (time.perf_counter() - start_time) * 1000
-
-        # Log response with timing
-        logger.info(
-            f"Response: {request.method} {request.url.path} - "
-            f"{response.status_code} - {duration_ms:.2f}ms"
-        )
-
-        # Add timing header for client visibility
-        response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
-
-        return response
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP from request securely.
-
-        Only trusts X-Forwarded-For header when trust_proxy setting is enabled.
-        This prevents IP spoofing attacks when the application is directly
-        exposed to the internet.
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        method = scope["method"]
+        path = scope["path"]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate response time
+                duration_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+
+                # One record per request; logging only formats it if INFO is
+                # enabled. The client IP lookup is skipped too when it isn't.
+                # The fields are also attached via extra= for JSON log output
+                if logger.isEnabledFor(logging.INFO):
+                    status = message["status"]
+                    client_ip = self._get_client_ip(scope)
+                    logger.info(
+                        "%s %s - %d - %.2fms - IP: %s",
+                        method,
+                        path,
+                        status,
+                        duration_ms,
+                        client_ip,
+                        extra={
+                            "method": method,
+                            "path": path,
+                            "status": status,
+                            "duration_ms": round(duration_ms, 2),
+                            "client_ip": client_ip,
+                        },
+                    )
+
+                # Add timing header for client visibility
+                headers = list(message.get("headers", ()))
+                headers.append(
+                    (b"x-response-time", f"{duration_ms:.2f}ms".encode("latin-1"))
+                )
+                message = {**message, "headers": headers}
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _get_client_ip(self, scope: Scope) -> str:
+        """Extract client IP from the ASGI scope securely.
 
         Args:
-            request: The incoming HTTP request
+            scope: ASGI connection scope
 
         Returns:
             Client IP address string
         """
-        settings = get_settings()
+        return client_ip_from_scope(scope, self._trust_proxy)
+
 
-        # Only trust X-Forwarded-For if explicitly configured to trust proxy
-        if settings.trust_proxy:
-            forwarded_for = request.headers.get("X-Forwarded-For")
-            if forwarded_for:
-                # Take the first IP in the chain (original client)
-                return forwarded_for.split(",")[0].strip()
+def client_ip_from_scope(scope: Scope, trust_proxy: bool) -> str:
+    """Extract the client IP from an ASGI scope.
 
-        # Fall back to direct client host
-        if request.client:
-            return request.client.host
+    Only trusts X-Forwarded-For header when trust_proxy is enabled.
+    This prevents IP spoofing attacks when the application is directly
+    exposed to the internet. Reads the raw header list, so no Request or
+    Headers object is built.
 
-        return "unknown"
+    Args:
+        scope: ASGI connection scope
+        trust_proxy: Whether X-Forwarded-For may be trusted
+
+    Returns:
+        Client IP address string
+    """
+    # Only trust X-Forwarded-For if explicitly configured to trust proxy
+    if trust_proxy:
+        for name, value in scope.get("headers", ()):
+            # ASGI header names are already lowercased bytes
+            if name == b"x-forwarded-for":
+                # Take the first IP in the chain (original client); only that
+                # element is decoded
+                forwarded_for = value.split(b",", 1)[0].strip()
+                if forwarded_for:
+                    return forwarded_for.decode("latin-1")
+                break
+
+    # Fall back to direct client host
+    client = scope.get("client")
+    if client:
+        return client[0]
+
+    return "unknown"
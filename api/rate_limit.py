@@ -5,12 +5,26 @@ Provides a shared rate limiter instance with custom 429 error handling
 and rate limit headers for client feedback.
 """
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
+import logging
+import math
+import time
+from typing import Tuple
+
+from fastapi import Request, Response
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 
-from api.config import get_settings
+from api.config import get_runtime_settings, get_settings
+from api.middleware.request_logging import client_ip_from_scope
+from api.responses import json_bytes_response, prerender_json
+
+logger = logging.getLogger(__name__)
+
+# Resolved once at import: the key function and 429 handler run per request
+_settings = get_runtime_settings()
+
+# Retry delay reported when the limit's window cannot be inspected
+_DEFAULT_RETRY_AFTER = 60
 
 
 def get_client_ip_for_rate_limit(request: Request) -> str:
@@ -18,6 +32,7 @@ def get_client_ip_for_rate_limit(request: Request) -> str:
 
     Only trusts X-Forwarded-For header when trust_proxy setting is enabled.
     This prevents IP spoofing attacks that could bypass rate limiting.
+    Reads the raw ASGI scope, so the request's Headers mapping is never built.
 
     Args:
         request: The incoming HTTP request
@@ -25,30 +40,52 @@ def get_client_ip_for_rate_limit(request: Request) -> str:
     Returns:
         Client IP address string for rate limiting key
     """
-    settings = get_settings()
+    return client_ip_from_scope(request.scope, _settings.trust_proxy)
+
 
-    # Only trust X-Forwarded-For if explicitly configured to trust proxy
-    if settings.trust_proxy:
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            # Take the first IP in the chain (original client)
-            return forwarded_for.split(",")[0].strip()
+# Storage URI schemes served by limits' Redis-compatible backends
+_REDIS_SCHEMES = ("redis://", "rediss://", "redis+unix://", "valkey://", "valkeys://")
 
-    # Fall back to direct client host
-    if request.client:
-        return request.client.host
 
-    return "unknown"
+def _create_limiter() -> Limiter:
+    """Create the shared rate limiter from settings.
+
+    Counters live in RATE_LIMIT_STORAGE_URI. The default memory:// storage is
+    per process, so with several workers each one enforces the limit on its
+    own; point it at Redis (redis://host:6379) to enforce a single limit across
+    workers and replicas. The Redis moving-window check is one atomic Lua
+    script per request. If Redis becomes unreachable the limiter falls back to
+    in-memory counters instead of failing requests.
+
+    Returns:
+        Configured Limiter instance
+    """
+    settings = get_settings()
+    storage_uri = settings.rate_limit_storage_uri
+    shared_storage = not storage_uri.startswith("memory://")
+
+    # Redis checks reuse a bounded connection pool instead of growing one
+    # connection per concurrent check
+    storage_options = {}
+    if storage_uri.startswith(_REDIS_SCHEMES):
+        storage_options["max_connections"] = settings.rate_limit_redis_max_connections
+
+    # Note: headers_enabled is set to False because endpoints returning dicts
+    # cannot have headers injected without explicit Response parameter.
+    # Rate limit headers are provided in the custom 429 handler when limit is exceeded.
+    return Limiter(
+        key_func=get_client_ip_for_rate_limit,
+        headers_enabled=False,
+        storage_uri=storage_uri,
+        storage_options=storage_options,
+        strategy=settings.rate_limit_strategy,
+        key_prefix="rl",
+        in_memory_fallback_enabled=shared_storage,
+    )
 
 
 # Initialize rate limiter with secure IP-based key function
-# Note: headers_enabled is set to False because endpoints returning dicts
-# cannot have headers injected without explicit Response parameter.
-# Rate limit headers are provided in the custom 429 handler when limit is exceeded.
-limiter = Limiter(
-    key_func=get_client_ip_for_rate_limit,
-    headers_enabled=False,
-)
+limiter = _create_limiter()
 
 
 def get_rate_limit_string() -> str:
@@ -61,43 +98,89 @@ def get_rate_limit_string() -> str:
     return f"{settings.api_rate_limit}/minute"
 
 
+# Route modules import this and pass it straight to @limiter.limit, so the
+# string is built once rather than per module. slowapi parses static limit
+# strings once, when the route is decorated; a callable limit provider would
+# instead be re-parsed on every request.
+RATE_LIMIT_STRING = f"{_settings.api_rate_limit}/minute"
+
+
+# The 429 body is identical for every rejected request apart from the retry
+# delay, so it is serialized once and split around a placeholder. Rate limit
+# responses are most frequent during floods, when CPU is scarcest.
+_RETRY_AFTER_PLACEHOLDER = "__retry_after__"
+_RATE_LIMIT_BODY_PREFIX, _RATE_LIMIT_BODY_SUFFIX = prerender_json(
+    {
+        "error": {
+            "type": "RateLimitExceeded",
+            "message": f"Rate limit exceeded: {_settings.api_rate_limit} requests per minute",
+            "details": {
+                "retry_after_seconds": _RETRY_AFTER_PLACEHOLDER,
+                "limit": _settings.api_rate_limit,
+                "period": "minute",
+            },
+            "status_code": 429,
+        }
+    }
+).split(f'"{_RETRY_AFTER_PLACEHOLDER}"'.encode())
+_RATE_LIMIT_LIMIT_HEADER = str(_settings.api_rate_limit)
+
+
+def _window_state(request: Request, exc: RateLimitExceeded) -> Tuple[int, int]:
+    """Work out when the exceeded limit frees up and how much is left.
+
+    slowapi records the limit that was hit, with its storage key, on
+    request.state.view_rate_limit. Its window stats give the exact time the
+    oldest counted request leaves the window (moving window) or the window
+    resets (fixed window), instead of a fixed guess.
+
+    Args:
+        request: The request that exceeded the rate limit
+        exc: The RateLimitExceeded exception
+
+    Returns:
+        Tuple of (seconds until a request is allowed again, remaining hits)
+    """
+    current_limit = getattr(request.state, "view_rate_limit", None)
+    if isinstance(current_limit, tuple):
+        item, args = current_limit
+        try:
+            reset_time, remaining = limiter.limiter.get_window_stats(item, *args)
+        except Exception as e:
+            # Storage hiccups must not turn a 429 into a 500
+            logger.debug(f"Could not read rate limit window stats: {e}")
+        else:
+            return max(1, math.ceil(reset_time - time.time())), remaining
+
+    return getattr(exc, "retry_after", _DEFAULT_RETRY_AFTER), 0
+
+
 async def custom_rate_limit_handler(
     request: Request, exc: RateLimitExceeded
-) -> JSONResponse:
+) -> Response:
     """Custom 429 handler matching API error format.
 
     Returns a JSON response with rate limit details and appropriate headers
-    to help clients understand when they can retry.
+    to help clients understand when they can retry. Retry-After and
+    X-RateLimit-Remaining come from the exceeded limit's current window; only
+    the retry delay is filled into the otherwise pre-serialized body.
 
     Args:
         request: The incoming request that exceeded the rate limit
         exc: The RateLimitExceeded exception with limit details
 
     Returns:
-        JSONResponse with 429 status and rate limit headers
+        Response with 429 status and rate limit headers
     """
-    settings = get_settings()
+    retry_after, remaining = _window_state(request, exc)
+    retry_after = str(retry_after)
 
-    # Extract retry_after value (seconds until reset)
-    retry_after = getattr(exc, "retry_after", 60)
-
-    return JSONResponse(
+    return json_bytes_response(
+        _RATE_LIMIT_BODY_PREFIX + retry_after.encode() + _RATE_LIMIT_BODY_SUFFIX,
         status_code=429,
-        content={
-            "error": {
-                "type": "RateLimitExceeded",
-                "message": f"Rate limit exceeded: {settings.api_rate_limit} requests per minute",
-                "details": {
-                    "retry_after_seconds": retry_after,
-                    "limit": settings.api_rate_limit,
-                    "period": "minute",
-                },
-                "status_code": 429,
-            }
-        },
         headers={
-            "Retry-After": str(retry_after),
-            "X-RateLimit-Limit": str(settings.api_rate_limit),
-            "X-RateLimit-Remaining": "0",
+            "Retry-After": retry_after,
+            "X-RateLimit-Limit": _RATE_LIMIT_LIMIT_HEADER,
+            "X-RateLimit-Remaining": str(remaining),
         },
     )
@@ -0,0 +1,58 @@
+"""
+Response classes for Disease-Relater API.
+
+Provides orjson-backed JSON responses used as the application default,
+plus helpers for serving payloads that are serialized once up front.
+"""
+
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json module.
+
+    orjson serializes directly to bytes in Rust, which is several times
+    faster than json.dumps for the large disease and network payloads.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def prerender_json(content: Any) -> bytes:
+    """Serialize a constant payload once so handlers can reuse the bytes.
+
+    Args:
+        content: JSON-serializable payload
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bytes_response(
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Wrap pre-serialized JSON bytes in a response without re-encoding.
+
+    Args:
+        body: JSON bytes produced by prerender_json
+        status_code: HTTP status code
+        headers: Optional extra response headers
+
+    Returns:
+        Response with application/json media type
+    """
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
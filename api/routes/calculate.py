@@ -4,21 +4,86 @@ Risk Calculation API Route
 POST /api/calculate-risk endpoint for calculating disease risk scores.
 """
 
+import asyncio
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from supabase import AsyncClient
 
-from api.schemas.calculate import RiskCalculationRequest, RiskCalculationResponse
+from api.schemas.calculate import (
+    RiskCalculationRequest,
+    RiskCalculationResponse,
+    RiskJobResponse,
+)
 from api.services.risk_calculator import RiskCalculator
-from api.dependencies import get_supabase_client
-from api.rate_limit import limiter, get_rate_limit_string
+from api.services.risk_jobs import RiskJob, RiskJobStore
+from api.config import get_settings
+from api.dependencies import get_db
+from api.rate_limit import RATE_LIMIT_STRING, limiter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["risk-calculation"])
 
-# Get rate limit string for decorators
-_rate_limit = get_rate_limit_string()
+# Risk calculation is far more expensive than the cached read endpoints, so
+# each call spends several units of its per-minute allowance
+_rate_limit_cost = get_settings().rate_limit_calculate_cost
+
+# Caps concurrent calculations so a spike cannot queue unbounded coroutines
+# on the shared Supabase pool; excess requests fail fast with a 503
+_calculation_slots = asyncio.Semaphore(get_settings().calculate_risk_max_concurrency)
+_calculation_queue_timeout = get_settings().calculate_risk_queue_timeout
+
+
+async def _acquire_calculation_slot() -> bool:
+    """Wait briefly for a free calculation slot.
+
+    Returns:
+        True if a slot was acquired (release it when done), False if none
+        became free within the queue timeout
+    """
+    try:
+        await asyncio.wait_for(
+            _calculation_slots.acquire(), timeout=_calculation_queue_timeout
+        )
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+# Background calculations submitted through the job endpoints; jobs wait
+# for a calculation slot shared with the synchronous endpoint
+job_store = RiskJobStore(
+    ttl=get_settings().calculate_risk_job_ttl,
+    max_jobs=get_settings().calculate_risk_max_jobs,
+    slots=_calculation_slots,
+)
+
+# Jobs live in one worker's memory, so with several workers a poll would
+# usually reach a worker that never saw the job; the endpoints answer 503
+_jobs_available = get_settings().debug or (get_settings().workers or 1) <= 1
+
+
+def _require_jobs_available() -> None:
+    """Reject job requests when more than one worker is configured.
+
+    Raises:
+        HTTPException: 503 when jobs cannot be polled reliably
+    """
+    if not _jobs_available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=(
+                "Background risk jobs require a single worker; "
+                "use POST /calculate-risk instead"
+            ),
+        )
+
+
+def _job_response(job: RiskJob) -> RiskJobResponse:
+    """Build the API representation of a job."""
+    return RiskJobResponse(
+        job_id=job.job_id, status=job.status, result=job.result, error=job.error
+    )
 
 
 @router.post(
@@ -48,13 +113,16 @@ _rate_limit = get_rate_limit_string()
         500: {
             "description": "Internal server error",
         },
+        503: {
+            "description": "Too many calculations in progress, retry shortly",
+        },
     },
 )
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING, cost=_rate_limit_cost)
 async def calculate_risk(
     request: Request,
     body: RiskCalculationRequest,
-    client: AsyncClient = Depends(get_supabase_client),
+    client: AsyncClient = Depends(get_db),
 ) -> RiskCalculationResponse:
     """Calculate disease risk scores for a user.
 
@@ -67,8 +135,18 @@ async def calculate_risk(
         RiskCalculationResponse with calculated scores and position
 
     Raises:
-        HTTPException: 400 for invalid data, 500 for server errors
+        HTTPException: 400 for invalid data, 500 for server errors,
+            503 when all calculation slots are busy
     """
+    # Acquire a slot before any work, so rejected requests cost almost nothing
+    if not await _acquire_calculation_slot():
+        logger.warning("Risk calculation rejected: all calculation slots busy")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many risk calculations in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
     try:
         # Log count only to avoid exposing sensitive medical conditions
         logger.info(f"Calculating risk for {len(body.existing_conditions)} conditions")
@@ -90,3 +168,104 @@ async def calculate_risk(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to calculate risk scores",
         )
+    finally:
+        _calculation_slots.release()
+
+
+@router.post(
+    "/calculate-risk/jobs",
+    response_model=RiskJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a background risk calculation",
+    description="""
+    Start the same calculation as POST /calculate-risk in the background and
+    return a job id immediately. Poll GET /calculate-risk/jobs/{job_id} for
+    the result. Jobs are kept in the memory of the worker that accepted them.
+    """,
+    responses={
+        202: {"description": "Job accepted"},
+        503: {
+            "description": "Too many unfinished jobs, or jobs disabled because "
+            "more than one worker is configured"
+        },
+    },
+)
+@limiter.limit(RATE_LIMIT_STRING, cost=_rate_limit_cost)
+async def submit_risk_job(
+    request: Request,
+    body: RiskCalculationRequest,
+    client: AsyncClient = Depends(get_db),
+) -> RiskJobResponse:
+    """Submit a risk calculation to run in the background.
+
+    Background jobs share the calculation slots with the synchronous
+    endpoint, but wait for a free slot (as pending) instead of being
+    rejected.
+
+    Args:
+        request: FastAPI request object (for rate limiting)
+        body: RiskCalculationRequest with user data and conditions
+        client: Supabase client injected via dependency
+
+    Returns:
+        RiskJobResponse with the new job id
+
+    Raises:
+        HTTPException: 503 when too many jobs are unfinished or more than one
+            worker is configured
+    """
+    _require_jobs_available()
+
+    async def calculation() -> RiskCalculationResponse:
+        logger.info(f"Calculating risk for {len(body.existing_conditions)} conditions")
+        return await RiskCalculator(client).calculate_risks(body)
+
+    job = job_store.submit(calculation)
+    if job is None:
+        logger.warning("Risk job rejected: too many unfinished jobs")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many risk calculations in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    return _job_response(job)
+
+
+@router.get(
+    "/calculate-risk/jobs/{job_id}",
+    response_model=RiskJobResponse,
+    summary="Get a background risk calculation",
+    responses={
+        200: {"description": "Current job status, with the result once completed"},
+        404: {"description": "Unknown or expired job"},
+        503: {
+            "description": "Jobs disabled because more than one worker is configured"
+        },
+    },
+)
+@limiter.limit(RATE_LIMIT_STRING)
+async def get_risk_job(request: Request, job_id: str) -> RiskJobResponse:
+    """Get the status and, once completed, the result of a job.
+
+    Args:
+        request: FastAPI request object (for rate limiting)
+        job_id: Job id returned when the job was submitted
+
+    Returns:
+        RiskJobResponse with the job status
+
+    Raises:
+        HTTPException: 404 if the job is unknown or has expired, 503 when more
+            than one worker is configured
+    """
+    _require_jobs_available()
+
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Risk calculation job not found: {job_id}",
+        )
+
+    return _job_response(job)
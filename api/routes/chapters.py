@@ -10,29 +10,25 @@ Agent 1: Added response caching for GET endpoint.
 from fastapi import APIRouter, Depends, Request
 from supabase import AsyncClient
 
-from api.dependencies import get_supabase_client
-from api.rate_limit import limiter, get_rate_limit_string
+from api.dependencies import get_db
+from api.rate_limit import RATE_LIMIT_STRING, limiter
 from api.schemas.diseases import ChapterResponse
 from api.services.cache import cache_response
 
 router = APIRouter(prefix="/chapters", tags=["chapters"])
 
-# Get rate limit string for decorators
-_rate_limit = get_rate_limit_string()
 
+async def load_chapters(client: AsyncClient) -> list[ChapterResponse]:
+    """Query all ICD chapters with their disease counts.
 
-@router.get("", response_model=list[ChapterResponse])
-@cache_response("chapters")
-@limiter.limit(_rate_limit)
-async def list_chapters(
-    request: Request,
-    client: AsyncClient = Depends(get_supabase_client),
-):
-    """
-    Get all ICD chapters with disease counts.
+    Chapters only change on data re-import, so this runs once at startup
+    (see api.main.lifespan) and the result is kept on app.state.
 
-    Returns list of all 21 ICD-10 chapters with disease counts and
-    average prevalence statistics.
+    Args:
+        client: Supabase client
+
+    Returns:
+        List of ChapterResponse models
     """
     # Query chapters with disease counts using the view or manual join
     response = (
@@ -65,3 +61,31 @@ async def list_chapters(
         )
 
     return chapters
+
+
+# The response is built internally from typed models, so FastAPI's response
+# validation pass is skipped; the model is kept for the OpenAPI docs only
+@router.get(
+    "",
+    response_model=None,
+    responses={200: {"model": list[ChapterResponse]}},
+)
+# No query parameters, so every request shares the single cached entry
+@cache_response("chapters", vary_on_query=False)
+@limiter.limit(RATE_LIMIT_STRING)
+async def list_chapters(
+    request: Request,
+    client: AsyncClient = Depends(get_db),
+):
+    """
+    Get all ICD chapters with disease counts.
+
+    Returns list of all 21 ICD-10 chapters with disease counts and
+    average prevalence statistics. The list is loaded once at startup and
+    served from app.state; it is only queried here if that load failed.
+    """
+    chapters = getattr(request.app.state, "chapters", None)
+    if chapters is None:
+        chapters = await load_chapters(client)
+        request.app.state.chapters = chapters
+    return chapters
@@ -7,13 +7,16 @@ GET endpoints for disease listing, search, and detail.
 Agent 1: Added response caching for GET endpoints.
 """
 
+import re
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from postgrest.exceptions import APIError
+from pydantic import TypeAdapter
 from supabase import AsyncClient
 
-from api.dependencies import get_supabase_client
-from api.rate_limit import limiter, get_rate_limit_string
+from api.dependencies import call_optional_rpc, get_db
+from api.rate_limit import RATE_LIMIT_STRING, limiter
 from api.schemas.diseases import (
     DiseaseListResponse,
     DiseaseResponse,
@@ -25,13 +28,196 @@ from api.validation import validate_search_term
 
 router = APIRouter(prefix="/diseases", tags=["diseases"])
 
-# Get rate limit string for decorators
-_rate_limit = get_rate_limit_string()
+
+# Row lists are validated in one pydantic-core pass instead of building each
+# model by hand; extra columns in the rows are ignored by the models
+_DISEASE_LIST_ADAPTER = TypeAdapter(list[DiseaseResponse])
+_RELATED_LIST_ADAPTER = TypeAdapter(list[RelatedDiseaseResponse])
+_SEARCH_LIST_ADAPTER = TypeAdapter(list[SearchResultResponse])
+
+# Disease columns, with or without the embedded chapter name
+_DISEASE_SELECT = "*"
+_DISEASE_SELECT_WITH_CHAPTER = "*, icd_chapters(chapter_name)"
+
+# PostgREST error for a range starting past the last row (HTTP 416); its
+# details carry the total, e.g. "... but there are only 1080 rows."
+_RANGE_NOT_SATISFIABLE = "PGRST103"
+_RANGE_TOTAL_PATTERN = re.compile(r"only (\d+) rows")
+
+# Columns embedded for both sides of a relationship
+_RELATED_SELECT = """
+    *,
+    disease_1:disease_1_id(
+        id, icd_code, name_english, name_german, chapter_code
+    ),
+    disease_2:disease_2_id(
+        id, icd_code, name_english, name_german, chapter_code
+    )
+"""
+
+
+def _with_chapter_name(
+    rows: list[dict], chapter_names: Optional[dict[str, str]] = None
+) -> list[dict]:
+    """Set chapter_name on each row.
+
+    Looks the name up by chapter_code when the chapter names are given,
+    otherwise flattens the embedded icd_chapters.chapter_name.
+    """
+    if chapter_names is not None:
+        for row in rows:
+            row["chapter_name"] = chapter_names.get(row.get("chapter_code"))
+        return rows
+
+    for row in rows:
+        row["chapter_name"] = (row.get("icd_chapters") or {}).get("chapter_name")
+    return rows
+
+
+def _other_disease(relationship: dict, disease_id: int) -> dict:
+    """Get the embedded disease on the other side of a relationship row."""
+    if relationship["disease_1_id"] == disease_id:
+        return relationship["disease_2"]
+    return relationship["disease_1"]
+
+
+async def _count_past_range(
+    client: AsyncClient, error: APIError, chapter: Optional[str]
+) -> int:
+    """Get the total row count after a PGRST103 out-of-range page.
+
+    Read from the error details when PostgREST reports it, otherwise from a
+    head-only count query (no rows transferred).
+    """
+    match = _RANGE_TOTAL_PATTERN.search(error.details or "")
+    if match:
+        return int(match.group(1))
+
+    query = client.table("diseases").select("id", count="exact", head=True)
+    if chapter:
+        query = query.eq("chapter_code", chapter)
+    response = await query.execute()
+    return response.count or 0
+
+
+def _icd_to_id(request: Request) -> Optional[dict[str, int]]:
+    """Get the ICD code -> id mapping loaded at startup, if available."""
+    return getattr(request.app.state, "icd_to_id", None)
+
+
+def _chapter_names(request: Request) -> Optional[dict[str, str]]:
+    """Get the chapter code -> name mapping loaded at startup, if available."""
+    return getattr(request.app.state, "chapter_names", None)
+
+
+def _disease_select(chapter_names: Optional[dict[str, str]]) -> str:
+    """Select the chapter name embed only when it cannot be looked up locally."""
+    if chapter_names is None:
+        return _DISEASE_SELECT_WITH_CHAPTER
+    return _DISEASE_SELECT
+
+
+async def _fetch_relationships(
+    client: AsyncClient, disease_id: int, min_odds_ratio: float, limit: int
+) -> list[dict]:
+    """Fetch relationships of a disease by internal id, strongest first."""
+    response = await (
+        client.table("disease_relationships")
+        .select(_RELATED_SELECT)
+        .or_(f"disease_1_id.eq.{disease_id},disease_2_id.eq.{disease_id}")
+        .gte("odds_ratio", min_odds_ratio)
+        .order("odds_ratio", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return response.data or []
+
+
+async def _fetch_relationships_by_icd(
+    client: AsyncClient, icd_code: str, min_odds_ratio: float, limit: int
+) -> Optional[tuple[int, list[dict]]]:
+    """Resolve an ICD code and fetch its relationships.
+
+    Uses the get_related_diseases RPC so the ICD lookup and the relationship
+    query share one round-trip. If the RPC has not been deployed yet
+    (scripts/migrations/003_get_related_diseases.sql), falls back to a
+    separate id lookup for the rest of the process lifetime.
+
+    Returns:
+        Tuple of (disease_id, relationship_rows), or None if no disease has
+        the given ICD code
+    """
+    response = await call_optional_rpc(
+        client,
+        "get_related_diseases",
+        {
+            "icd_code": icd_code,
+            "min_odds_ratio": min_odds_ratio,
+            "max_results": limit,
+        },
+        migration="003_get_related_diseases.sql",
+    )
+    if response is not None:
+        if not response.data:
+            return None
+        return response.data["disease_id"], response.data["relationships"]
+
+    disease_response = await (
+        client.table("diseases").select("id").eq("icd_code", icd_code).execute()
+    )
+    if not disease_response.data:
+        return None
+    disease_id = disease_response.data[0]["id"]
+    return disease_id, await _fetch_relationships(
+        client, disease_id, min_odds_ratio, limit
+    )
+
+
+async def _search_rows(client: AsyncClient, search_term: str, limit: int) -> list[dict]:
+    """Find diseases whose names or ICD code contain the search term.
+
+    Uses the search_diseases RPC, which matches each column through trigram indexes and
+    ranks results by similarity. If the RPC has not been deployed yet
+    (scripts/migrations/004_search_diseases_trgm.sql), falls back to ILIKE
+    filters on each column for the rest of the process lifetime.
+
+    Returns:
+        Matching rows with chapter_name flattened
+    """
+    response = await call_optional_rpc(
+        client,
+        "search_diseases",
+        {"term": search_term, "max_results": limit},
+        migration="004_search_diseases_trgm.sql",
+    )
+    if response is not None:
+        return response.data or []
+
+    # Escape special SQL LIKE pattern characters to prevent injection
+    escaped_term = (
+        search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+    # Use safe ilike pattern matching with properly escaped term
+    pattern = f"%{escaped_term}%"
+
+    response = await (
+        client.table("diseases")
+        .select(_DISEASE_SELECT_WITH_CHAPTER)
+        .or_(
+            f"name_english.ilike.{pattern},"
+            f"name_german.ilike.{pattern},"
+            f"icd_code.ilike.{pattern}"
+        )
+        .limit(limit)
+        .execute()
+    )
+    return _with_chapter_name(response.data or [])
 
 
 @router.get("", response_model=DiseaseListResponse)
 @cache_response("diseases_list")
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def list_diseases(
     request: Request,
     chapter: Optional[str] = Query(
@@ -39,66 +225,52 @@ async def list_diseases(
     ),
     limit: int = Query(100, ge=1, le=1000, description="Maximum results to return"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
-    client: AsyncClient = Depends(get_supabase_client),
+    client: AsyncClient = Depends(get_db),
 ):
     """
     Get list of diseases with optional chapter filter.
 
     Returns paginated list of diseases with chapter and limit filters.
     """
-    # Build query
-    query = client.table("diseases").select("*, icd_chapters(chapter_name)")
+    # Build query; PostgREST returns the exact total alongside the page,
+    # so one round-trip serves both rows and count
+    chapter_names = _chapter_names(request)
+    query = client.table("diseases").select(
+        _disease_select(chapter_names), count="exact"
+    )
 
     if chapter:
         query = query.eq("chapter_code", chapter)
 
-    # Execute query with pagination
-    response = await query.range(offset, offset + limit - 1).execute()
+    # Execute query with pagination; with count="exact", PostgREST rejects a
+    # page starting past the last row instead of returning it empty
+    try:
+        response = await query.range(offset, offset + limit - 1).execute()
+    except APIError as e:
+        if e.code != _RANGE_NOT_SATISFIABLE:
+            raise
+        total = await _count_past_range(client, e, chapter)
+        return DiseaseListResponse(diseases=[], total=total)
+    total = response.count if response.count is not None else len(response.data)
 
     if not response.data:
-        return DiseaseListResponse(diseases=[], total=0)
-
-    # Get total count
-    count_query = client.table("diseases").select("id", count="exact")
-    if chapter:
-        count_query = count_query.eq("chapter_code", chapter)
-    count_result = await count_query.execute()
-    total = count_result.count if hasattr(count_result, "count") else len(response.data)
+        return DiseaseListResponse(diseases=[], total=total)
 
     # Transform to response model
-    diseases = []
-    for item in response.data:
-        chapter_name = None
-        if item.get("icd_chapters"):
-            chapter_name = item["icd_chapters"].get("chapter_name")
-
-        diseases.append(
-            DiseaseResponse(
-                id=item["id"],
-                icd_code=item["icd_code"],
-                name_english=item.get("name_english"),
-                name_german=item.get("name_german"),
-                chapter_code=item.get("chapter_code"),
-                chapter_name=chapter_name,
-                prevalence_male=item.get("prevalence_male"),
-                prevalence_female=item.get("prevalence_female"),
-                prevalence_total=item.get("prevalence_total"),
-                vector_x=item.get("vector_x"),
-                vector_y=item.get("vector_y"),
-                vector_z=item.get("vector_z"),
-            )
-        )
+    diseases = _DISEASE_LIST_ADAPTER.validate_python(
+        _with_chapter_name(response.data, chapter_names)
+    )
 
-    return DiseaseListResponse(diseases=diseases, total=total or 0)
+    return DiseaseListResponse(diseases=diseases, total=total)
 
 
 @router.get("/{disease_id}", response_model=DiseaseResponse)
 @cache_response("disease_detail")
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def get_disease(
     request: Request,
     disease_id: str,
-    client: AsyncClient = Depends(get_supabase_client),
+    client: AsyncClient = Depends(get_db),
 ):
     """
     Get single disease by ID or ICD code.
@@ -107,12 +279,22 @@ async def get_disease(
         disease_id: Numeric ID or ICD code (e.g., 'E11', 'I10')
     """
     # Try to query by ID if numeric, otherwise by ICD code
-    query = client.table("diseases").select("*, icd_chapters(chapter_name)")
+    chapter_names = _chapter_names(request)
+    query = client.table("diseases").select(_disease_select(chapter_names))
 
     if disease_id.isdigit():
         query = query.eq("id", int(disease_id))
     else:
-        query = query.eq("icd_code", disease_id)
+        icd_to_id = _icd_to_id(request)
+        if icd_to_id is None:
+            query = query.eq("icd_code", disease_id)
+        elif disease_id in icd_to_id:
+            query = query.eq("id", icd_to_id[disease_id])
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Disease not found: {disease_id}",
+            )
 
     response = await query.execute()
 
@@ -122,36 +304,19 @@ async def get_disease(
             detail=f"Disease not found: {disease_id}",
         )
 
-    item = response.data[0]
-    chapter_name = None
-    if item.get("icd_chapters"):
-        chapter_name = item["icd_chapters"].get("chapter_name")
-
-    return DiseaseResponse(
-        id=item["id"],
-        icd_code=item["icd_code"],
-        name_english=item.get("name_english"),
-        name_german=item.get("name_german"),
-        chapter_code=item.get("chapter_code"),
-        chapter_name=chapter_name,
-        prevalence_male=item.get("prevalence_male"),
-        prevalence_female=item.get("prevalence_female"),
-        prevalence_total=item.get("prevalence_total"),
-        vector_x=item.get("vector_x"),
-        vector_y=item.get("vector_y"),
-        vector_z=item.get("vector_z"),
-    )
+    item = _with_chapter_name(response.data[:1], chapter_names)[0]
+    return DiseaseResponse.model_validate(item)
 
 
 @router.get("/{disease_id}/related", response_model=list[RelatedDiseaseResponse])
 @cache_response("disease_related")
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def get_related_diseases(
     request: Request,
     disease_id: str,
     limit: int = Query(50, ge=1, le=1000, description="Maximum results"),
     min_odds_ratio: float = Query(1.5, gt=0, description="Minimum odds ratio"),
-    client: AsyncClient = Depends(get_supabase_client),
+    client: AsyncClient = Depends(get_db),
 ):
     """
     Get diseases related to specified disease, ordered by odds ratio.
@@ -161,75 +326,49 @@ async def get_related_diseases(
         limit: Maximum number of results
         min_odds_ratio: Minimum odds ratio threshold
     """
-    # First get the disease ID if ICD code provided
-    if not disease_id.isdigit():
-        disease_response = await (
-            client.table("diseases").select("id").eq("icd_code", disease_id).execute()
-        )
-        if not disease_response.data:
+    icd_to_id = _icd_to_id(request)
+
+    if disease_id.isdigit():
+        disease_id_int = int(disease_id)
+        rows = await _fetch_relationships(client, disease_id_int, min_odds_ratio, limit)
+    elif icd_to_id is not None:
+        if disease_id not in icd_to_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Disease not found: {disease_id}",
             )
-        disease_id_int = disease_response.data[0]["id"]
+        disease_id_int = icd_to_id[disease_id]
+        rows = await _fetch_relationships(client, disease_id_int, min_odds_ratio, limit)
     else:
-        disease_id_int = int(disease_id)
-
-    # Query relationships
-    response = await (
-        client.table("disease_relationships")
-        .select("""
-            *,
-            disease_1:disease_1_id(
-                id, icd_code, name_english, name_german, chapter_code
-            ),
-            disease_2:disease_2_id(
-                id, icd_code, name_english, name_german, chapter_code
+        resolved = await _fetch_relationships_by_icd(
+            client, disease_id, min_odds_ratio, limit
+        )
+        if resolved is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Disease not found: {disease_id}",
             )
-        """)
-        .or_(f"disease_1_id.eq.{disease_id_int},disease_2_id.eq.{disease_id_int}")
-        .gte("odds_ratio", min_odds_ratio)
-        .order("odds_ratio", desc=True)
-        .limit(limit)
-        .execute()
-    )
+        disease_id_int, rows = resolved
 
-    if not response.data:
+    if not rows:
         return []
 
-    # Transform to response model
-    related = []
-    for item in response.data:
-        # Determine which disease is the related one
-        if item["disease_1_id"] == disease_id_int:
-            related_disease = item["disease_2"]
-        else:
-            related_disease = item["disease_1"]
-
-        related.append(
-            RelatedDiseaseResponse(
-                id=related_disease["id"],
-                icd_code=related_disease["icd_code"],
-                name_english=related_disease.get("name_english"),
-                name_german=related_disease.get("name_german"),
-                chapter_code=related_disease.get("chapter_code"),
-                odds_ratio=item["odds_ratio"],
-                p_value=item.get("p_value"),
-                relationship_strength=item.get("relationship_strength"),
-                patient_count_total=item.get("patient_count_total"),
-            )
-        )
+    # Transform to response model: the related disease's columns override
+    # the relationship row's own id, alongside the relationship metrics
+    related = _RELATED_LIST_ADAPTER.validate_python(
+        [{**item, **_other_disease(item, disease_id_int)} for item in rows]
+    )
 
     return related
 
 
 @router.get("/search/{search_term}", response_model=list[SearchResultResponse])
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def search_diseases(
     request: Request,
     search_term: str,
     limit: int = Query(20, ge=1, le=100, description="Maximum results"),
-    client: AsyncClient = Depends(get_supabase_client),
+    client: AsyncClient = Depends(get_db),
 ):
     """
     Search diseases by name or ICD code.
@@ -246,47 +385,12 @@ async def search_diseases(
             detail=error_msg,
         )
 
-    # Escape special SQL LIKE pattern characters to prevent injection
-    escaped_term = (
-        search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-    )
+    rows = await _search_rows(client, search_term, limit)
 
-    # Use safe ilike pattern matching with properly escaped term
-    # The ilike_any_of pattern format: {pattern1,pattern2,pattern3}
-    pattern = f"%{escaped_term}%"
-
-    response = await (
-        client.table("diseases")
-        .select("*, icd_chapters(chapter_name)")
-        .or_(
-            f"name_english.ilike.{pattern},"
-            f"name_german.ilike.{pattern},"
-            f"icd_code.ilike.{pattern}"
-        )
-        .limit(limit)
-        .execute()
-    )
-
-    if not response.data:
+    if not rows:
         return []
 
     # Transform to response model
-    results = []
-    for item in response.data:
-        chapter_name = None
-        if item.get("icd_chapters"):
-            chapter_name = item["icd_chapters"].get("chapter_name")
-
-        results.append(
-            SearchResultResponse(
-                id=item["id"],
-                icd_code=item["icd_code"],
-                name_english=item.get("name_english"),
-                name_german=item.get("name_german"),
-                chapter_code=item.get("chapter_code"),
-                chapter_name=chapter_name,
-                prevalence_total=item.get("prevalence_total"),
-            )
-        )
+    results = _SEARCH_LIST_ADAPTER.validate_python(rows)
 
     return results
@@ -5,23 +5,28 @@ Provides API health status and database connectivity checks.
 Uses actual database queries to verify connectivity rather than hardcoded values.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
 from supabase import AsyncClient
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 import time
 
-from api.config import get_settings
-from api.dependencies import get_supabase_client
-from api.rate_limit import limiter, get_rate_limit_string
+from api.config import get_runtime_settings, get_settings
+from api.dependencies import (
+    call_optional_rpc,
+    get_db,
+    get_index_check_result,
+    get_pg_pool,
+    require_internal_key,
+)
+from api.rate_limit import RATE_LIMIT_STRING, limiter
+from api.responses import json_bytes_response, prerender_json
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["health"])
 
-# Get rate limit string for decorators
-_rate_limit = get_rate_limit_string()
-
 
 class HealthResponse(BaseModel):
     """Health check response model."""
@@ -40,14 +45,155 @@ class HealthCheckResult(BaseModel):
     checks: Dict[str, Any]
 
 
+class IndexCheckResponse(BaseModel):
+    """Database index verification result.
+
+    all_present is None while no index check has succeeded, so indexes
+    nobody verified are not reported as present.
+    """
+
+    all_present: Optional[bool]
+    missing: List[str]
+
+
 # Track server start time for uptime calculation
 _server_start_time = time.time()
 
+# Resolved once at import: probes run every few seconds per pod
+_settings = get_runtime_settings()
+_pg_acquire_timeout = get_settings().pg_acquire_timeout
+
+# One round-trip over the asyncpg pool; EXISTS stops at the first row, so it
+# distinguishes an empty database without reading any data
+_DB_CHECK_QUERY = "SELECT EXISTS (SELECT 1 FROM diseases)"
+
+# Constant probe bodies, serialized once
+_READY_BODY = prerender_json({"status": "ready"})
+_LIVE_BODY = prerender_json({"status": "alive"})
+
+
+def _iso_now() -> str:
+    """Current UTC time as an ISO 8601 string with second precision.
+
+    Formats straight from time.gmtime, skipping the datetime allocation and
+    timezone conversion of datetime.now(timezone.utc).isoformat().
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+# Last database connectivity result and when it was taken (monotonic clock)
+_db_check_status: Optional[str] = None
+_db_check_time = 0.0
+
+# Last successful ("connected"/"empty") result, served while checks fail
+_db_ok_status: Optional[str] = None
+_db_ok_time = 0.0
+
+# Seconds a successful result may stand in for failing checks; after that
+# the failure is reported so a real outage takes the pod out of service
+_STALE_RESULT_MAX_AGE = 30.0
+
+# Serializes connectivity queries so concurrent probes wait for one result
+_db_check_lock = asyncio.Lock()
+
+
+def _cached_db_status() -> Optional[str]:
+    """Get the last connectivity result if it is still fresh."""
+    if time.monotonic() - _db_check_time < _settings.health_check_cache_ttl:
+        return _db_check_status
+    return None
+
 
 async def _check_database_connectivity(supabase: AsyncClient) -> str:
+    """Check database connectivity, reusing a recent result.
+
+    Results are reused for health_check_cache_ttl seconds, and requests
+    arriving while a check is in flight wait for it instead of issuing
+    their own query, so bursts of probes cost a single round-trip.
+
+    Used by /health, /health/detailed and /ready; the /live probe never
+    touches the database.
+
+    Args:
+        supabase: Supabase async client
+
+    Returns:
+        "connected", "empty" or "disconnected"
+        (see _query_database_connectivity)
+    """
+    global _db_check_status, _db_check_time
+
+    if _settings.health_check_cache_ttl <= 0:
+        return await _refresh_database_connectivity(supabase)
+
+    db_status = _cached_db_status()
+    if db_status is not None:
+        return db_status
+
+    async with _db_check_lock:
+        # Another request may have refreshed the result while this one waited
+        db_status = _cached_db_status()
+        if db_status is None:
+            db_status = await _refresh_database_connectivity(supabase)
+            _db_check_status = db_status
+            _db_check_time = time.monotonic()
+
+    return db_status
+
+
+async def _refresh_database_connectivity(supabase: AsyncClient) -> str:
+    """Query connectivity, serving the last good result on a failed check.
+
+    A single timeout or dropped connection should not fail readiness and
+    flap the pod out of service, so a failed check reports the last
+    successful result for up to _STALE_RESULT_MAX_AGE seconds.
+    """
+    global _db_ok_status, _db_ok_time
+
+    db_status = await _query_database_connectivity(supabase)
+    now = time.monotonic()
+
+    if db_status != "disconnected":
+        _db_ok_status = db_status
+        _db_ok_time = now
+    elif _db_ok_status is not None and now - _db_ok_time < _STALE_RESULT_MAX_AGE:
+        logger.debug("Database check failed, serving last successful result")
+        db_status = _db_ok_status
+
+    return db_status
+
+
+async def _database_has_data(supabase: AsyncClient) -> bool:
+    """Run the connectivity query and report whether diseases has rows.
+
+    Uses a pooled asyncpg connection when SUPABASE_DB_URL is configured,
+    which skips PostgREST's HTTP and JSON round-trip; otherwise calls the
+    connectivity_check RPC, which runs the same EXISTS query. If the RPC has
+    not been deployed yet (scripts/migrations/007_connectivity_check.sql),
+    falls back to fetching a single row.
+    """
+    pool = get_pg_pool()
+    if pool is not None:
+        async with pool.acquire(timeout=_pg_acquire_timeout) as conn:
+            return bool(await conn.fetchval(_DB_CHECK_QUERY))
+
+    result = await call_optional_rpc(
+        supabase, "connectivity_check", migration="007_connectivity_check.sql"
+    )
+    if result is not None:
+        return bool(result.data)
+
+    # Simple query to check if database is reachable
+    # Using limit(1) to minimize data transfer
+    result = await supabase.table("diseases").select("icd_code").limit(1).execute()
+    return bool(result.data)
+
+
+async def _query_database_connectivity(supabase: AsyncClient) -> str:
     """Check database connectivity with a simple query.
 
-    Performs a lightweight query to verify the database is accessible.
+    The query is bounded by health_check_timeout, so a slow database
+    cannot hold a probe past the orchestrator's own probe timeout.
     Does not expose any sensitive information on failure.
 
     Args:
@@ -59,19 +205,23 @@ async def _check_database_connectivity(supabase: AsyncClient) -> str:
         "disconnected" if database is not accessible
     """
     try:
-        # Simple query to check if database is reachable
-        # Using limit(1) to minimize data transfer
-        result = await supabase.table("diseases").select("icd_code").limit(1).execute()
-
-        if result.data:
-            return "connected"
-        else:
-            return "empty"
+        has_data = await asyncio.wait_for(
+            _database_has_data(supabase), timeout=_settings.health_check_timeout
+        )
+    except asyncio.TimeoutError:
+        # Transient under load; logged quietly to keep probe noise down
+        logger.debug("Database connectivity check timed out")
+        return "disconnected"
     except Exception as e:
         # Log the error for debugging but don't expose details to client
         logger.warning(f"Database connectivity check failed: {e}")
         return "disconnected"
 
+    if has_data:
+        return "connected"
+    else:
+        return "empty"
+
 
 @router.get(
     "/health",
@@ -83,10 +233,10 @@ async def _check_database_connectivity(supabase: AsyncClient) -> str:
         503: {"description": "API is unhealthy or database disconnected"},
     },
 )
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def health_check(
     request: Request,
-    supabase: AsyncClient = Depends(get_supabase_client),
+    supabase: AsyncClient = Depends(get_db),
 ) -> HealthResponse:
     """Get API health status.
 
@@ -109,9 +259,6 @@ async def health_check(
             "uptime_seconds": 3600
         }
     """
-    from datetime import datetime, timezone
-
-    settings = get_settings()
     uptime = time.time() - _server_start_time
 
     # Verify database connectivity with a simple query
@@ -123,17 +270,17 @@ async def health_check(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={
                 "status": "unhealthy",
-                "version": settings.app_version,
+                "version": _settings.app_version,
                 "database": db_status,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": _iso_now(),
             },
         )
 
     return HealthResponse(
         status="healthy",
-        version=settings.app_version,
+        version=_settings.app_version,
         database=db_status,
-        timestamp=datetime.now(timezone.utc).isoformat(),
+        timestamp=_iso_now(),
         uptime_seconds=round(uptime, 2),
     )
 
@@ -145,15 +292,19 @@ async def health_check(
     description="Returns detailed health information including all component checks.",
     include_in_schema=False,  # Hide from public docs (internal use)
 )
-@limiter.limit(_rate_limit)
+@limiter.limit(RATE_LIMIT_STRING)
 async def health_check_detailed(
     request: Request,
-    supabase: AsyncClient = Depends(get_supabase_client),
+    supabase: AsyncClient = Depends(get_db),
+    _: None = Depends(require_internal_key),
 ) -> HealthCheckResult:
     """Get detailed health status for monitoring.
 
     Returns comprehensive health information for monitoring systems.
     Includes individual component status checks with actual database verification.
+    Requires the X-Internal-Key header when INTERNAL_METRICS_KEY is set. The
+    database result is shared with /health and /ready through the
+    connectivity check cache, so this does not add a query of its own.
 
     Returns:
         HealthCheckResult with detailed status
@@ -161,18 +312,15 @@ async def health_check_detailed(
     Raises:
         HTTPException: If critical components are unhealthy (503)
     """
-    from datetime import datetime, timezone
-
-    settings = get_settings()
     checks = {}
 
     # Check API configuration
     try:
         checks["config"] = {
             "status": "ok",
-            "app_name": settings.app_name,
-            "version": settings.app_version,
-            "debug_mode": settings.debug,
+            "app_name": _settings.app_name,
+            "version": _settings.app_version,
+            "debug_mode": _settings.debug,
         }
     except Exception as e:
         logger.error(f"Configuration check failed: {e}")
@@ -203,8 +351,12 @@ async def health_check_detailed(
             "message": "Database connection failed",
         }
 
-    # Determine overall status
-    all_ok = all(check.get("status") == "ok" for check in checks.values())
+    # Determine overall status (every check above sets "status")
+    all_ok = True
+    for check in checks.values():
+        if check["status"] != "ok":
+            all_ok = False
+            break
     overall_status = "healthy" if all_ok else "unhealthy"
 
     if not all_ok:
@@ -213,13 +365,45 @@ async def health_check_detailed(
             detail={
                 "status": overall_status,
                 "checks": checks,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": _iso_now(),
             },
         )
 
     return HealthCheckResult(status=overall_status, checks=checks)
 
 
+@router.get(
+    "/health/indexes",
+    response_model=IndexCheckResponse,
+    summary="Database index check",
+    description="Returns the cached result of the required database index check.",
+    include_in_schema=False,  # Hide from public docs (internal use)
+)
+@limiter.limit(RATE_LIMIT_STRING)
+async def index_check(
+    request: Request,
+    _: None = Depends(require_internal_key),
+) -> IndexCheckResponse:
+    """Get the required database index verification result.
+
+    Reports the memoized verdict of the startup check (enabled with
+    VERIFY_INDEXES_ON_STARTUP) without querying the database. Until a check
+    has succeeded, all_present is null: a skipped or failed check (e.g.
+    migration 002 not applied) verified nothing. Requires the
+    X-Internal-Key header when INTERNAL_METRICS_KEY is set, since the
+    response names tables and indexes.
+
+    Returns:
+        IndexCheckResponse with the list of missing indexes
+    """
+    result = get_index_check_result()
+    if result is None:
+        return IndexCheckResponse(all_present=None, missing=[])
+
+    all_present, missing = result
+    return IndexCheckResponse(all_present=all_present, missing=missing)
+
+
 @router.get(
     "/ready",
     summary="Readiness probe",
@@ -229,11 +413,14 @@ async def health_check_detailed(
         503: {"description": "Service is not ready"},
     },
 )
-@limiter.limit(_rate_limit)
+# Probes are exempt from the per-minute limit: orchestrators poll them from a
+# shared node address, and a throttled probe takes a healthy pod out of
+# service. BurstLimitMiddleware still rejects floods.
+@limiter.exempt
 async def readiness_check(
     request: Request,
-    supabase: AsyncClient = Depends(get_supabase_client),
-) -> Dict[str, str]:
+    supabase: AsyncClient = Depends(get_db),
+) -> Response:
     """Readiness probe for container orchestration.
 
     Returns 200 when the service is ready to accept traffic
@@ -241,7 +428,7 @@ async def readiness_check(
     Returns 503 when it's not ready (e.g., database unavailable).
 
     Returns:
-        Dict with status
+        Pre-serialized {"status": "ready"} response
     """
     # Check database connectivity for readiness
     db_status = await _check_database_connectivity(supabase)
@@ -252,7 +439,7 @@ async def readiness_check(
             detail={"status": "not_ready", "reason": "database_unavailable"},
         )
 
-    return {"status": "ready"}
+    return json_bytes_response(_READY_BODY)
 
 
 @router.get(
@@ -264,14 +451,19 @@ async def readiness_check(
         503: {"description": "Service is not alive (should be restarted)"},
     },
 )
-@limiter.limit(_rate_limit)
-async def liveness_check(request: Request) -> Dict[str, str]:
+@limiter.exempt
+async def liveness_check(request: Request) -> Response:
     """Liveness probe for container orchestration.
 
     Returns 200 when the service is alive and should not be restarted,
     503 when it's dead/unhealthy and should be restarted.
 
+    It depends on nothing external (no database, no rate limit counters), so
+    a slow dependency can never make the orchestrator restart a healthy pod.
+    GET requests are answered by FastPathMiddleware before reaching this
+    route; it remains for the API docs and for other entry points.
+
     Returns:
-        Dict with status
+        Pre-serialized {"status": "alive"} response
     """
-    return {"status": "alive"}
+    return json_bytes_response(_LIVE_BODY)
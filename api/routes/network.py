@@ -7,13 +7,17 @@ GET endpoint for network data visualization.
 Agent 1: Added response caching for GET endpoint.
 """
 
+import asyncio
+import logging
+import time
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
 from supabase import AsyncClient
 
-from api.dependencies import get_supabase_client
-from api.rate_limit import limiter, get_rate_limit_string
+from api.dependencies import call_optional_rpc, get_db
+from api.rate_limit import RATE_LIMIT_STRING, limiter
 from api.schemas.network import (
     NetworkEdge,
     NetworkMetadata,
@@ -22,32 +26,112 @@ from api.schemas.network import (
 )
 from api.services.cache import cache_response
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/network", tags=["network"])
 
-# Get rate limit string for decorators
-_rate_limit = get_rate_limit_string()
+# Node and edge lists are validated in one pydantic-core pass each; node rows
+# already carry the model's field names
+_NODE_LIST_ADAPTER = TypeAdapter(list[NetworkNode])
+_EDGE_LIST_ADAPTER = TypeAdapter(list[NetworkEdge])
 
+# Last data version read for ETags, reused until _data_version_expires
+# (_DATA_VERSION_TTL seconds, or _DATA_VERSION_RETRY after a failed read)
+_DATA_VERSION_TTL = 60.0
+_DATA_VERSION_RETRY = 5.0
+_data_version: Optional[str] = None
+_data_version_expires = 0.0
 
-@router.get("", response_model=NetworkResponse)
-@cache_response("network")
-@limiter.limit(_rate_limit)
-async def get_network(
-    request: Request,
-    min_odds_ratio: float = Query(
-        1.5, gt=0, description="Minimum odds ratio for edges"
-    ),
-    max_edges: Optional[int] = Query(
-        None, ge=1, le=10000, description="Maximum edges to return"
-    ),
-    chapter_filter: Optional[str] = Query(None, description="Filter by ICD chapter"),
-    client: AsyncClient = Depends(get_supabase_client),
-):
-    """
-    Get network data with nodes and edges for visualization.
+# Lets concurrent requests share one refresh of an expired version
+_data_version_lock = asyncio.Lock()
 
-    Returns complete network data including disease nodes with 3D coordinates
-    and edges representing comorbidity relationships.
+
+def _edge_fields(item: dict) -> dict:
+    """Flatten an edge row's embedded diseases into NetworkEdge fields.
+
+    The row's own columns are already aliased to the model's field names by
+    the select, so only the four embedded values are copied, in place.
     """
+    disease_1 = item.get("disease_1") or {}
+    disease_2 = item.get("disease_2") or {}
+    item["source_icd"] = disease_1.get("icd_code", "")
+    item["target_icd"] = disease_2.get("icd_code", "")
+    item["source_name"] = disease_1.get("name_english")
+    item["target_name"] = disease_2.get("name_english")
+    return item
+
+
+async def _network_data_version(request: Request) -> Optional[str]:
+    """Get the version of the network data, for the response ETag.
+
+    A counter bumped by triggers on every write to diseases and
+    disease_relationships, read through the network_data_version RPC and
+    reused for _DATA_VERSION_TTL seconds, so revalidations cost at most one
+    small query a minute. Returns None (body-hash ETags only) if the RPC has
+    not been deployed yet (scripts/migrations/006_network_data_version.sql)
+    or cannot be read; a failed read must not fail requests that a cached
+    body can still answer, so it is only retried after _DATA_VERSION_RETRY
+    seconds.
+    """
+    global _data_version, _data_version_expires
+
+    if time.monotonic() < _data_version_expires:
+        return _data_version
+
+    async with _data_version_lock:
+        # Another request may have refreshed the version while this one waited
+        now = time.monotonic()
+        if now < _data_version_expires:
+            return _data_version
+
+        try:
+            client = await get_db(request)
+            response = await call_optional_rpc(
+                client,
+                "network_data_version",
+                migration="006_network_data_version.sql",
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read the network data version: {e}")
+            _data_version = None
+            _data_version_expires = now + _DATA_VERSION_RETRY
+            return None
+
+        _data_version = str(response.data) if response is not None else None
+        _data_version_expires = now + _DATA_VERSION_TTL
+        return _data_version
+
+
+async def _fetch_network(
+    client: AsyncClient,
+    min_odds_ratio: float,
+    max_edges: Optional[int],
+    chapter_filter: Optional[str],
+) -> tuple[list[dict], list[dict]]:
+    """Fetch node and edge rows in NetworkNode / NetworkEdge shape.
+
+    Uses the network_snapshot RPC so nodes and edges come back in one
+    round-trip, already flattened. If the RPC has not been deployed yet
+    (scripts/migrations/005_network_snapshot.sql), falls back to concurrent
+    node and edge queries for the rest of the process lifetime.
+
+    Returns:
+        Tuple of (node_rows, edge_rows)
+    """
+    response = await call_optional_rpc(
+        client,
+        "network_snapshot",
+        {
+            "min_odds_ratio": min_odds_ratio,
+            "max_edges": max_edges,
+            "chapter": chapter_filter,
+        },
+        migration="005_network_snapshot.sql",
+    )
+    if response is not None:
+        snapshot = response.data or {}
+        return snapshot.get("nodes") or [], snapshot.get("edges") or []
+
     # Build nodes query
     nodes_query = client.table("diseases").select(
         "id, icd_code, name_english, name_german, chapter_code, "
@@ -58,26 +142,12 @@ async def get_network(
     if chapter_filter:
         nodes_query = nodes_query.eq("chapter_code", chapter_filter)
 
-    nodes_response = await nodes_query.execute()
-
-    if not nodes_response.data:
-        return NetworkResponse(
-            nodes=[],
-            edges=[],
-            metadata=NetworkMetadata(
-                min_odds_ratio=min_odds_ratio,
-                chapter_filter=chapter_filter,
-                total_nodes=0,
-                total_edges=0,
-            ),
-        )
-
     # Build edges query
     edges_query = (
         client.table("disease_relationships")
         .select("""
-            disease_1_id,
-            disease_2_id,
+            source:disease_1_id,
+            target:disease_2_id,
             odds_ratio,
             p_value,
             relationship_strength,
@@ -98,46 +168,61 @@ async def get_network(
     if max_edges:
         edges_query = edges_query.limit(max_edges)
 
-    edges_response = await edges_query.execute()
-
-    # Transform nodes
-    nodes = []
-    for item in nodes_response.data:
-        nodes.append(
-            NetworkNode(
-                id=item["id"],
-                icd_code=item["icd_code"],
-                name_english=item.get("name_english"),
-                name_german=item.get("name_german"),
-                chapter_code=item.get("chapter_code"),
-                vector_x=item.get("vector_x"),
-                vector_y=item.get("vector_y"),
-                vector_z=item.get("vector_z"),
-                prevalence_total=item.get("prevalence_total"),
-            )
+    # The queries are independent, so both round-trips run at once; when no
+    # nodes match, the caller discards the edges
+    nodes_response, edges_response = await asyncio.gather(
+        nodes_query.execute(), edges_query.execute()
+    )
+    return nodes_response.data or [], [
+        _edge_fields(item) for item in edges_response.data or []
+    ]
+
+
+# The response is built internally from typed models, so FastAPI's response
+# validation pass is skipped; the model is kept for the OpenAPI docs only
+@router.get(
+    "",
+    response_model=None,
+    responses={200: {"model": NetworkResponse}},
+)
+@cache_response("network", data_version=_network_data_version)
+@limiter.limit(RATE_LIMIT_STRING)
+async def get_network(
+    request: Request,
+    min_odds_ratio: float = Query(
+        1.5, gt=0, description="Minimum odds ratio for edges"
+    ),
+    max_edges: Optional[int] = Query(
+        None, ge=1, le=10000, description="Maximum edges to return"
+    ),
+    chapter_filter: Optional[str] = Query(None, description="Filter by ICD chapter"),
+    client: AsyncClient = Depends(get_db),
+):
+    """
+    Get network data with nodes and edges for visualization.
+
+    Returns complete network data including disease nodes with 3D coordinates
+    and edges representing comorbidity relationships.
+    """
+    node_rows, edge_rows = await _fetch_network(
+        client, min_odds_ratio, max_edges, chapter_filter
+    )
+
+    if not node_rows:
+        return NetworkResponse(
+            nodes=[],
+            edges=[],
+            metadata=NetworkMetadata(
+                min_odds_ratio=min_odds_ratio,
+                chapter_filter=chapter_filter,
+                total_nodes=0,
+                total_edges=0,
+            ),
         )
 
-    # Transform edges
-    edges = []
-    if edges_response.data:
-        for item in edges_response.data:
-            disease_1 = item.get("disease_1", {})
-            disease_2 = item.get("disease_2", {})
-
-            edges.append(
-                NetworkEdge(
-                    source=item["disease_1_id"],
-                    target=item["disease_2_id"],
-                    source_icd=disease_1.get("icd_code", ""),
-                    target_icd=disease_2.get("icd_code", ""),
-                    source_name=disease_1.get("name_english"),
-                    target_name=disease_2.get("name_english"),
-                    odds_ratio=item["odds_ratio"],
-                    p_value=item.get("p_value"),
-                    relationship_strength=item.get("relationship_strength"),
-                    patient_count_total=item.get("patient_count_total"),
-                )
-            )
+    # Transform to response models
+    nodes = _NODE_LIST_ADAPTER.validate_python(node_rows)
+    edges = _EDGE_LIST_ADAPTER.validate_python(edge_rows)
 
     return NetworkResponse(
         nodes=nodes,
@@ -5,6 +5,14 @@ Agent 2: GET Endpoints Implementation
 Exports all Pydantic schemas for request/response models.
 """
 
+from api.schemas.calculate import (
+    PullVector,
+    RiskCalculationRequest,
+    RiskCalculationResponse,
+    RiskJobResponse,
+    RiskScore,
+    UserPosition,
+)
 from api.schemas.diseases import (
     ChapterResponse,
     DiseaseListResponse,
@@ -29,4 +37,10 @@ __all__ = [
     "NetworkEdge",
     "NetworkMetadata",
     "NetworkResponse",
+    "RiskCalculationRequest",
+    "RiskScore",
+    "PullVector",
+    "UserPosition",
+    "RiskCalculationResponse",
+    "RiskJobResponse",
 ]
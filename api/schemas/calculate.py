@@ -1,13 +1,19 @@
 """
 Risk Calculation API Schemas
 
-Pydantic models for the POST /api/calculate-risk endpoint.
+Pydantic models for the POST /api/calculate-risk endpoint and its
+background job variant.
 Defines request and response validation schemas with examples.
 """
 
-from typing import Literal, List
+import re
+from typing import Literal, List, Optional
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
+# Loose ICD code shape for condition lists: a letter, then 1-7 letters,
+# digits or dots (2-8 characters in total)
+_CONDITION_CODE_PATTERN = re.compile(r"[A-Za-z][0-9A-Za-z.]{1,7}")
+
 
 class RiskCalculationRequest(BaseModel):
     """Request model for risk calculation endpoint.
@@ -33,18 +39,22 @@ class RiskCalculationRequest(BaseModel):
     @field_validator("existing_conditions")
     @classmethod
     def validate_icd_codes(cls, v: List[str]) -> List[str]:
-        """Validate that ICD codes are properly formatted."""
+        """Validate that ICD codes are properly formatted.
+
+        Duplicate codes are dropped (keeping the first occurrence), so the
+        risk calculation never looks up the same condition twice.
+        """
         if not v:
             raise ValueError("At least one existing condition is required")
 
-        for code in v:
-            if not code or not isinstance(code, str):
-                raise ValueError(f"Invalid ICD code: {code}")
-            # Basic ICD format validation (alphanumeric, 3-7 chars)
-            if len(code) < 2 or len(code) > 8:
-                raise ValueError(f"ICD code {code} must be 2-8 characters")
+        invalid = [code for code in v if not _CONDITION_CODE_PATTERN.fullmatch(code)]
+        if invalid:
+            raise ValueError(
+                f"Invalid ICD code(s): {', '.join(invalid)}. ICD codes must be "
+                "2-8 characters: a letter followed by letters, digits or dots"
+            )
 
-        return v
+        return list(dict.fromkeys(v))
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -202,3 +212,33 @@ class RiskCalculationResponse(BaseModel):
             }
         }
     )
+
+
+class RiskJobResponse(BaseModel):
+    """Status of a background risk calculation job.
+
+    Returned with 202 when a job is submitted, and by the poll endpoint
+    until the job completes or fails.
+    """
+
+    job_id: str = Field(description="Identifier to poll the job with")
+    status: Literal["pending", "running", "completed", "failed"] = Field(
+        description="Current job state"
+    )
+    result: Optional[RiskCalculationResponse] = Field(
+        default=None, description="Calculation result once completed"
+    )
+    error: Optional[str] = Field(
+        default=None, description="Error message if the job failed"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "job_id": "6f1c2b0e9a4d4a7f8f3e2d1c0b9a8f7e",
+                "status": "pending",
+                "result": None,
+                "error": None,
+            }
+        }
+    )
@@ -3,51 +3,107 @@ Response Caching Service
 
 Agent 1: Response Caching Implementation
 Provides in-memory TTL-based caching for GET endpoints with ETag support.
+Cached responses are stored as serialized JSON plus a gzipped copy, so hits
+are served without re-serializing or compressing anything.
 """
 
+import gzip
 import hashlib
-import json
 import threading
 import time
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
+import orjson
 from cachetools import TTLCache
 from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from pydantic_core import to_json
 
-from api.config import get_settings
+from api.config import get_runtime_settings, get_settings
+from api.responses import json_bytes_response, prerender_json
+
+# Entry ages are measured on the monotonic clock in integer nanoseconds, so
+# wall-clock adjustments cannot make an entry look older or younger
+_now_ns = time.monotonic_ns
+_NS_PER_SECOND = 1_000_000_000
 
 
 class CacheEntry:
-    """Represents a cached response with metadata."""
+    """Represents a cached response with metadata.
+
+    body holds the serialized JSON response; gzip_body holds its gzipped
+    form when the body is large enough to be worth compressing. Slotted, as
+    one instance exists per cached path and query string. created_at is a
+    time.monotonic_ns() reading.
+    """
 
-    def __init__(self, data: Any, etag: str, created_at: float, ttl: int):
+    __slots__ = ("data", "etag", "created_at", "ttl", "body", "gzip_body")
+
+    def __init__(
+        self,
+        data: Any,
+        etag: str,
+        created_at: int,
+        ttl: int,
+        body: bytes = b"",
+        gzip_body: Optional[bytes] = None,
+    ):
         self.data = data
         self.etag = etag
         self.created_at = created_at
         self.ttl = ttl
+        self.body = body
+        self.gzip_body = gzip_body
 
     @property
     def age(self) -> int:
         """Get the age of the cache entry in seconds."""
-        return int(time.time() - self.created_at)
+        return (_now_ns() - self.created_at) // _NS_PER_SECOND
 
     @property
     def max_age(self) -> int:
         """Get remaining max-age for Cache-Control header."""
-        remaining = self.ttl - self.age
+        remaining = self.ttl - (_now_ns() - self.created_at) // _NS_PER_SECOND
         return max(0, remaining)
 
 
+def serialize_body(data: Any) -> bytes:
+    """Serialize response data to compact JSON bytes.
+
+    Pydantic models (and lists of them) are dumped by pydantic-core in one
+    pass, which is an order of magnitude faster than walking them with
+    jsonable_encoder; anything else goes through jsonable_encoder and orjson.
+    Both produce identical bytes for model data.
+
+    Args:
+        data: Response data returned by a route
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if isinstance(data, BaseModel) or (
+        isinstance(data, list) and all(isinstance(item, BaseModel) for item in data)
+    ):
+        return to_json(data)
+    return prerender_json(jsonable_encoder(data))
+
+
 class ResponseCache:
-    """Thread-safe response cache with TTL support.
+    """Response cache with TTL support.
 
     Provides caching for FastAPI route responses with:
     - TTL-based expiration
     - ETag generation and validation
     - Cache-Control header support
-    - Thread-safe operations
+
+    Instances are event-loop-only: every method must be called from the
+    thread running the event loop (cache_response, clear_all_caches and
+    get_all_cache_stats all are). No method awaits while touching the
+    TTLCache, expiry included, so requests cannot interleave and the cache
+    needs no lock of its own. The class-level lock only guards the instance
+    registry.
     """
 
     _instances: dict[str, "ResponseCache"] = {}
@@ -65,7 +121,6 @@ class ResponseCache:
         self.ttl = ttl
         self.maxsize = maxsize
         self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
-        self._lock = threading.Lock()
 
     @classmethod
     def get_instance(cls, name: str, ttl: int, maxsize: int = 1000) -> "ResponseCache":
@@ -79,6 +134,12 @@ class ResponseCache:
         Returns:
             ResponseCache instance
         """
+        # Dict reads are atomic, so existing instances are returned without
+        # taking the lock; only creation is serialized
+        instance = cls._instances.get(name)
+        if instance is not None:
+            return instance
+
         with cls._lock:
             if name not in cls._instances:
                 cls._instances[name] = cls(name, ttl, maxsize)
@@ -94,28 +155,41 @@ class ResponseCache:
         Returns:
             Unique cache key string
         """
-        # Sort params for consistent key generation
-        sorted_params = sorted(params.items()) if params else []
-        key_data = f"{path}:{json.dumps(sorted_params, sort_keys=True)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # Without a query string the path is already a unique key; hashed
+        # keys are 32-character hex digests, unlike any path or cache name
+        if not params:
+            return path
+
+        # Sort params for consistent key generation; orjson returns bytes,
+        # so the key data goes to the hash without an encode step
+        sorted_params = sorted(params.items())
+        key_data = orjson.dumps([path, sorted_params], option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(key_data, digest_size=16).hexdigest()
 
     def _generate_etag(self, data: Any) -> str:
         """Generate an ETag from response data.
 
         Args:
-            data: Response data (will be JSON serialized)
+            data: Serialized response body, or response data (will be JSON
+                serialized)
 
         Returns:
-            ETag string with quotes
+            ETag string with quotes (64-bit BLAKE2b digest)
         """
-        if isinstance(data, BaseModel):
-            content = data.model_dump_json()
+        if isinstance(data, bytes):
+            content = data
+        elif isinstance(data, BaseModel):
+            content = data.__pydantic_serializer__.to_json(data)
         elif isinstance(data, (dict, list)):
-            content = json.dumps(data, sort_keys=True, default=str)
+            content = orjson.dumps(
+                data,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                default=str,
+            )
         else:
-            content = str(data)
+            content = str(data).encode()
 
-        hash_value = hashlib.md5(content.encode()).hexdigest()[:16]
+        hash_value = hashlib.blake2b(content, digest_size=8).hexdigest()
         return f'"{hash_value}"'
 
     def get(self, path: str, params: dict) -> Optional[CacheEntry]:
@@ -127,33 +201,47 @@ class ResponseCache:
 
         Returns:
             CacheEntry if found and valid, None otherwise
-        """
-        settings = get_settings()
-        if not settings.cache_enabled:
-            return None
 
-        key = self._generate_cache_key(path, params)
-        with self._lock:
-            return self._cache.get(key)
+        Note:
+            Does not check cache_enabled; cache_response resolves it once
+            per route and never calls get() when caching is disabled.
+        """
+        return self._cache.get(self._generate_cache_key(path, params))
 
-    def set(self, path: str, params: dict, data: Any) -> CacheEntry:
+    def set(
+        self, path: str, params: dict, data: Any, etag: Optional[str] = None
+    ) -> CacheEntry:
         """Cache a response.
 
+        The data is serialized to JSON once, and bodies of at least
+        gzip_minimum_size bytes are also gzipped once, here on the miss path.
+
         Args:
             path: Request path
             params: Query parameters dict
             data: Response data to cache
+            etag: ETag to store (derived from the serialized body if None)
 
         Returns:
             CacheEntry containing the cached data
         """
+        settings = get_runtime_settings()
         key = self._generate_cache_key(path, params)
-        etag = self._generate_etag(data)
-        entry = CacheEntry(data=data, etag=etag, created_at=time.time(), ttl=self.ttl)
-
-        with self._lock:
-            self._cache[key] = entry
-
+        body = serialize_body(data)
+        gzip_body = None
+        if len(body) >= settings.gzip_minimum_size:
+            gzip_body = gzip.compress(body, compresslevel=settings.gzip_compress_level)
+
+        entry = CacheEntry(
+            data=data,
+            etag=etag or self._generate_etag(body),
+            created_at=_now_ns(),
+            ttl=self.ttl,
+            body=body,
+            gzip_body=gzip_body,
+        )
+
+        self._cache[key] = entry
         return entry
 
     def invalidate(self, path: Optional[str] = None, params: Optional[dict] = None):
@@ -164,12 +252,11 @@ class ResponseCache:
                   If None, clear entire cache.
             params: Query parameters for specific entry invalidation
         """
-        with self._lock:
-            if path is not None and params is not None:
-                key = self._generate_cache_key(path, params)
-                self._cache.pop(key, None)
-            else:
-                self._cache.clear()
+        if path is not None and params is not None:
+            key = self._generate_cache_key(path, params)
+            self._cache.pop(key, None)
+        else:
+            self._cache.clear()
 
     def stats(self) -> dict:
         """Get cache statistics.
@@ -177,13 +264,58 @@ class ResponseCache:
         Returns:
             Dict with cache statistics
         """
-        with self._lock:
-            return {
-                "name": self.name,
-                "size": len(self._cache),
-                "maxsize": self.maxsize,
-                "ttl": self.ttl,
-            }
+        return {
+            "name": self.name,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+def _cache_control_value(max_age: int) -> str:
+    """Format the Cache-Control value for a given remaining max-age."""
+    stale = get_runtime_settings().cache_stale_while_revalidate
+    if stale:
+        return f"public, max-age={max_age}, stale-while-revalidate={stale}"
+    return f"public, max-age={max_age}"
+
+
+def cache_control_header(entry: CacheEntry) -> str:
+    """Build the Cache-Control value for a cached response.
+
+    Shared caches may keep serving the response for
+    cache_stale_while_revalidate seconds after it expires while they
+    revalidate it with If-None-Match, which is answered with a 304.
+
+    Args:
+        entry: CacheEntry with cache metadata
+
+    Returns:
+        Cache-Control header value
+    """
+    return _cache_control_value(entry.max_age)
+
+
+def cache_headers(entry: CacheEntry, cache_status: str = "HIT") -> dict[str, str]:
+    """Build the caching headers for a response served from an entry.
+
+    The entry's age is read once and max-age derived from it, so the two
+    headers always agree.
+
+    Args:
+        entry: CacheEntry with cache metadata
+        cache_status: "HIT" or "MISS" status
+
+    Returns:
+        Dict of Cache-Control, ETag, X-Cache and Age headers
+    """
+    age = entry.age
+    return {
+        "Cache-Control": _cache_control_value(max(0, entry.ttl - age)),
+        "ETag": entry.etag,
+        "X-Cache": cache_status,
+        "Age": str(age),
+    }
 
 
 def add_cache_headers(
@@ -199,13 +331,50 @@ def add_cache_headers(
     Returns:
         Response with caching headers added
     """
-    response.headers["Cache-Control"] = f"public, max-age={entry.max_age}"
-    response.headers["ETag"] = entry.etag
-    response.headers["X-Cache"] = cache_status
-    response.headers["Age"] = str(entry.age)
+    response.headers.update(cache_headers(entry, cache_status))
     return response
 
 
+def accepts_gzip(request: Request) -> bool:
+    """Check whether the client accepts gzip-encoded responses.
+
+    Args:
+        request: FastAPI Request object
+
+    Returns:
+        True if gzip is listed in Accept-Encoding
+    """
+    accept_encoding = request.headers.get("Accept-Encoding") or ""
+    return "gzip" in accept_encoding.lower()
+
+
+def build_cached_response(
+    request: Optional[Request], entry: CacheEntry, cache_status: str
+) -> Response:
+    """Build a response from a cache entry's pre-serialized body.
+
+    Serves the gzipped body when the client accepts it, otherwise the plain
+    JSON body. Neither is re-encoded. All headers are passed to the
+    constructor, which encodes them in one pass.
+
+    Args:
+        request: FastAPI Request object (None when called outside a route)
+        entry: CacheEntry to serve
+        cache_status: "HIT" or "MISS" status
+
+    Returns:
+        Response with the cached body and caching headers
+    """
+    headers = cache_headers(entry, cache_status)
+    headers["Vary"] = "Accept-Encoding"
+    body = entry.body
+    if entry.gzip_body is not None and request is not None and accepts_gzip(request):
+        body = entry.gzip_body
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def get_cache_headers_from_request(request: Request) -> dict[str, str]:
     """Get cache headers from request state (set by cache_response decorator).
 
@@ -219,21 +388,16 @@ def get_cache_headers_from_request(request: Request) -> dict[str, str]:
     cache_entry = getattr(request.state, "cache_entry", None)
 
     if cache_status and cache_entry:
-        return {
-            "Cache-Control": f"public, max-age={cache_entry.max_age}",
-            "ETag": cache_entry.etag,
-            "X-Cache": cache_status,
-            "Age": str(cache_entry.age),
-        }
+        return cache_headers(cache_entry, cache_status)
     return {}
 
 
-def check_etag_match(request: Request, entry: CacheEntry) -> bool:
-    """Check if request ETag matches cached ETag.
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check if the request's If-None-Match header lists an ETag.
 
     Args:
         request: FastAPI Request object
-        entry: CacheEntry to check against
+        etag: ETag to look for
 
     Returns:
         True if ETag matches (304 can be returned)
@@ -244,21 +408,86 @@ def check_etag_match(request: Request, entry: CacheEntry) -> bool:
 
     # Handle multiple ETags in If-None-Match header
     etags = [tag.strip().strip("W/") for tag in if_none_match.split(",")]
-    return entry.etag.strip('"') in [tag.strip('"') for tag in etags]
+    return etag.strip('"') in [tag.strip('"') for tag in etags]
+
+
+def check_etag_match(request: Request, entry: CacheEntry) -> bool:
+    """Check if request ETag matches cached ETag.
+
+    Args:
+        request: FastAPI Request object
+        entry: CacheEntry to check against
+
+    Returns:
+        True if ETag matches (304 can be returned)
+    """
+    return etag_matches(request, entry.etag)
+
+
+def version_etag(path: str, params: dict, version: str) -> str:
+    """Build an ETag from the request and the version of the data behind it.
+
+    Args:
+        path: Request path
+        params: Query parameters dict
+        version: Data version string (e.g. a write counter)
+
+    Returns:
+        ETag string with quotes (64-bit BLAKE2b digest, as body ETags)
+    """
+    key_data = orjson.dumps([path, params, version], option=orjson.OPT_SORT_KEYS)
+    return f'"{hashlib.blake2b(key_data, digest_size=8).hexdigest()}"'
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """Build a 304 Not Modified response for a matching If-None-Match.
+
+    Args:
+        etag: ETag the client already holds
+        cache_control: Cache-Control header value
+
+    Returns:
+        Empty 304 response with caching headers
+    """
+    return Response(
+        status_code=304,
+        headers={
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "X-Cache": "HIT-NOT-MODIFIED",
+            "Vary": "Accept-Encoding",
+        },
+    )
 
 
 def cache_response(
-    cache_name: str, ttl_seconds: Optional[int] = None, maxsize: int = 1000
+    cache_name: str,
+    ttl_seconds: Optional[int] = None,
+    maxsize: int = 1000,
+    vary_on_query: bool = True,
+    data_version: Optional[Callable[[Request], Awaitable[Optional[str]]]] = None,
 ) -> Callable:
     """Decorator for caching FastAPI route responses.
 
     This decorator wraps async route handlers to add response caching
-    with TTL expiration and ETag support.
+    with TTL expiration and ETag support. Responses are returned as
+    pre-serialized JSON (gzipped when the client accepts it), so the route's
+    result is serialized once per cache entry rather than once per request.
 
     Args:
         cache_name: Unique name for this cache
         ttl_seconds: TTL in seconds (uses config default if None)
         maxsize: Maximum cache entries
+        vary_on_query: Include query parameters in the cache key. Routes
+            that take no query parameters should disable this, so that
+            cache-busting query strings share one entry instead of each
+            reaching the database.
+        data_version: Async callable returning the current version of the
+            data behind the route (None if unknown). When given, ETags are
+            derived from the request and that version instead of the body,
+            so a revalidation is answered with a 304 without running the
+            route even after the cache entry has expired, and entries built
+            from an older version are not served.
 
     Returns:
         Decorator function
@@ -271,15 +500,20 @@ def cache_response(
     """
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> Any:
-            # Find request in kwargs (injected by FastAPI)
-            request: Optional[Request] = kwargs.get("request")
+        # Resolved on the first call (settings are immutable once loaded), so
+        # later requests skip the settings lookup, TTL mapping and the
+        # instance registry lock
+        cache: Optional[ResponseCache] = None
+        enabled: Optional[bool] = None
+
+        def resolve_cache() -> None:
+            nonlocal cache, enabled
 
             # Get settings for TTL
             settings = get_settings()
-            if not settings.cache_enabled:
-                return await func(*args, **kwargs)
+            enabled = settings.cache_enabled
+            if not enabled:
+                return
 
             # Determine actual TTL based on cache name or explicit value
             if ttl_seconds is not None:
@@ -302,48 +536,75 @@ def cache_response(
                 maxsize=min(maxsize, settings.cache_max_size),
             )
 
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            # Find request in kwargs (injected by FastAPI)
+            request: Optional[Request] = kwargs.get("request")
+
+            if enabled is None:
+                resolve_cache()
+            if not enabled:
+                result = await func(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                # Serialized here as on a cache miss; returning the models
+                # would have FastAPI walk them with jsonable_encoder
+                return json_bytes_response(serialize_body(result))
+
             # Build cache key from request path and query params
             if request is not None:
                 path = request.url.path
-                params = dict(request.query_params)
+                params = dict(request.query_params) if vary_on_query else {}
             else:
                 path = cache_name
                 params = {}
 
+            # Derive the ETag from the data version when the route has one
+            etag = None
+            if data_version is not None and request is not None:
+                version = await data_version(request)
+                if version is not None:
+                    etag = version_etag(path, params, version)
+
             # Check cache
             entry = cache.get(path, params)
+            if entry is not None and etag is not None and entry.etag != etag:
+                # Built from an older version of the data
+                entry = None
+
+            if etag is not None and entry is None and etag_matches(request, etag):
+                # The client's copy is current; skip the route entirely
+                return not_modified_response(etag, _cache_control_value(cache.ttl))
 
             if entry is not None:
                 # Check for ETag match (304 Not Modified)
                 if request is not None and check_etag_match(request, entry):
-                    response = Response(
-                        status_code=304,
-                        headers={
-                            "ETag": entry.etag,
-                            "Cache-Control": f"public, max-age={entry.max_age}",
-                            "X-Cache": "HIT-NOT-MODIFIED",
-                        },
+                    return not_modified_response(
+                        entry.etag, cache_control_header(entry)
                     )
-                    return response
 
                 # Mark request state for cache HIT (for header middleware)
                 if request is not None:
                     request.state.cache_status = "HIT"
                     request.state.cache_entry = entry
 
-                # Return cached data
-                return entry.data
+                # Return the pre-serialized body
+                return build_cached_response(request, entry, "HIT")
 
             # Cache miss - call the actual function
             result = await func(*args, **kwargs)
 
+            # Pass through responses the route built itself (e.g. errors)
+            if isinstance(result, Response):
+                return result
+
             # Cache the result and mark as MISS
-            entry = cache.set(path, params, result)
+            entry = cache.set(path, params, result, etag=etag)
             if request is not None:
                 request.state.cache_status = "MISS"
                 request.state.cache_entry = entry
 
-            return result
+            return build_cached_response(request, entry, "MISS")
 
         return wrapper
 
@@ -0,0 +1,121 @@
+"""
+Risk Calculation Job Service
+
+Runs risk calculations as background tasks so clients can submit a
+calculation, get a job id back immediately and poll for the result instead
+of holding the HTTP connection open for the whole pipeline.
+
+Jobs live in process memory, so a job can only be polled on the worker that
+accepted it; the job endpoints are disabled when more than one worker is
+configured (see api.routes.calculate).
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from cachetools import TTLCache
+
+from api.schemas.calculate import RiskCalculationResponse
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for polling, relative to the number of running jobs
+_RETAINED_JOBS_PER_SLOT = 10
+
+
+class RiskJob:
+    """State of one background risk calculation."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "pending"
+        self.result: Optional[RiskCalculationResponse] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+
+
+class RiskJobStore:
+    """In-memory registry of background risk calculation jobs.
+
+    Bounds the number of unfinished jobs, and forgets finished jobs after
+    ttl seconds. All methods run on the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self, ttl: int, max_jobs: int, slots: Optional[asyncio.Semaphore] = None
+    ):
+        """Initialize the job store.
+
+        Args:
+            ttl: Seconds a job stays pollable after submission
+            max_jobs: Maximum number of unfinished jobs
+            slots: Semaphore a job must hold while calculating; jobs waiting
+                for it stay pending
+        """
+        self.max_jobs = max_jobs
+        self._slots = slots
+        self._jobs: TTLCache = TTLCache(
+            maxsize=max_jobs * _RETAINED_JOBS_PER_SLOT, ttl=ttl
+        )
+        # Strong references keep running tasks from being garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self, calculation: Callable[[], Awaitable[RiskCalculationResponse]]
+    ) -> Optional[RiskJob]:
+        """Start a calculation in the background.
+
+        Args:
+            calculation: Coroutine function performing the calculation
+
+        Returns:
+            The new job, or None if max_jobs jobs are already unfinished
+        """
+        if len(self._tasks) >= self.max_jobs:
+            return None
+
+        job = RiskJob(uuid.uuid4().hex)
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job, calculation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[RiskJob]:
+        """Get a job by id.
+
+        Returns:
+            The job, or None if it is unknown or has expired
+        """
+        return self._jobs.get(job_id)
+
+    async def cancel_all(self) -> None:
+        """Cancel unfinished jobs (called during application shutdown)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(
+        self,
+        job: RiskJob,
+        calculation: Callable[[], Awaitable[RiskCalculationResponse]],
+    ) -> None:
+        """Run a calculation and record its outcome on the job."""
+        try:
+            async with self._slots or contextlib.nullcontext():
+                job.status = "running"
+                job.result = await calculation()
+            job.status = "completed"
+        except ValueError as e:
+            logger.error(f"Validation error in risk job: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        except Exception as e:
+            logger.error(f"Error in risk job: {e}")
+            job.error = "Failed to calculate risk scores"
+            job.status = "failed"
@@ -0,0 +1,30 @@
+-- Migration: 002_check_required_indexes
+-- Description: Add RPC function used by the API to verify required indexes at startup
+-- Date: 2026-10-16
+
+-- Returns the subset of required indexes that do not exist.
+-- Each entry of `required` is formatted as '<table>.<index>', matching the
+-- names logged by api.dependencies.verify_database_indexes. Calling this via
+-- PostgREST reuses the API's pooled HTTPS connection instead of opening a
+-- separate direct PostgreSQL connection at startup.
+CREATE OR REPLACE FUNCTION check_required_indexes(required text[])
+RETURNS text[]
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(array_agg(r.name ORDER BY r.ord), ARRAY[]::text[])
+    FROM unnest(required) WITH ORDINALITY AS r(name, ord)
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM pg_indexes i
+        WHERE i.schemaname = 'public'
+          AND i.tablename = split_part(r.name, '.', 1)
+          AND i.indexname = split_part(r.name, '.', 2)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION check_required_indexes(text[])
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT check_required_indexes(ARRAY['diseases.idx_diseases_icd_code']);
@@ -0,0 +1,66 @@
+-- Migration: 003_get_related_diseases
+-- Description: Add RPC function that resolves an ICD code and fetches its relationships in one call
+-- Date: 2026-10-16
+
+-- Returns {"disease_id": <id>, "relationships": [...]} for the disease with
+-- the given ICD code, or NULL when no such disease exists. Each relationship
+-- is the disease_relationships row plus embedded disease_1 / disease_2
+-- objects, matching the shape of the PostgREST select used by
+-- GET /api/diseases/{disease_id}/related. Resolving the ICD code inside the
+-- database saves the API a separate id lookup round-trip.
+CREATE OR REPLACE FUNCTION get_related_diseases(
+    icd_code text,
+    min_odds_ratio double precision,
+    max_results integer
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH target AS (
+        SELECT d.id
+        FROM diseases d
+        WHERE d.icd_code = get_related_diseases.icd_code
+        LIMIT 1
+    )
+    SELECT jsonb_build_object(
+        'disease_id', t.id,
+        'relationships', COALESCE((
+            SELECT jsonb_agg(rel.row ORDER BY rel.odds_ratio DESC)
+            FROM (
+                SELECT
+                    r.odds_ratio,
+                    to_jsonb(r) || jsonb_build_object(
+                        'disease_1', jsonb_build_object(
+                            'id', d1.id,
+                            'icd_code', d1.icd_code,
+                            'name_english', d1.name_english,
+                            'name_german', d1.name_german,
+                            'chapter_code', d1.chapter_code
+                        ),
+                        'disease_2', jsonb_build_object(
+                            'id', d2.id,
+                            'icd_code', d2.icd_code,
+                            'name_english', d2.name_english,
+                            'name_german', d2.name_german,
+                            'chapter_code', d2.chapter_code
+                        )
+                    ) AS row
+                FROM disease_relationships r
+                JOIN diseases d1 ON d1.id = r.disease_1_id
+                JOIN diseases d2 ON d2.id = r.disease_2_id
+                WHERE (r.disease_1_id = t.id OR r.disease_2_id = t.id)
+                  AND r.odds_ratio >= min_odds_ratio
+                ORDER BY r.odds_ratio DESC
+                LIMIT max_results
+            ) rel
+        ), '[]'::jsonb)
+    )
+    FROM target t;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_related_diseases(text, double precision, integer)
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT get_related_diseases('E11', 1.5, 10);
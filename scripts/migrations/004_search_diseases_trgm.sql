@@ -0,0 +1,77 @@
+-- Migration: 004_search_diseases_trgm
+-- Description: Add trigram indexes and ranked search RPC for GET /api/diseases/search/{term}
+-- Date: 2026-10-16
+
+-- Trigram matching lets Postgres answer '%term%' patterns from an index
+-- instead of scanning every row for each of the three OR'd ILIKE filters.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- One trigram index per searched column, so the planner can answer the
+-- OR of per-column ILIKEs with a BitmapOr over the three indexes. Matching
+-- each column separately also keeps a pattern from spanning two columns
+-- (e.g. the end of the English name and the start of the German one).
+DROP INDEX IF EXISTS idx_diseases_search_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_diseases_name_english_trgm
+ON diseases USING gin (name_english gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_diseases_name_german_trgm
+ON diseases USING gin (name_german gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_diseases_icd_code_trgm
+ON diseases USING gin (icd_code gin_trgm_ops);
+
+ANALYZE diseases;
+
+-- Returns a JSON array of matching diseases, best matches first. Each
+-- element carries the SearchResultResponse fields with chapter_name already
+-- flattened. LIKE wildcards in the term are escaped, so it always matches
+-- literally.
+CREATE OR REPLACE FUNCTION search_diseases(term text, max_results integer)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH pattern AS (
+        SELECT '%' || replace(replace(replace(term, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+            AS value
+    )
+    SELECT COALESCE(jsonb_agg(match.row ORDER BY match.rank DESC, match.icd_code), '[]'::jsonb)
+    FROM (
+        SELECT
+            d.icd_code,
+            -- Ranking only: the concatenation scores a term against all
+            -- searchable text at once, but is never used for matching
+            similarity(
+                COALESCE(d.name_english, '') || ' ' || COALESCE(d.name_german, '') || ' ' || d.icd_code,
+                term
+            ) AS rank,
+            jsonb_build_object(
+                'id', d.id,
+                'icd_code', d.icd_code,
+                'name_english', d.name_english,
+                'name_german', d.name_german,
+                'chapter_code', d.chapter_code,
+                'chapter_name', c.chapter_name,
+                'prevalence_total', d.prevalence_total
+            ) AS row
+        FROM diseases d
+        CROSS JOIN pattern p
+        LEFT JOIN icd_chapters c ON c.chapter_code = d.chapter_code
+        WHERE d.name_english ILIKE p.value
+            OR d.name_german ILIKE p.value
+            OR d.icd_code ILIKE p.value
+        ORDER BY rank DESC, d.icd_code
+        LIMIT max_results
+    ) match;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_diseases(text, integer)
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT search_diseases('diabetes', 5);
+-- EXPLAIN SELECT * FROM diseases
+--   WHERE name_english ILIKE '%diab%'
+--      OR name_german ILIKE '%diab%'
+--      OR icd_code ILIKE '%diab%';
@@ -0,0 +1,72 @@
+-- Migration: 005_network_snapshot
+-- Description: Add RPC function returning network nodes and edges in one call for GET /api/network
+-- Date: 2026-10-16
+
+-- Returns {"nodes": [...], "edges": [...]} with each element already in the
+-- NetworkNode / NetworkEdge shape, so the API makes one round-trip instead
+-- of separate node and edge queries. Nodes are the diseases with 3D
+-- coordinates; edges are relationships with odds_ratio >= min_odds_ratio,
+-- strongest first. When chapter is given, nodes are limited to that chapter
+-- and edges to those touching it. A NULL max_edges returns all edges.
+CREATE OR REPLACE FUNCTION network_snapshot(
+    min_odds_ratio double precision,
+    max_edges integer DEFAULT NULL,
+    chapter text DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'nodes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', d.id,
+                'icd_code', d.icd_code,
+                'name_english', d.name_english,
+                'name_german', d.name_german,
+                'chapter_code', d.chapter_code,
+                'vector_x', d.vector_x,
+                'vector_y', d.vector_y,
+                'vector_z', d.vector_z,
+                'prevalence_total', d.prevalence_total
+            ))
+            FROM diseases d
+            WHERE d.has_3d_coordinates
+              AND (chapter IS NULL OR d.chapter_code = chapter)
+        ), '[]'::jsonb),
+        'edges', COALESCE((
+            SELECT jsonb_agg(edge.row ORDER BY edge.odds_ratio DESC)
+            FROM (
+                SELECT
+                    r.odds_ratio,
+                    jsonb_build_object(
+                        'source', r.disease_1_id,
+                        'target', r.disease_2_id,
+                        'source_icd', d1.icd_code,
+                        'target_icd', d2.icd_code,
+                        'source_name', d1.name_english,
+                        'target_name', d2.name_english,
+                        'odds_ratio', r.odds_ratio,
+                        'p_value', r.p_value,
+                        'relationship_strength', r.relationship_strength,
+                        'patient_count_total', r.patient_count_total
+                    ) AS row
+                FROM disease_relationships r
+                JOIN diseases d1 ON d1.id = r.disease_1_id
+                JOIN diseases d2 ON d2.id = r.disease_2_id
+                WHERE r.odds_ratio >= min_odds_ratio
+                  AND (chapter IS NULL
+                       OR r.icd_chapter_1 = chapter
+                       OR r.icd_chapter_2 = chapter)
+                ORDER BY r.odds_ratio DESC
+                LIMIT max_edges
+            ) edge
+        ), '[]'::jsonb)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION network_snapshot(double precision, integer, text)
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT jsonb_array_length(network_snapshot(1.5, 100, NULL)->'edges');
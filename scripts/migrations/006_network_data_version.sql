@@ -0,0 +1,68 @@
+-- Migration: 006_network_data_version
+-- Description: Track a network data version bumped on every write, for /api/network ETags
+-- Date: 2026-10-16
+
+-- The API hashes the version with the query parameters into the
+-- /api/network ETag, so a client revalidating with If-None-Match gets a 304
+-- without the network being queried or serialized. The version must
+-- therefore change on every write that can change the response: the tables
+-- have no updated_at column, the importer's ON CONFLICT ... DO UPDATE
+-- upserts set no timestamp, and a max() over rows cannot see deletes.
+-- Statement-level triggers bump a single-row counter instead, on INSERT,
+-- UPDATE, DELETE and TRUNCATE of diseases and disease_relationships.
+
+-- Single-row counter; not exposed through the API
+CREATE TABLE IF NOT EXISTS network_version_counter (
+    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+    version bigint NOT NULL DEFAULT 0,
+    changed_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO network_version_counter (id) VALUES (true)
+ON CONFLICT (id) DO NOTHING;
+
+REVOKE ALL ON network_version_counter FROM anon, authenticated;
+
+-- Runs once per writing statement, however many rows it touched
+CREATE OR REPLACE FUNCTION bump_network_data_version()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE network_version_counter
+    SET version = version + 1, changed_at = now();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS bump_network_data_version ON diseases;
+CREATE TRIGGER bump_network_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON diseases
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_network_data_version();
+
+DROP TRIGGER IF EXISTS bump_network_data_version ON disease_relationships;
+CREATE TRIGGER bump_network_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON disease_relationships
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_network_data_version();
+
+-- Returns the current version as text. SECURITY DEFINER so API roles can
+-- read the counter without access to the table itself
+CREATE OR REPLACE FUNCTION network_data_version()
+RETURNS text
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT version::text FROM network_version_counter;
+$$;
+
+GRANT EXECUTE ON FUNCTION network_data_version()
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT network_data_version();
+-- UPDATE diseases SET name_english = name_english WHERE false;
+-- SELECT network_data_version();  -- incremented by one
@@ -0,0 +1,20 @@
+-- Migration: 007_connectivity_check
+-- Description: Add RPC function for the health check database probe
+-- Date: 2026-10-16
+
+-- Returns whether the diseases table has any rows. EXISTS stops at the
+-- first row without reading it, so /health and /ready get a single boolean
+-- back instead of a row serialized to JSON.
+CREATE OR REPLACE FUNCTION connectivity_check()
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT EXISTS (SELECT 1 FROM diseases);
+$$;
+
+GRANT EXECUTE ON FUNCTION connectivity_check()
+    TO anon, authenticated, service_role;
+
+-- Verify (for manual verification):
+-- SELECT connectivity_check();
@@ -46,6 +46,13 @@ REQUIRED_INDEXES = {
     ],
 }
 
+# Flattened (table, index) pairs, built once for single-query verification
+REQUIRED_INDEX_PAIRS = frozenset(
+    (table_name, index_name)
+    for table_name, index_names in REQUIRED_INDEXES.items()
+    for index_name in index_names
+)
+
 
 @dataclass
 class IndexStatus:
@@ -164,6 +171,38 @@ def get_existing_indexes(conn, table_name: str) -> dict[str, str]:
         return {row[0]: row[1] for row in cursor.fetchall()}
 
 
+def get_required_index_definitions(conn) -> dict[tuple[str, str], str]:
+    """Get definitions of all required indexes that exist, in one round-trip.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Dictionary mapping (table, index) to index definition for every
+        required index present in the database
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT tablename, indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = ANY(%s) AND indexname = ANY(%s);
+            """,
+            (
+                list(REQUIRED_INDEXES),
+                [index_name for _, index_name in REQUIRED_INDEX_PAIRS],
+            ),
+        )
+        rows = cursor.fetchall()
+
+    # Filter on the exact pairs, since the two ANY() lists match independently
+    return {
+        (row[0], row[1]): row[2]
+        for row in rows
+        if (row[0], row[1]) in REQUIRED_INDEX_PAIRS
+    }
+
+
 def verify_all_indexes(conn, verbose: bool = False) -> list[IndexStatus]:
     """Verify all required indexes exist.
 
@@ -175,17 +214,21 @@ def verify_all_indexes(conn, verbose: bool = False) -> list[IndexStatus]:
         List of IndexStatus objects for all required indexes
     """
     results = []
+    existing = get_required_index_definitions(conn)
 
     for table_name, required_indexes in REQUIRED_INDEXES.items():
-        existing = get_existing_indexes(conn, table_name)
-
         if verbose:
+            found = sum(
+                1
+                for index_name in required_indexes
+                if (table_name, index_name) in existing
+            )
             logger.info(f"\nChecking table: {table_name}")
-            logger.info(f"  Found {len(existing)} indexes")
+            logger.info(f"  Found {found}/{len(required_indexes)} required indexes")
 
         for index_name in required_indexes:
-            exists = index_name in existing
-            definition = existing.get(index_name)
+            definition = existing.get((table_name, index_name))
+            exists = definition is not None
 
             status = IndexStatus(
                 name=index_name,
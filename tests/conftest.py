@@ -0,0 +1,15 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+
+from api import dependencies
+
+
+@pytest.fixture(autouse=True)
+def reset_missing_rpcs():
+    """Each test starts with every optional RPC assumed to be deployed."""
+    dependencies._missing_rpcs.clear()
+    yield
+    dependencies._missing_rpcs.clear()
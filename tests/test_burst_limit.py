@@ -0,0 +1,128 @@
+"""
+Tests for burst limiting middleware.
+
+Tests the per-client token bucket in BurstLimitMiddleware.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from starlette.responses import Response
+
+from api.middleware.burst_limit import BurstLimitMiddleware
+
+
+def make_scope(client: tuple = ("127.0.0.1", 50000)) -> dict:
+    """Build a minimal ASGI HTTP scope."""
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/chapters",
+        "headers": [],
+        "client": client,
+        "query_string": b"",
+    }
+
+
+def make_middleware(rate: float = 1.0, capacity: int = 2) -> BurstLimitMiddleware:
+    """Build the middleware around an app that always answers 200."""
+
+    async def app(scope, receive, send):
+        await Response(content="OK")(scope, receive, send)
+
+    with patch("api.middleware.burst_limit.get_runtime_settings") as mock_settings:
+        mock_settings.return_value.trust_proxy = False
+        return BurstLimitMiddleware(app, rate=rate, capacity=capacity)
+
+
+async def call(middleware: BurstLimitMiddleware, scope: dict) -> list[dict]:
+    """Run one request through the middleware and capture sent messages."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+def status_of(messages: list[dict]) -> int:
+    """Return the response status from captured ASGI messages."""
+    return next(m for m in messages if m["type"] == "http.response.start")["status"]
+
+
+class TestBurstLimitMiddleware:
+    """Tests for BurstLimitMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_allows_requests_up_to_capacity(self):
+        """A client should be able to burst up to the bucket capacity."""
+        middleware = make_middleware(capacity=3)
+
+        for _ in range(3):
+            assert status_of(await call(middleware, make_scope())) == 200
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_bucket_empty(self):
+        """Requests beyond capacity should get a 429 with Retry-After."""
+        middleware = make_middleware(rate=0.5, capacity=1)
+        await call(middleware, make_scope())
+
+        messages = await call(middleware, make_scope())
+
+        assert status_of(messages) == 429
+        headers = dict(messages[0]["headers"])
+        assert headers[b"retry-after"] == b"2"
+        body = json.loads(messages[1]["body"])
+        assert body["error"]["type"] == "RateLimitExceeded"
+        assert body["error"]["details"]["retry_after_seconds"] == 2
+
+    @pytest.mark.asyncio
+    async def test_buckets_are_per_client(self):
+        """One client's empty bucket should not affect another client."""
+        middleware = make_middleware(capacity=1)
+        await call(middleware, make_scope(client=("10.0.0.1", 1)))
+
+        messages = await call(middleware, make_scope(client=("10.0.0.2", 1)))
+
+        assert status_of(messages) == 200
+
+    @pytest.mark.asyncio
+    async def test_bucket_refills_over_time(self):
+        """Tokens should be replenished at the configured rate."""
+        middleware = make_middleware(rate=1.0, capacity=1)
+
+        with patch("api.middleware.burst_limit.time.monotonic") as monotonic:
+            monotonic.return_value = 100.0
+            await call(middleware, make_scope())
+            assert status_of(await call(middleware, make_scope())) == 429
+
+            monotonic.return_value = 101.5
+            assert status_of(await call(middleware, make_scope())) == 200
+
+    def test_sweep_drops_refilled_buckets(self):
+        """Idle buckets that have refilled completely should be evicted."""
+        middleware = make_middleware(rate=1.0, capacity=2)
+        middleware._buckets = {"idle": (0.0, 0.0), "active": (0.0, 99.0)}
+
+        middleware._sweep(100.0)
+
+        assert list(middleware._buckets) == ["active"]
+
+    @pytest.mark.asyncio
+    async def test_passes_through_non_http_scopes(self):
+        """Non-HTTP scopes (e.g. lifespan) should be forwarded untouched."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        middleware = BurstLimitMiddleware(app, rate=1.0, capacity=1)
+        await middleware({"type": "lifespan"}, None, None)
+
+        assert seen == ["lifespan"]
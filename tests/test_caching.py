@@ -11,17 +11,26 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
 
+from api.responses import prerender_json
+from api.schemas.diseases import DiseaseListResponse, DiseaseResponse
 from api.services.cache import (
     CacheEntry,
     ResponseCache,
     add_cache_headers,
+    cache_headers,
     cache_response,
     check_etag_match,
     clear_all_caches,
     get_all_cache_stats,
+    serialize_body,
+    version_etag,
 )
 
+# Nanoseconds per second, for CacheEntry monotonic timestamps
+NS = 1_000_000_000
+
 
 class TestCacheEntry:
     """Tests for CacheEntry class."""
@@ -29,23 +38,43 @@ class TestCacheEntry:
     def test_cache_entry_creation(self):
         """CacheEntry should store data and metadata."""
         entry = CacheEntry(
-            data={"key": "value"}, etag='"abc123"', created_at=time.time(), ttl=3600
+            data={"key": "value"},
+            etag='"abc123"',
+            created_at=time.monotonic_ns(),
+            ttl=3600,
         )
 
         assert entry.data == {"key": "value"}
         assert entry.etag == '"abc123"'
         assert entry.ttl == 3600
 
+    def test_cache_entry_has_no_instance_dict(self):
+        """Entries should be slotted and reject unknown attributes."""
+        entry = CacheEntry(data={}, etag='"a"', created_at=time.monotonic_ns(), ttl=60)
+
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.extra = 1
+
     def test_cache_entry_age(self):
         """CacheEntry.age should return seconds since creation."""
-        created_at = time.time() - 100  # 100 seconds ago
+        created_at = time.monotonic_ns() - 100 * NS  # 100 seconds ago
         entry = CacheEntry(data={}, etag='"test"', created_at=created_at, ttl=3600)
 
         assert 99 <= entry.age <= 101
 
+    def test_cache_entry_age_ignores_wall_clock(self):
+        """Wall-clock jumps should not change an entry's age."""
+        entry = CacheEntry(
+            data={}, etag='"test"', created_at=time.monotonic_ns() - 100 * NS, ttl=60
+        )
+
+        with patch("time.time", return_value=0.0):
+            assert 99 <= entry.age <= 101
+
     def test_cache_entry_max_age(self):
         """CacheEntry.max_age should return remaining TTL."""
-        created_at = time.time() - 100  # 100 seconds ago
+        created_at = time.monotonic_ns() - 100 * NS  # 100 seconds ago
         entry = CacheEntry(data={}, etag='"test"', created_at=created_at, ttl=3600)
 
         # max_age should be approximately ttl - age
@@ -53,7 +82,7 @@ class TestCacheEntry:
 
     def test_cache_entry_expired_max_age(self):
         """CacheEntry.max_age should return 0 when expired."""
-        created_at = time.time() - 4000  # Expired
+        created_at = time.monotonic_ns() - 4000 * NS  # Expired
         entry = CacheEntry(data={}, etag='"test"', created_at=created_at, ttl=3600)
 
         assert entry.max_age == 0
@@ -74,6 +103,26 @@ class TestResponseCache:
 
         assert cache1 is cache2
 
+    def test_get_instance_skips_lock_for_existing(self):
+        """Existing instances should be returned without taking the lock."""
+        cache = ResponseCache.get_instance("test_lock_free", ttl=3600)
+
+        with patch.object(ResponseCache, "_lock", MagicMock()) as lock:
+            assert ResponseCache.get_instance("test_lock_free", ttl=3600) is cache
+
+        lock.__enter__.assert_not_called()
+
+    def test_instances_hold_no_lock(self):
+        """Caches are event-loop-only; only the registry is locked."""
+        cache = ResponseCache("test_no_instance_lock", ttl=3600)
+
+        cache.set("/api/test", {}, {"data": "test"})
+        assert cache.get("/api/test", {}) is not None
+        cache.invalidate()
+
+        assert "_lock" not in vars(cache)
+        assert cache.stats()["size"] == 0
+
     def test_get_instance_different_names(self):
         """get_instance should return different instances for different names."""
         cache1 = ResponseCache.get_instance("test1", ttl=3600)
@@ -160,6 +209,68 @@ class TestResponseCache:
         assert entry.etag.endswith('"')
         assert len(entry.etag) > 2
 
+    def test_version_and_body_etags_share_digest_size(self):
+        """Version ETags should be the same 64-bit digest as body ETags."""
+        cache = ResponseCache.get_instance("test_etag_size", ttl=3600)
+
+        body_etag = cache.set("/api/test", {}, {"data": "test"}).etag
+
+        assert len(version_etag("/api/test", {}, "1")) == len(body_etag) == 18
+
+    def test_cache_key_independent_of_param_order(self):
+        """Keys should not depend on query parameter order."""
+        cache = ResponseCache.get_instance("test_key_order", ttl=3600)
+
+        key1 = cache._generate_cache_key("/api/test", {"a": "1", "b": "2"})
+        key2 = cache._generate_cache_key("/api/test", {"b": "2", "a": "1"})
+
+        assert key1 == key2
+        assert key1 != cache._generate_cache_key("/api/other", {"a": "1", "b": "2"})
+
+    def test_cache_key_without_params_is_path(self):
+        """Lookups without a query string should skip hashing entirely."""
+        cache = ResponseCache.get_instance("test_key_path", ttl=3600)
+
+        assert cache._generate_cache_key("/api/chapters", {}) == "/api/chapters"
+        assert cache._generate_cache_key("/api/chapters", {"a": "1"}) != (
+            "/api/chapters"
+        )
+
+    def test_etag_from_unserialized_data(self):
+        """ETags should be stable for models, dicts with non-str keys and others."""
+        cache = ResponseCache.get_instance("test_etag_data", ttl=3600)
+
+        model = DiseaseResponse(id=1, icd_code="E11")
+        assert cache._generate_etag(model) == cache._generate_etag(model.model_copy())
+        assert cache._generate_etag({2: "b", 1: "a"}) == cache._generate_etag(
+            {1: "a", 2: "b"}
+        )
+        assert cache._generate_etag("text").startswith('"')
+
+    def test_set_serializes_once_for_body_and_etag(self):
+        """The ETag should hash the stored body, not a second serialization."""
+        cache = ResponseCache.get_instance("test_single_serialize", ttl=3600)
+        models = DiseaseListResponse(
+            diseases=[DiseaseResponse(id=1, icd_code="E11")], total=1
+        )
+
+        with patch(
+            "api.services.cache.serialize_body", wraps=serialize_body
+        ) as serialize:
+            entry = cache.set("/api/test", {}, models)
+
+        serialize.assert_called_once_with(models)
+        assert entry.etag == cache._generate_etag(entry.body)
+
+    def test_small_bodies_not_compressed(self):
+        """Bodies below gzip_minimum_size should not get a gzipped copy."""
+        cache = ResponseCache.get_instance("test_small", ttl=3600)
+
+        entry = cache.set("/api/test", {}, {"data": "test"})
+
+        assert json.loads(entry.body) == {"data": "test"}
+        assert entry.gzip_body is None
+
     def test_etag_consistency(self):
         """Same data should generate same ETag."""
         cache = ResponseCache.get_instance("test_etag_consistent", ttl=3600)
@@ -170,26 +281,40 @@ class TestResponseCache:
 
         assert entry1.etag == entry2.etag
 
-    def test_cache_disabled(self):
-        """Cache should not return entries when disabled in settings."""
-        cache = ResponseCache.get_instance("test_disabled", ttl=3600)
+    def test_get_does_not_read_settings(self):
+        """Hits should not look up settings; the decorator checks cache_enabled."""
+        cache = ResponseCache.get_instance("test_get_no_settings", ttl=3600)
 
         cache.set("/api/test", {}, {"data": "test"})
 
-        with patch("api.services.cache.get_settings") as mock_settings:
-            mock_settings.return_value.cache_enabled = False
+        with patch("api.services.cache.get_settings", side_effect=AssertionError):
             entry = cache.get("/api/test", {})
 
-        assert entry is None
+        assert entry is not None
 
 
 class TestAddCacheHeaders:
     """Tests for add_cache_headers function."""
 
+    def test_age_and_max_age_agree(self):
+        """Age and max-age should be derived from one age reading."""
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns() - 100 * NS, ttl=3600
+        )
+
+        headers = cache_headers(entry, "HIT")
+
+        max_age = int(headers["Cache-Control"].split("max-age=")[1].split(",")[0])
+        assert max_age + int(headers["Age"]) == 3600
+        assert headers["ETag"] == '"abc"'
+        assert headers["X-Cache"] == "HIT"
+
     def test_adds_cache_control_header(self):
         """Should add Cache-Control header."""
         response = Response()
-        entry = CacheEntry(data={}, etag='"abc"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         add_cache_headers(response, entry)
 
@@ -197,10 +322,40 @@ class TestAddCacheHeaders:
         assert "max-age=" in response.headers["Cache-Control"]
         assert "public" in response.headers["Cache-Control"]
 
+    def test_cache_control_allows_stale_while_revalidate(self):
+        """Cache-Control should let shared caches revalidate in the background."""
+        response = Response()
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns(), ttl=3600
+        )
+
+        with patch("api.services.cache.get_runtime_settings") as mock_settings:
+            mock_settings.return_value.cache_stale_while_revalidate = 60
+            add_cache_headers(response, entry)
+
+        assert response.headers["Cache-Control"] == (
+            "public, max-age=3600, stale-while-revalidate=60"
+        )
+
+    def test_stale_while_revalidate_can_be_disabled(self):
+        """A zero window should leave only max-age."""
+        response = Response()
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns(), ttl=3600
+        )
+
+        with patch("api.services.cache.get_runtime_settings") as mock_settings:
+            mock_settings.return_value.cache_stale_while_revalidate = 0
+            add_cache_headers(response, entry)
+
+        assert response.headers["Cache-Control"] == "public, max-age=3600"
+
     def test_adds_etag_header(self):
         """Should add ETag header."""
         response = Response()
-        entry = CacheEntry(data={}, etag='"abc123"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         add_cache_headers(response, entry)
 
@@ -209,7 +364,9 @@ class TestAddCacheHeaders:
     def test_adds_cache_hit_header(self):
         """Should add X-Cache: HIT header."""
         response = Response()
-        entry = CacheEntry(data={}, etag='"abc"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         add_cache_headers(response, entry)
 
@@ -219,7 +376,7 @@ class TestAddCacheHeaders:
         """Should add Age header."""
         response = Response()
         entry = CacheEntry(
-            data={}, etag='"abc"', created_at=time.time() - 100, ttl=3600
+            data={}, etag='"abc"', created_at=time.monotonic_ns() - 100 * NS, ttl=3600
         )
 
         add_cache_headers(response, entry)
@@ -237,7 +394,9 @@ class TestCheckEtagMatch:
         mock_request = MagicMock(spec=Request)
         mock_request.headers.get.return_value = None
 
-        entry = CacheEntry(data={}, etag='"abc"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         result = check_etag_match(mock_request, entry)
 
@@ -248,7 +407,9 @@ class TestCheckEtagMatch:
         mock_request = MagicMock(spec=Request)
         mock_request.headers.get.return_value = '"abc123"'
 
-        entry = CacheEntry(data={}, etag='"abc123"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         result = check_etag_match(mock_request, entry)
 
@@ -259,7 +420,9 @@ class TestCheckEtagMatch:
         mock_request = MagicMock(spec=Request)
         mock_request.headers.get.return_value = '"xyz789"'
 
-        entry = CacheEntry(data={}, etag='"abc123"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         result = check_etag_match(mock_request, entry)
 
@@ -270,7 +433,9 @@ class TestCheckEtagMatch:
         mock_request = MagicMock(spec=Request)
         mock_request.headers.get.return_value = '"aaa", "bbb", "abc123", "ccc"'
 
-        entry = CacheEntry(data={}, etag='"abc123"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         result = check_etag_match(mock_request, entry)
 
@@ -281,7 +446,9 @@ class TestCheckEtagMatch:
         mock_request = MagicMock(spec=Request)
         mock_request.headers.get.return_value = 'W/"abc123"'
 
-        entry = CacheEntry(data={}, etag='"abc123"', created_at=time.time(), ttl=3600)
+        entry = CacheEntry(
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
+        )
 
         result = check_etag_match(mock_request, entry)
 
@@ -320,10 +487,242 @@ class TestCacheResponseDecorator:
             result1 = await test_function(request=mock_request)
             result2 = await test_function(request=mock_request)
 
-        assert result1 == {"data": "result"}
-        assert result2 == {"data": "result"}
+        assert json.loads(result1.body) == {"data": "result"}
+        assert json.loads(result2.body) == {"data": "result"}
+        assert result1.headers["X-Cache"] == "MISS"
+        assert result2.headers["X-Cache"] == "HIT"
         assert call_count == 1  # Function called only once
 
+    @pytest.mark.asyncio
+    async def test_cache_hit_serves_stored_bytes(self):
+        """A hit should return the stored body without serializing again."""
+        models = DiseaseListResponse(
+            diseases=[DiseaseResponse(id=1, icd_code="E11")], total=1
+        )
+
+        @cache_response("test_hit_bytes")
+        async def test_function(request=None):
+            return models
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers = {}
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            miss = await test_function(request=mock_request)
+            with patch("api.services.cache.serialize_body", side_effect=AssertionError):
+                hit = await test_function(request=mock_request)
+
+        assert hit.headers["X-Cache"] == "HIT"
+        assert hit.body == miss.body == serialize_body(models)
+
+    @pytest.mark.asyncio
+    async def test_decorator_resolves_cache_once(self):
+        """The cache instance should be looked up on the first call only."""
+
+        @cache_response("test_resolve_once")
+        async def test_function(request=None):
+            return {"data": "result"}
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers.get.return_value = None
+
+        with (
+            patch("api.services.cache.get_settings") as mock_settings,
+            patch.object(
+                ResponseCache, "get_instance", wraps=ResponseCache.get_instance
+            ) as get_instance,
+        ):
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            for _ in range(3):
+                await test_function(request=mock_request)
+
+        get_instance.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_decorator_can_ignore_query_params(self):
+        """With vary_on_query disabled, query strings should share one entry."""
+        call_count = 0
+
+        @cache_response("test_no_query", vary_on_query=False)
+        async def test_function(request=None):
+            nonlocal call_count
+            call_count += 1
+            return {"data": "result"}
+
+        requests = []
+        for query in ({}, {"_": "123"}):
+            mock_request = MagicMock(spec=Request)
+            mock_request.url.path = "/api/test"
+            mock_request.query_params = query
+            mock_request.headers.get.return_value = None
+            requests.append(mock_request)
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            await test_function(request=requests[0])
+            result = await test_function(request=requests[1])
+
+        assert result.headers["X-Cache"] == "HIT"
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_decorator_serves_gzip_when_accepted(self):
+        """Large cached bodies should be served gzipped to clients that accept it."""
+        import gzip
+
+        payload = {"items": ["x" * 50] * 100}
+
+        @cache_response("test_gzip")
+        async def test_function(request=None):
+            return payload
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers = {"Accept-Encoding": "gzip, deflate"}
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            response = await test_function(request=mock_request)
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert json.loads(gzip.decompress(response.body)) == payload
+
+    @pytest.mark.asyncio
+    async def test_decorator_serves_plain_body_without_accept_encoding(self):
+        """Clients that don't accept gzip should get the uncompressed body."""
+        payload = {"items": ["x" * 50] * 100}
+
+        @cache_response("test_plain")
+        async def test_function(request=None):
+            return payload
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers = {}
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            response = await test_function(request=mock_request)
+
+        assert "Content-Encoding" not in response.headers
+        assert json.loads(response.body) == payload
+
+    @pytest.mark.asyncio
+    async def test_decorator_uses_data_version_etag(self):
+        """With a data version, the ETag should come from the version."""
+
+        async def data_version(request):
+            return "v1"
+
+        @cache_response("test_version_etag", data_version=data_version)
+        async def test_function(request=None):
+            return {"data": "result"}
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {"a": "1"}
+        mock_request.headers = {}
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            response = await test_function(request=mock_request)
+
+        assert response.headers["ETag"] == version_etag("/api/test", {"a": "1"}, "v1")
+
+    @pytest.mark.asyncio
+    async def test_decorator_revalidates_without_cache_entry(self):
+        """A current ETag should get a 304 without running the route."""
+        call_count = 0
+
+        async def data_version(request):
+            return "v1"
+
+        @cache_response("test_version_304", data_version=data_version)
+        async def test_function(request=None):
+            nonlocal call_count
+            call_count += 1
+            return {"data": "result"}
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers = {"If-None-Match": version_etag("/api/test", {}, "v1")}
+
+        with (
+            patch("api.services.cache.get_settings") as mock_settings,
+            patch("api.services.cache.get_runtime_settings") as mock_runtime,
+        ):
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+            mock_runtime.return_value.cache_stale_while_revalidate = 60
+
+            response = await test_function(request=mock_request)
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["Cache-Control"] == (
+            "public, max-age=3600, stale-while-revalidate=60"
+        )
+        assert call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_decorator_drops_entries_from_old_version(self):
+        """A cached body built from an older data version should not be served."""
+        versions = iter(["v1", "v2"])
+        call_count = 0
+
+        async def data_version(request):
+            return next(versions)
+
+        @cache_response("test_version_stale", data_version=data_version)
+        async def test_function(request=None):
+            nonlocal call_count
+            call_count += 1
+            return {"call": call_count}
+
+        mock_request = MagicMock(spec=Request)
+        mock_request.url.path = "/api/test"
+        mock_request.query_params = {}
+        mock_request.headers = {}
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = True
+            mock_settings.return_value.cache_diseases_ttl = 3600
+            mock_settings.return_value.cache_max_size = 1000
+
+            await test_function(request=mock_request)
+            response = await test_function(request=mock_request)
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert json.loads(response.body) == {"call": 2}
+
     @pytest.mark.asyncio
     async def test_decorator_bypasses_when_disabled(self):
         """Decorator should bypass cache when disabled."""
@@ -347,6 +746,23 @@ class TestCacheResponseDecorator:
 
         assert call_count == 2  # Function called twice
 
+    @pytest.mark.asyncio
+    async def test_decorator_serializes_when_disabled(self):
+        """Uncached results should still be returned as pre-serialized JSON."""
+        diseases = [DiseaseResponse(id=1, icd_code="E11")]
+
+        @cache_response("test_disabled_body")
+        async def test_function(request=None):
+            return diseases
+
+        with patch("api.services.cache.get_settings") as mock_settings:
+            mock_settings.return_value.cache_enabled = False
+            response = await test_function(request=None)
+
+        assert isinstance(response, Response)
+        assert "X-Cache" not in response.headers
+        assert response.body == serialize_body(diseases)
+
 
 class TestCacheUtilityFunctions:
     """Tests for cache utility functions."""
@@ -384,6 +800,21 @@ class TestCacheUtilityFunctions:
         assert "cache_a" in names
         assert "cache_b" in names
 
+    def test_serialize_body_models_match_encoder_output(self):
+        """Models dumped by pydantic-core should match the generic path."""
+        diseases = [
+            DiseaseResponse(id=1, icd_code="E11", name_english="Diabetes"),
+            DiseaseResponse(id=2, icd_code="I10", prevalence_total=0.25),
+        ]
+        page = DiseaseListResponse(diseases=diseases, total=2)
+
+        for data in (page, diseases):
+            assert serialize_body(data) == prerender_json(jsonable_encoder(data))
+
+    def test_serialize_body_plain_data(self):
+        """Non-model data should still serialize to compact JSON."""
+        assert serialize_body({"data": [1, 2]}) == b'{"data":[1,2]}'
+
 
 class TestCacheTTLConfiguration:
     """Tests for cache TTL configuration mapping."""
@@ -549,7 +980,7 @@ class TestGetCacheHeadersFromRequest:
         mock_request = MagicMock(spec=Request)
         mock_request.state.cache_status = "HIT"
         mock_request.state.cache_entry = CacheEntry(
-            data={}, etag='"abc123"', created_at=time.time(), ttl=3600
+            data={}, etag='"abc123"', created_at=time.monotonic_ns(), ttl=3600
         )
 
         headers = get_cache_headers_from_request(mock_request)
@@ -578,7 +1009,7 @@ class TestGetCacheHeadersFromRequest:
         mock_request = MagicMock(spec=Request)
         mock_request.state.cache_status = "MISS"
         mock_request.state.cache_entry = CacheEntry(
-            data={}, etag='"def456"', created_at=time.time(), ttl=3600
+            data={}, etag='"def456"', created_at=time.monotonic_ns(), ttl=3600
         )
 
         headers = get_cache_headers_from_request(mock_request)
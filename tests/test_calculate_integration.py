@@ -286,6 +286,25 @@ class TestLoggingSecurity:
         logger.removeHandler(handler)
 
 
+class TestCalculationBackPressure:
+    """Test the concurrency cap on risk calculations."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_all_slots_busy(self):
+        """A request should get a slot only while one is free."""
+        import asyncio
+
+        import api.routes.calculate as calculate
+
+        with patch.object(calculate, "_calculation_slots", asyncio.Semaphore(1)):
+            with patch.object(calculate, "_calculation_queue_timeout", 0.01):
+                assert await calculate._acquire_calculation_slot() is True
+                assert await calculate._acquire_calculation_slot() is False
+
+                calculate._calculation_slots.release()
+                assert await calculate._acquire_calculation_slot() is True
+
+
 class TestSearchEndpointSecurity:
     """Test SQL injection prevention in search endpoint."""
 
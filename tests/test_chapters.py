@@ -0,0 +1,100 @@
+"""
+Tests for chapter routes.
+
+Tests the chapter query and serving the startup-loaded list from app.state.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_db
+from api.rate_limit import limiter
+from api.routes import chapters
+from api.schemas.diseases import ChapterResponse
+from api.services.cache import clear_all_caches
+
+
+def make_client(rows):
+    """Build a Supabase client mock returning the given chapter rows."""
+    client = MagicMock()
+    client.table.return_value.select.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=rows)
+    )
+    return client
+
+
+def make_app(client):
+    """Build an app serving only the chapters router."""
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.include_router(chapters.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: client
+    return app
+
+
+class TestLoadChapters:
+    """Tests for the chapter query."""
+
+    def test_builds_models_with_disease_counts(self):
+        """Each row should become a ChapterResponse with its disease count."""
+        client = make_client(
+            [
+                {
+                    "chapter_code": "IV",
+                    "chapter_name": "Endocrine",
+                    "diseases": [{"count": 42}],
+                },
+                {"chapter_code": "XX", "chapter_name": "External", "diseases": []},
+            ]
+        )
+
+        result = asyncio.run(chapters.load_chapters(client))
+
+        assert [c.disease_count for c in result] == [42, 0]
+        assert result[0].chapter_code == "IV"
+
+    def test_empty_table(self):
+        """No rows should give an empty list."""
+        assert asyncio.run(chapters.load_chapters(make_client([]))) == []
+
+
+class TestListChapters:
+    """Tests for GET /api/chapters."""
+
+    def setup_method(self):
+        clear_all_caches()
+
+    def teardown_method(self):
+        clear_all_caches()
+
+    def test_serves_preloaded_chapters_without_querying(self):
+        """Chapters loaded at startup should be served from app.state."""
+        client = make_client([])
+        app = make_app(client)
+        app.state.chapters = [
+            ChapterResponse(
+                chapter_code="IV", chapter_name="Endocrine", disease_count=1
+            )
+        ]
+
+        response = TestClient(app).get("/api/chapters")
+
+        assert response.status_code == 200
+        assert response.json()[0]["chapter_code"] == "IV"
+        client.table.assert_not_called()
+
+    def test_queries_when_not_preloaded(self):
+        """A failed startup load should fall back to querying once."""
+        client = make_client(
+            [{"chapter_code": "IV", "chapter_name": "Endocrine", "diseases": []}]
+        )
+        app = make_app(client)
+
+        response = TestClient(app).get("/api/chapters")
+
+        assert response.status_code == 200
+        assert response.json()[0]["chapter_name"] == "Endocrine"
+        assert app.state.chapters[0].chapter_code == "IV"
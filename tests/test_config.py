@@ -0,0 +1,168 @@
+"""
+Tests for application settings.
+
+Tests Supabase URL/key resolution and settings immutability.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from api.config import Settings
+
+
+def _settings(**kwargs) -> Settings:
+    """Build settings from explicit values only, ignoring env and .env file."""
+    return Settings(_env_file=None, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def clear_supabase_env(monkeypatch):
+    """Remove Supabase env vars so tests control the inputs."""
+    for name in (
+        "SUPABASE_URL",
+        "SUPABASE_KEY",
+        "SUPABASE_SERVICE_KEY",
+        "SUPABASE_PROJECT_REF",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+class TestSupabaseConfigResolution:
+    """Tests for Supabase URL and key resolution."""
+
+    def test_url_built_from_project_ref(self):
+        """URL should be constructed from the project reference."""
+        settings = _settings(supabase_project_ref="abc", supabase_key="k")
+        assert settings.supabase_url == "https://abc.supabase.co"
+
+    def test_service_key_used_as_fallback(self):
+        """Service key should fill in a missing API key."""
+        settings = _settings(
+            supabase_url="https://x.supabase.co", supabase_service_key="s"
+        )
+        assert settings.supabase_key == "s"
+        # The alias is cleared so the secret is only held once
+        assert settings.supabase_service_key is None
+
+    def test_keys_hidden_from_repr(self):
+        """Secrets should not appear in the settings repr."""
+        settings = _settings(
+            supabase_url="https://x.supabase.co", supabase_key="secret-key"
+        )
+        assert "secret-key" not in repr(settings)
+
+    def test_missing_url_raises(self):
+        """Missing URL and project ref should fail validation."""
+        with pytest.raises(ValidationError):
+            _settings(supabase_key="k")
+
+    def test_missing_key_raises(self):
+        """Missing key and service key should fail validation."""
+        with pytest.raises(ValidationError):
+            _settings(supabase_url="https://x.supabase.co")
+
+    def test_rejects_non_https_url(self):
+        """Non-HTTPS Supabase URLs should be rejected."""
+        with pytest.raises(ValidationError):
+            _settings(supabase_url="http://x.supabase.co", supabase_key="k")
+
+
+class TestSettingsImmutability:
+    """Tests for frozen settings."""
+
+    def test_settings_are_frozen(self):
+        """Settings should not be mutable after construction."""
+        settings = _settings(supabase_url="https://x.supabase.co", supabase_key="k")
+        with pytest.raises(ValidationError):
+            settings.port = 8000
+
+
+class TestCorsSettings:
+    """Tests for CORS settings normalization."""
+
+    def test_origins_normalized(self):
+        """Origins should be lowercased without trailing slashes."""
+        settings = _settings(
+            supabase_url="https://x.supabase.co",
+            supabase_key="k",
+            cors_origins=" HTTP://Localhost:3000/ ,https://app.example.com",
+        )
+        assert settings.cors_origins == [
+            "http://localhost:3000",
+            "https://app.example.com",
+        ]
+
+    def test_methods_upper_cased(self):
+        """Methods should be upper-cased to match request methods."""
+        settings = _settings(
+            supabase_url="https://x.supabase.co",
+            supabase_key="k",
+            cors_allow_methods="get, post",
+        )
+        assert settings.cors_allow_methods == ["GET", "POST"]
+
+
+class TestRateLimitSettings:
+    """Tests for rate limit storage settings."""
+
+    def test_defaults_to_memory_moving_window(self):
+        """Defaults should keep counters in process with a moving window."""
+        settings = _settings(supabase_url="https://x.supabase.co", supabase_key="k")
+        assert settings.rate_limit_storage_uri == "memory://"
+        assert settings.rate_limit_strategy == "moving-window"
+
+    def test_redis_url_used_as_storage_fallback(self, monkeypatch):
+        """REDIS_URL should configure the storage when no explicit URI is set."""
+        monkeypatch.delenv("RATE_LIMIT_STORAGE_URI", raising=False)
+        monkeypatch.setenv("REDIS_URL", "redis://cache:6379/0")
+
+        settings = _settings(supabase_url="https://x.supabase.co", supabase_key="k")
+
+        assert settings.rate_limit_storage_uri == "redis://cache:6379/0"
+
+    def test_explicit_storage_uri_wins_over_redis_url(self, monkeypatch):
+        """RATE_LIMIT_STORAGE_URI should take precedence over REDIS_URL."""
+        monkeypatch.setenv("RATE_LIMIT_STORAGE_URI", "redis://limits:6379/1")
+        monkeypatch.setenv("REDIS_URL", "redis://cache:6379/0")
+
+        settings = _settings(supabase_url="https://x.supabase.co", supabase_key="k")
+
+        assert settings.rate_limit_storage_uri == "redis://limits:6379/1"
+
+    def test_rejects_unknown_strategy(self):
+        """Unknown rate limit strategies should fail validation."""
+        with pytest.raises(ValidationError, match="rate limit strategy"):
+            _settings(
+                supabase_url="https://x.supabase.co",
+                supabase_key="k",
+                rate_limit_strategy="token-bucket",
+            )
+
+
+class TestRuntimeSettings:
+    """Tests for the frozen runtime settings snapshot."""
+
+    def test_snapshot_copies_values(self):
+        """Snapshot should mirror the validated settings."""
+        from api.config import RuntimeSettings
+
+        settings = _settings(
+            supabase_url="https://x.supabase.co", supabase_key="k", debug=True
+        )
+        runtime = RuntimeSettings.from_settings(settings)
+
+        assert runtime.debug is True
+        assert runtime.app_version == settings.app_version
+        assert runtime.api_rate_limit == settings.api_rate_limit
+
+    def test_snapshot_is_immutable(self):
+        """Snapshot fields cannot be reassigned."""
+        from dataclasses import FrozenInstanceError
+
+        from api.config import RuntimeSettings
+
+        settings = _settings(supabase_url="https://x.supabase.co", supabase_key="k")
+        runtime = RuntimeSettings.from_settings(settings)
+
+        with pytest.raises(FrozenInstanceError):
+            runtime.debug = True
@@ -121,22 +121,43 @@ class TestGetExistingIndexes:
         assert len(result) == 2
 
 
+class TestGetRequiredIndexDefinitions:
+    """Tests for the single-query required index lookup."""
+
+    def test_single_query_filters_exact_pairs(self):
+        """One query should be issued and only required pairs returned."""
+        from verify_indexes import get_required_index_definitions
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            ("diseases", "idx_diseases_icd_code", "CREATE INDEX a"),
+            # Index name is required, but on a different table
+            ("disease_relationships", "idx_diseases_chapter", "CREATE INDEX b"),
+        ]
+        mock_cursor.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_cursor.__exit__ = MagicMock(return_value=False)
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        result = get_required_index_definitions(mock_conn)
+
+        assert mock_cursor.execute.call_count == 1
+        assert result == {("diseases", "idx_diseases_icd_code"): "CREATE INDEX a"}
+
+
 class TestVerifyAllIndexes:
     """Tests for verify_all_indexes function."""
 
-    @patch("verify_indexes.get_existing_indexes")
+    @patch("verify_indexes.get_required_index_definitions")
     def test_verify_all_indexes_all_exist(self, mock_get_existing):
         """Test verification when all indexes exist."""
-        from verify_indexes import verify_all_indexes, REQUIRED_INDEXES
+        from verify_indexes import verify_all_indexes, REQUIRED_INDEX_PAIRS
 
         # Mock all indexes as existing
-        def mock_existing(conn, table_name):
-            return {
-                idx: f"CREATE INDEX {idx}..."
-                for idx in REQUIRED_INDEXES.get(table_name, [])
-            }
-
-        mock_get_existing.side_effect = mock_existing
+        mock_get_existing.return_value = {
+            pair: f"CREATE INDEX {pair[1]}..." for pair in REQUIRED_INDEX_PAIRS
+        }
 
         mock_conn = MagicMock()
         results = verify_all_indexes(mock_conn, verbose=False)
@@ -144,18 +165,15 @@ class TestVerifyAllIndexes:
         # All indexes should exist
         assert all(r.exists for r in results)
 
-    @patch("verify_indexes.get_existing_indexes")
+    @patch("verify_indexes.get_required_index_definitions")
     def test_verify_all_indexes_some_missing(self, mock_get_existing):
         """Test verification when some indexes are missing."""
-        from verify_indexes import verify_all_indexes, REQUIRED_INDEXES
-
-        # Mock some indexes as missing
-        def mock_existing(conn, table_name):
-            if table_name == "diseases":
-                return {"idx_diseases_icd_code": "CREATE INDEX..."}  # Only one exists
-            return {}
+        from verify_indexes import verify_all_indexes
 
-        mock_get_existing.side_effect = mock_existing
+        # Mock some indexes as missing (only one exists)
+        mock_get_existing.return_value = {
+            ("diseases", "idx_diseases_icd_code"): "CREATE INDEX..."
+        }
 
         mock_conn = MagicMock()
         results = verify_all_indexes(mock_conn, verbose=False)
@@ -274,3 +292,136 @@ class TestHealthCheckDatabase:
         assert result.status == "healthy"
         assert "database" in result.checks
         assert result.checks["database"]["status"] == "ok"
+
+
+class TestStartupIndexVerification:
+    """Tests for the API's RPC-based startup index verification."""
+
+    @pytest.fixture(autouse=True)
+    def reset_index_check_result(self):
+        """Clear the memoized verdict so each test runs a fresh check."""
+        from api import dependencies
+
+        with patch.object(dependencies, "_index_check_result", None):
+            yield
+
+    @staticmethod
+    def _mock_client(data=None, error=None):
+        """Build a mock Supabase client whose rpc().execute() returns data."""
+        client = MagicMock()
+        execute = client.rpc.return_value.execute
+        if error is not None:
+            execute.side_effect = error
+        else:
+            execute.return_value = MagicMock(data=data)
+
+        async def _execute():
+            return execute()
+
+        client.rpc.return_value.execute = _execute
+        return client
+
+    @pytest.mark.asyncio
+    async def test_all_indexes_present(self):
+        """Empty RPC result means every required index exists."""
+        from api import dependencies
+
+        client = self._mock_client(data=[])
+        with patch.object(dependencies, "_supabase_client", client):
+            all_exist, missing = await dependencies.verify_database_indexes()
+
+        assert all_exist is True
+        assert missing == []
+        name, params = client.rpc.call_args.args
+        assert name == "check_required_indexes"
+        assert "disease_relationships.idx_rel_composite" in params["required"]
+
+    @pytest.mark.asyncio
+    async def test_reports_missing_indexes(self):
+        """Missing index names from the RPC should be returned."""
+        from api import dependencies
+
+        client = self._mock_client(data=["diseases.idx_diseases_chapter"])
+        with patch.object(dependencies, "_supabase_client", client):
+            all_exist, missing = await dependencies.verify_database_indexes()
+
+        assert all_exist is False
+        assert missing == ["diseases.idx_diseases_chapter"]
+
+    @pytest.mark.asyncio
+    async def test_rpc_failure_does_not_block_startup(self):
+        """RPC errors (e.g. migration not applied) should be non-fatal."""
+        from api import dependencies
+
+        client = self._mock_client(error=Exception("function does not exist"))
+        with patch.object(dependencies, "_supabase_client", client):
+            all_exist, missing = await dependencies.verify_database_indexes()
+
+        assert all_exist is True
+        assert missing == []
+
+    @pytest.mark.asyncio
+    async def test_skips_without_client(self):
+        """Verification is skipped when the Supabase client is unavailable."""
+        from api import dependencies
+
+        with patch.object(dependencies, "_supabase_client", None):
+            assert await dependencies.verify_database_indexes() == (True, [])
+
+    @pytest.mark.asyncio
+    async def test_prefers_pg_pool_when_available(self):
+        """A configured asyncpg pool should be queried instead of the RPC."""
+        from contextlib import asynccontextmanager
+
+        from api import dependencies
+
+        conn = MagicMock()
+
+        async def _fetch(query, tables, indexes):
+            assert "diseases" in tables
+            assert "idx_rel_composite" in indexes
+            return [{"name": name} for name in dependencies.REQUIRED_INDEX_NAMES[1:]]
+
+        conn.fetch = _fetch
+
+        @asynccontextmanager
+        async def _acquire(timeout=None):
+            yield conn
+
+        pool = MagicMock()
+        pool.acquire = _acquire
+        client = self._mock_client(data=[])
+
+        with patch.object(dependencies, "_pg_pool", pool), patch.object(
+            dependencies, "_supabase_client", client
+        ):
+            all_exist, missing = await dependencies.verify_database_indexes()
+
+        assert all_exist is False
+        assert missing == dependencies.REQUIRED_INDEX_NAMES[:1]
+        client.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_result_memoized(self):
+        """A successful check should be cached and reused."""
+        from api import dependencies
+
+        client = self._mock_client(data=["diseases.idx_diseases_chapter"])
+        with patch.object(dependencies, "_supabase_client", client):
+            first = await dependencies.verify_database_indexes()
+            second = await dependencies.verify_database_indexes()
+
+        assert first == second == (False, ["diseases.idx_diseases_chapter"])
+        assert client.rpc.call_count == 1
+        assert dependencies.get_index_check_result() == first
+
+    @pytest.mark.asyncio
+    async def test_failed_check_not_memoized(self):
+        """Failed checks should not be cached."""
+        from api import dependencies
+
+        client = self._mock_client(error=Exception("timeout"))
+        with patch.object(dependencies, "_supabase_client", client):
+            await dependencies.verify_database_indexes()
+
+        assert dependencies.get_index_check_result() is None
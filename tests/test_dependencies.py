@@ -0,0 +1,231 @@
+"""
+Tests for shared client dependencies.
+
+Tests the pooled httpx client used by the Supabase client and the
+request-scoped database dependency.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+import api.dependencies as dependencies
+from api.config import Settings
+from api.dependencies import (
+    _create_http_client,
+    call_optional_rpc,
+    get_db,
+    load_icd_to_id,
+    require_internal_key,
+)
+
+
+def _settings(**kwargs) -> Settings:
+    """Build settings from explicit values only, ignoring env and .env file."""
+    return Settings(
+        _env_file=None,
+        supabase_url="https://x.supabase.co",
+        supabase_key="k",
+        **kwargs,
+    )
+
+
+class TestCreateHttpClient:
+    """Tests for _create_http_client."""
+
+    def test_pool_limits_and_retries_from_settings(self):
+        """Pool limits and connect retries should come from settings."""
+        client = _create_http_client(
+            _settings(db_max_connections=7, db_connect_retries=2, db_http2=False)
+        )
+        try:
+            pool = client._transport._pool
+            assert isinstance(client._transport, httpx.AsyncHTTPTransport)
+            assert pool._max_connections == 7
+            assert pool._retries == 2
+        finally:
+            asyncio.run(client.aclose())
+
+    def test_timeouts_from_settings(self):
+        """Request and connect timeouts should come from settings."""
+        client = _create_http_client(
+            _settings(db_timeout=3.0, db_connect_timeout=1.0, db_http2=False)
+        )
+        try:
+            assert client.timeout.read == 3.0
+            assert client.timeout.connect == 1.0
+        finally:
+            asyncio.run(client.aclose())
+
+
+class TestGetDb:
+    """Tests for the get_db dependency."""
+
+    def test_returns_client_from_app_state(self):
+        """get_db should reuse the client stored on app.state at startup."""
+        client = MagicMock()
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(supabase=client))
+        )
+
+        assert asyncio.run(get_db(request)) is client
+
+    def test_late_initialization_cached_on_app_state(self):
+        """Without a startup client, get_db should initialize once and cache it."""
+        client = MagicMock()
+        state = SimpleNamespace()
+        request = SimpleNamespace(app=SimpleNamespace(state=state))
+
+        with (
+            patch.object(dependencies, "_supabase_client", None),
+            patch.object(
+                dependencies, "get_supabase_client", AsyncMock(return_value=client)
+            ) as get_client,
+        ):
+            assert asyncio.run(get_db(request)) is client
+            assert asyncio.run(get_db(request)) is client
+
+        assert state.supabase is client
+        get_client.assert_awaited_once()
+
+    def test_routes_use_app_state_client(self):
+        """Routes needing the database should get the client only through get_db."""
+        from fastapi.routing import APIRoute
+
+        from api.routes import calculate, chapters, diseases, health, network
+
+        for module in (calculate, chapters, diseases, health, network):
+            for route in module.router.routes:
+                if not isinstance(route, APIRoute):
+                    continue
+                calls = {dep.call for dep in route.dependant.dependencies}
+                assert calls <= {
+                    get_db,
+                    require_internal_key,
+                }, f"{route.path} has other dependencies"
+
+
+class TestRequireInternalKey:
+    """Tests for the require_internal_key dependency."""
+
+    def check(self, configured, sent):
+        runtime = MagicMock(internal_metrics_key=configured)
+        with patch.object(dependencies, "get_runtime_settings", return_value=runtime):
+            return asyncio.run(require_internal_key(sent))
+
+    def test_open_when_no_key_configured(self):
+        """Without INTERNAL_METRICS_KEY the endpoint should stay open."""
+        assert self.check(None, None) is None
+
+    def test_matching_key_allowed(self):
+        """The configured key should be accepted."""
+        assert self.check("secret", "secret") is None
+
+    @pytest.mark.parametrize("sent", [None, "", "wrong"])
+    def test_missing_or_wrong_key_rejected(self, sent):
+        """A missing or wrong key should be rejected with 403."""
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc_info:
+            self.check("secret", sent)
+
+        assert exc_info.value.status_code == 403
+
+
+class TestCallOptionalRpc:
+    """Tests for call_optional_rpc."""
+
+    def make_client(self, error=None):
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[1]), side_effect=error
+        )
+        return client
+
+    def call(self, client):
+        return asyncio.run(
+            call_optional_rpc(client, "fn", {"a": 1}, migration="999_fn.sql")
+        )
+
+    def test_returns_response(self):
+        """A deployed RPC should return its response."""
+        client = self.make_client()
+
+        assert self.call(client).data == [1]
+        client.rpc.assert_called_once_with("fn", {"a": 1})
+
+    def test_missing_rpc_recorded_and_skipped(self):
+        """A missing RPC should return None and not be called again."""
+        client = self.make_client(
+            APIError({"code": dependencies._RPC_NOT_FOUND, "message": "missing"})
+        )
+
+        assert self.call(client) is None
+        assert self.call(client) is None
+        assert "fn" in dependencies._missing_rpcs
+        client.rpc.assert_called_once()
+
+    def test_other_errors_propagate(self):
+        """Errors other than a missing function should not be swallowed."""
+        client = self.make_client(APIError({"code": "57014", "message": "timeout"}))
+
+        with pytest.raises(APIError):
+            self.call(client)
+
+        assert "fn" not in dependencies._missing_rpcs
+
+
+class TestInitSupabaseClient:
+    """Tests for the shared Supabase client singleton."""
+
+    def test_concurrent_callers_share_one_client(self):
+        """Concurrent initialization should create a single client."""
+        client = MagicMock()
+        create = AsyncMock(return_value=client)
+
+        async def init_many():
+            return await asyncio.gather(
+                *(dependencies.init_supabase_client() for _ in range(5))
+            )
+
+        with (
+            patch.object(dependencies, "_supabase_client", None),
+            patch.object(dependencies, "_http_client", None),
+            patch.object(dependencies, "_supabase_client_lock", asyncio.Lock()),
+            patch.object(dependencies, "create_async_client", create),
+            patch.object(dependencies, "_create_http_client", MagicMock()),
+        ):
+            clients = asyncio.run(init_many())
+
+        assert all(c is client for c in clients)
+        create.assert_awaited_once()
+
+
+class TestLoadIcdToId:
+    """Tests for the startup ICD code mapping."""
+
+    def test_pages_until_empty_response(self):
+        """All pages should be merged, even when pages come back short."""
+        pages = [
+            [{"id": 1, "icd_code": "E11"}, {"id": 2, "icd_code": "I10"}],
+            [{"id": 3, "icd_code": "N18"}],
+            [],
+        ]
+        client = MagicMock()
+        query = client.table.return_value.select.return_value.order.return_value
+        query.range.return_value.execute = AsyncMock(
+            side_effect=[MagicMock(data=page) for page in pages]
+        )
+
+        mapping = asyncio.run(load_icd_to_id(client, page_size=2))
+
+        assert mapping == {"E11": 1, "I10": 2, "N18": 3}
+        assert [c.args for c in query.range.call_args_list] == [
+            (0, 1),
+            (2, 3),
+            (3, 4),
+        ]
@@ -0,0 +1,234 @@
+"""
+Tests for disease routes helpers.
+
+Tests the row-to-model transforms and the ICD-code relationship lookup.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from postgrest.exceptions import APIError
+
+import api.dependencies as dependencies
+import api.routes.diseases as diseases
+from api.routes.diseases import (
+    _DISEASE_LIST_ADAPTER,
+    _disease_select,
+    _fetch_relationships_by_icd,
+    _other_disease,
+    _search_rows,
+    _with_chapter_name,
+)
+
+
+def make_client(rpc_result=None, rpc_error=None, lookup_data=None):
+    """Build a Supabase client mock for the RPC and fallback queries."""
+    client = MagicMock()
+
+    rpc_execute = AsyncMock(return_value=MagicMock(data=rpc_result))
+    if rpc_error is not None:
+        rpc_execute.side_effect = rpc_error
+    client.rpc.return_value.execute = rpc_execute
+
+    lookup = client.table.return_value.select.return_value.eq.return_value
+    lookup.execute = AsyncMock(return_value=MagicMock(data=lookup_data or []))
+
+    return client
+
+
+class TestRowTransforms:
+    """Tests for turning PostgREST rows into response models."""
+
+    def test_chapter_name_flattened_for_validation(self):
+        """Embedded chapter names should land on the validated models."""
+        rows = [
+            {
+                "id": 1,
+                "icd_code": "E11",
+                "icd_chapters": {"chapter_name": "Endocrine"},
+                "created_at": "2026-01-01",
+            },
+            {"id": 2, "icd_code": "R99", "icd_chapters": None},
+        ]
+
+        diseases = _DISEASE_LIST_ADAPTER.validate_python(_with_chapter_name(rows))
+
+        assert [d.chapter_name for d in diseases] == ["Endocrine", None]
+        assert diseases[0].icd_code == "E11"
+
+    def test_chapter_name_looked_up_by_code(self):
+        """Preloaded chapter names should replace the embed."""
+        rows = [
+            {"id": 1, "icd_code": "E11", "chapter_code": "IV"},
+            {"id": 2, "icd_code": "R99", "chapter_code": None},
+        ]
+
+        result = _with_chapter_name(rows, {"IV": "Endocrine"})
+
+        assert [r["chapter_name"] for r in result] == ["Endocrine", None]
+
+    def test_embed_selected_only_without_chapter_names(self):
+        """Disease queries should drop the chapter embed once names are loaded."""
+        assert "icd_chapters" in _disease_select(None)
+        assert "icd_chapters" not in _disease_select({"IV": "Endocrine"})
+
+    def test_other_disease_picks_opposite_side(self):
+        """The related disease is whichever side was not requested."""
+        row = {
+            "disease_1_id": 5,
+            "disease_2_id": 9,
+            "disease_1": {"id": 5},
+            "disease_2": {"id": 9},
+        }
+
+        assert _other_disease(row, 5) == {"id": 9}
+        assert _other_disease(row, 9) == {"id": 5}
+
+
+class TestFetchRelationshipsByIcd:
+    """Tests for _fetch_relationships_by_icd."""
+
+    def test_uses_single_rpc_call(self):
+        """The ICD lookup and relationship query should share one RPC call."""
+        rows = [{"disease_1_id": 5, "disease_2_id": 9}]
+        client = make_client(rpc_result={"disease_id": 5, "relationships": rows})
+
+        result = asyncio.run(_fetch_relationships_by_icd(client, "E11", 1.5, 10))
+
+        assert result == (5, rows)
+        client.rpc.assert_called_once_with(
+            "get_related_diseases",
+            {"icd_code": "E11", "min_odds_ratio": 1.5, "max_results": 10},
+        )
+        client.table.assert_not_called()
+
+    def test_unknown_icd_code_returns_none(self):
+        """A NULL RPC result should mean the disease does not exist."""
+        client = make_client(rpc_result=None)
+
+        assert asyncio.run(_fetch_relationships_by_icd(client, "Z99", 1.5, 10)) is None
+
+    def test_falls_back_when_rpc_missing(self):
+        """Without the migration, the id lookup should run as a separate query."""
+        client = make_client(
+            rpc_error=APIError({"code": "PGRST202", "message": "not found"}),
+            lookup_data=[{"id": 5}],
+        )
+
+        with patch.object(
+            diseases, "_fetch_relationships", AsyncMock(return_value=[])
+        ) as fetch:
+            result = asyncio.run(_fetch_relationships_by_icd(client, "E11", 1.5, 10))
+
+        assert result == (5, [])
+        fetch.assert_awaited_once_with(client, 5, 1.5, 10)
+        assert "get_related_diseases" in dependencies._missing_rpcs
+
+    def test_other_rpc_errors_propagate(self):
+        """Errors other than a missing function should not be swallowed."""
+        client = make_client(
+            rpc_error=APIError({"code": "57014", "message": "statement timeout"})
+        )
+
+        with pytest.raises(APIError):
+            asyncio.run(_fetch_relationships_by_icd(client, "E11", 1.5, 10))
+
+
+class TestSearchRows:
+    """Tests for _search_rows."""
+
+    def test_uses_ranked_rpc(self):
+        """Search should go through the trigram-indexed RPC."""
+        rows = [{"id": 1, "icd_code": "E11", "chapter_name": "Endocrine"}]
+        client = make_client(rpc_result=rows)
+
+        assert asyncio.run(_search_rows(client, "diab", 20)) == rows
+        client.rpc.assert_called_once_with(
+            "search_diseases", {"term": "diab", "max_results": 20}
+        )
+        client.table.assert_not_called()
+
+    def test_falls_back_to_escaped_ilike(self):
+        """Without the migration, ILIKE filters should escape LIKE wildcards."""
+        client = make_client(
+            rpc_error=APIError({"code": "PGRST202", "message": "not found"})
+        )
+        query = client.table.return_value.select.return_value.or_.return_value
+        query.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[{"id": 1, "icd_code": "E11", "icd_chapters": None}]
+            )
+        )
+
+        rows = asyncio.run(_search_rows(client, "50%", 20))
+
+        assert rows[0]["chapter_name"] is None
+        filters = client.table.return_value.select.return_value.or_.call_args.args[0]
+        assert "name_english.ilike.%50\\%%" in filters
+        assert "search_diseases" in dependencies._missing_rpcs
+
+
+class TestListDiseases:
+    """Tests for the list_diseases route body."""
+
+    def call(self, client, offset):
+        # Unwrap the cache and rate limit decorators to call the route body
+        route = diseases.list_diseases.__wrapped__.__wrapped__
+        request = MagicMock()
+        request.app.state.chapter_names = None
+        return asyncio.run(
+            route(
+                request=request, chapter=None, limit=100, offset=offset, client=client
+            )
+        )
+
+    def test_offset_past_end_reports_total_from_error(self):
+        """A PGRST103 page should be empty, with the total PostgREST reported."""
+        client = MagicMock()
+        select = client.table.return_value.select.return_value
+        select.range.return_value.execute = AsyncMock(
+            side_effect=APIError(
+                {
+                    "code": "PGRST103",
+                    "message": "Requested range not satisfiable",
+                    "details": (
+                        "An offset of 5000 was requested, but there are only "
+                        "1080 rows."
+                    ),
+                }
+            )
+        )
+
+        result = self.call(client, offset=5000)
+
+        assert result.diseases == []
+        assert result.total == 1080
+        select.execute.assert_not_called()
+
+    def test_offset_past_end_counts_without_details(self):
+        """Without a total in the details, a head-only count should supply it."""
+        client = MagicMock()
+        select = client.table.return_value.select.return_value
+        select.range.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "PGRST103", "message": "not satisfiable"})
+        )
+        select.execute = AsyncMock(return_value=MagicMock(count=1080))
+
+        result = self.call(client, offset=5000)
+
+        assert (result.diseases, result.total) == ([], 1080)
+        client.table.return_value.select.assert_called_with(
+            "id", count="exact", head=True
+        )
+
+    def test_other_errors_propagate(self):
+        """Errors other than an out-of-range page should not be swallowed."""
+        client = MagicMock()
+        select = client.table.return_value.select.return_value
+        select.range.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "57014", "message": "statement timeout"})
+        )
+
+        with pytest.raises(APIError):
+            self.call(client, offset=0)
@@ -0,0 +1,111 @@
+"""
+Tests for API exception handlers.
+
+Tests the error response format produced by setup_exception_handlers.
+"""
+
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, Query
+from fastapi.testclient import TestClient
+
+from api.middleware.error_handlers import NotFoundError, setup_exception_handlers
+
+
+def make_client(debug: bool = False) -> TestClient:
+    """Build a minimal app with the API exception handlers installed."""
+    app = FastAPI()
+    with patch("api.middleware.error_handlers.get_settings") as mock_settings:
+        mock_settings.return_value.debug = debug
+        setup_exception_handlers(app)
+
+    @app.get("/missing")
+    async def missing():
+        raise NotFoundError("Disease not found", details={"icd_code": "Z99"})
+
+    @app.get("/validated")
+    async def validated(limit: int = Query(..., ge=1)):
+        return {"limit": limit}
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("secret connection string")
+
+    @app.get("/db-down")
+    async def db_down():
+        raise httpx.ConnectError("connection refused")
+
+    @app.get("/db-slow")
+    async def db_slow():
+        raise httpx.ReadTimeout("timed out")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestExceptionHandlers:
+    """Tests for the registered exception handlers."""
+
+    def test_api_error_response(self):
+        """API errors should use the standard error envelope."""
+        response = make_client().get("/missing")
+
+        assert response.status_code == 404
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {
+            "error": {
+                "type": "NotFoundError",
+                "message": "Disease not found",
+                "details": {"icd_code": "Z99"},
+                "status_code": 404,
+            }
+        }
+
+    def test_validation_error_response(self):
+        """Validation errors should list the failing fields."""
+        response = make_client().get("/validated", params={"limit": 0})
+
+        assert response.status_code == 422
+        error = response.json()["error"]
+        assert error["type"] == "ValidationError"
+        assert error["details"]["errors"][0]["field"] == "limit"
+
+    def test_unhandled_error_hides_details(self):
+        """Unhandled errors should return a generic 500 outside debug mode."""
+        response = make_client().get("/broken")
+
+        assert response.status_code == 500
+        assert response.json() == {
+            "error": {
+                "type": "InternalServerError",
+                "message": "An internal server error occurred",
+                "details": {},
+                "status_code": 500,
+            }
+        }
+
+    def test_unhandled_error_includes_debug_info(self):
+        """Debug mode should include the exception text in the details."""
+        response = make_client(debug=True).get("/broken")
+
+        assert response.status_code == 500
+        details = response.json()["error"]["details"]
+        assert details["debug_info"] == "secret connection string"
+
+    def test_connection_error_becomes_database_error(self):
+        """Supabase connection failures should map to DatabaseError."""
+        response = make_client().get("/db-down")
+
+        assert response.status_code == 500
+        error = response.json()["error"]
+        assert error["type"] == "DatabaseError"
+        assert error["message"] == "Database connection unavailable"
+
+    def test_timeout_becomes_database_error(self):
+        """Supabase timeouts should map to a timed-out DatabaseError."""
+        response = make_client().get("/db-slow")
+
+        assert response.status_code == 500
+        error = response.json()["error"]
+        assert error["type"] == "DatabaseError"
+        assert error["message"] == "Database request timed out"
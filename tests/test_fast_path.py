@@ -0,0 +1,62 @@
+"""
+Tests for fast path middleware.
+
+Tests that probe endpoints are answered directly and other requests pass through.
+"""
+
+import json
+
+import pytest
+
+from api.middleware.fast_path import FastPathMiddleware
+
+
+def make_scope(path: str, method: str = "GET") -> dict:
+    """Build a minimal ASGI HTTP scope."""
+    return {"type": "http", "method": method, "path": path, "headers": []}
+
+
+async def run(scope: dict) -> tuple[list[dict], list[str]]:
+    """Run the middleware and capture sent messages and forwarded paths."""
+    forwarded = []
+
+    async def app(scope, receive, send):
+        forwarded.append(scope["path"])
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await FastPathMiddleware(app)(scope, None, send)
+    return messages, forwarded
+
+
+class TestFastPathMiddleware:
+    """Tests for FastPathMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_serves_liveness_probe_directly(self):
+        """GET /api/live should be answered without calling the app."""
+        messages, forwarded = await run(make_scope("/api/live"))
+
+        assert forwarded == []
+        assert messages[0]["status"] == 200
+        assert json.loads(messages[1]["body"]) == {"status": "alive"}
+        headers = dict(messages[0]["headers"])
+        assert headers[b"content-length"] == str(len(messages[1]["body"])).encode()
+
+    @pytest.mark.asyncio
+    async def test_health_check_not_short_circuited(self):
+        """/api/health checks the database, so it must reach the app."""
+        messages, forwarded = await run(make_scope("/api/health"))
+
+        assert forwarded == ["/api/health"]
+        assert messages == []
+
+    @pytest.mark.asyncio
+    async def test_other_methods_pass_through(self):
+        """Only GET requests take the fast path."""
+        _, forwarded = await run(make_scope("/api/live", method="POST"))
+
+        assert forwarded == ["/api/live"]
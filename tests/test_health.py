@@ -0,0 +1,322 @@
+"""
+Tests for health check routes.
+
+Tests reuse and coalescing of the database connectivity check.
+"""
+
+import asyncio
+import inspect
+import re
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from postgrest.exceptions import APIError
+
+import api.dependencies as dependencies
+import api.routes.health as health
+
+
+def make_client(data=None, error=None):
+    """Build a Supabase client mock for the connectivity_check RPC.
+
+    data stands for the rows in diseases; the RPC answers whether any exist.
+    """
+    client = MagicMock()
+    execute = AsyncMock(return_value=MagicMock(data=bool(data)))
+    if error is not None:
+        execute.side_effect = error
+    client.rpc.return_value.execute = execute
+    return client, execute
+
+
+def make_table_client(data):
+    """Build a Supabase client mock without the connectivity_check RPC."""
+    client = MagicMock()
+    client.rpc.return_value.execute = AsyncMock(
+        side_effect=APIError(
+            {"code": dependencies._RPC_NOT_FOUND, "message": "missing"}
+        )
+    )
+    execute = AsyncMock(return_value=MagicMock(data=data))
+    client.table.return_value.select.return_value.limit.return_value.execute = execute
+    return client, execute
+
+
+def make_pool(has_data=True):
+    """Build an asyncpg pool mock whose connection answers the EXISTS check."""
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=has_data)
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool, conn
+
+
+@pytest.fixture(autouse=True)
+def reset_db_check():
+    """Start each test without remembered connectivity results."""
+    health._db_check_status = None
+    health._db_check_time = 0.0
+    health._db_ok_status = None
+    health._db_ok_time = 0.0
+    yield
+    health._db_check_status = None
+    health._db_check_time = 0.0
+    health._db_ok_status = None
+    health._db_ok_time = 0.0
+
+
+class TestDatabaseConnectivityCache:
+    """Tests for _check_database_connectivity."""
+
+    def test_result_reused_within_ttl(self):
+        """A fresh result should be served without another query."""
+        client, execute = make_client(data=[{"icd_code": "E11"}])
+
+        async def check_twice():
+            first = await health._check_database_connectivity(client)
+            second = await health._check_database_connectivity(client)
+            return first, second
+
+        assert asyncio.run(check_twice()) == ("connected", "connected")
+        execute.assert_awaited_once()
+
+    def test_concurrent_checks_share_one_query(self):
+        """Probes arriving together should wait for a single query."""
+        client, execute = make_client(data=[])
+
+        async def check_concurrently():
+            return await asyncio.gather(
+                *(health._check_database_connectivity(client) for _ in range(5))
+            )
+
+        assert asyncio.run(check_concurrently()) == ["empty"] * 5
+        execute.assert_awaited_once()
+
+    def test_expired_result_is_refreshed(self):
+        """A result older than the TTL should trigger a new query."""
+        client, execute = make_client(error=Exception("connection refused"))
+        health._db_check_status = "connected"
+        health._db_check_time = (
+            health.time.monotonic() - health._settings.health_check_cache_ttl - 1
+        )
+
+        assert asyncio.run(health._check_database_connectivity(client)) == (
+            "disconnected"
+        )
+        execute.assert_awaited_once()
+
+    def test_failed_check_serves_recent_success(self):
+        """A failing check should report the last good result for a while."""
+        client, execute = make_client(error=Exception("connection reset"))
+        health._db_ok_status = "connected"
+        health._db_ok_time = health.time.monotonic()
+
+        assert asyncio.run(health._check_database_connectivity(client)) == ("connected")
+        execute.assert_awaited_once()
+
+    def test_failed_check_reported_once_success_is_old(self):
+        """A successful result past its stale window should not mask failures."""
+        client, _ = make_client(error=Exception("connection reset"))
+        health._db_ok_status = "connected"
+        health._db_ok_time = health.time.monotonic() - health._STALE_RESULT_MAX_AGE - 1
+
+        assert asyncio.run(health._check_database_connectivity(client)) == (
+            "disconnected"
+        )
+
+
+class TestDatabaseConnectivityQuery:
+    """Tests for _query_database_connectivity."""
+
+    def test_uses_pg_pool_when_configured(self):
+        """A configured asyncpg pool should replace the PostgREST query."""
+        client, execute = make_client(data=[{"icd_code": "E11"}])
+        pool, conn = make_pool(has_data=False)
+
+        with patch.object(health, "get_pg_pool", return_value=pool):
+            result = asyncio.run(health._query_database_connectivity(client))
+
+        assert result == "empty"
+        conn.fetchval.assert_awaited_once_with(health._DB_CHECK_QUERY)
+        execute.assert_not_awaited()
+
+    def test_falls_back_to_supabase_without_pool(self):
+        """Without a pool the check should go through the Supabase client."""
+        client, execute = make_client(data=[{"icd_code": "E11"}])
+
+        with patch.object(health, "get_pg_pool", return_value=None):
+            result = asyncio.run(health._query_database_connectivity(client))
+
+        assert result == "connected"
+        client.rpc.assert_called_once_with("connectivity_check", {})
+        execute.assert_awaited_once()
+        client.table.assert_not_called()
+
+    def test_missing_rpc_falls_back_to_row_fetch(self):
+        """Without migration 007 the check should fetch a row, and keep doing so."""
+        client, execute = make_table_client(data=[])
+
+        async def check_twice():
+            first = await health._query_database_connectivity(client)
+            second = await health._query_database_connectivity(client)
+            return first, second
+
+        with patch.object(health, "get_pg_pool", return_value=None):
+            assert asyncio.run(check_twice()) == ("empty", "empty")
+
+        client.rpc.assert_called_once()
+        assert execute.await_count == 2
+
+    def test_pool_failure_reports_disconnected(self):
+        """Errors on the pooled connection should report disconnected."""
+        client, _ = make_client()
+        pool, conn = make_pool()
+        conn.fetchval.side_effect = OSError("connection reset")
+
+        with patch.object(health, "get_pg_pool", return_value=pool):
+            result = asyncio.run(health._query_database_connectivity(client))
+
+        assert result == "disconnected"
+
+    def test_slow_query_times_out(self):
+        """A query slower than health_check_timeout should count as failed."""
+        client, execute = make_client()
+
+        async def slow_execute():
+            await asyncio.sleep(10)
+
+        execute.side_effect = slow_execute
+
+        with (
+            patch.object(health, "get_pg_pool", return_value=None),
+            patch.object(health, "_settings", MagicMock(health_check_timeout=0.01)),
+        ):
+            result = asyncio.run(health._query_database_connectivity(client))
+
+        assert result == "disconnected"
+
+
+class TestLivenessProbe:
+    """Tests for GET /api/live."""
+
+    def test_has_no_dependencies(self):
+        """The liveness probe must not reach the database or any dependency."""
+        from fastapi.routing import APIRoute
+
+        route = next(
+            r
+            for r in health.router.routes
+            if isinstance(r, APIRoute) and r.path == "/live"
+        )
+
+        assert route.dependant.dependencies == []
+
+    def test_returns_prerendered_body(self):
+        """The probe should answer with the constant pre-serialized body."""
+        response = asyncio.run(health.liveness_check(MagicMock()))
+
+        assert response.status_code == 200
+        assert response.body == b'{"status":"alive"}'
+
+
+class TestReadinessProbe:
+    """Tests for GET /api/ready."""
+
+    def test_ready_returns_prerendered_body(self):
+        """A reachable database should give the constant pre-serialized body."""
+        client, _ = make_client(data=[{"icd_code": "E11"}])
+        readiness_check = health.readiness_check.__wrapped__
+
+        response = asyncio.run(readiness_check(request=MagicMock(), supabase=client))
+
+        assert response.status_code == 200
+        assert response.body is health._READY_BODY
+
+    def test_unreachable_database_is_not_ready(self):
+        """A failed database check should answer 503."""
+        from fastapi import HTTPException
+
+        client, _ = make_client(error=Exception("connection refused"))
+        readiness_check = health.readiness_check.__wrapped__
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(readiness_check(request=MagicMock(), supabase=client))
+
+        assert exc_info.value.status_code == 503
+
+
+class TestHealthHandlers:
+    """Tests for the /health handlers' per-request work."""
+
+    def test_settings_not_loaded_per_request(self):
+        """Handlers should read the module's settings snapshot, not reload it."""
+        client, _ = make_client(data=[{"icd_code": "E11"}])
+        health_check = health.health_check.__wrapped__
+        detailed = health.health_check_detailed.__wrapped__
+
+        with (
+            patch.object(health, "get_settings", side_effect=AssertionError),
+            patch.object(health, "get_runtime_settings", side_effect=AssertionError),
+        ):
+            result = asyncio.run(health_check(request=MagicMock(), supabase=client))
+            checks = asyncio.run(detailed(request=MagicMock(), supabase=client))
+
+        assert result.version == health._settings.app_version
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z", result.timestamp)
+        assert checks.checks["config"]["version"] == health._settings.app_version
+
+    def test_detailed_check_fails_on_database_error(self):
+        """Any failing component should make the detailed check answer 503."""
+        from fastapi import HTTPException
+
+        client, _ = make_client(error=Exception("connection refused"))
+        detailed = health.health_check_detailed.__wrapped__
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(detailed(request=MagicMock(), supabase=client))
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.detail["checks"]["config"]["status"] == "ok"
+
+
+class TestIndexCheck:
+    """Tests for the /health/indexes handler."""
+
+    def call(self, result):
+        index_check = health.index_check.__wrapped__
+        with (
+            patch.object(health, "get_index_check_result", return_value=result),
+            patch.object(dependencies, "verify_database_indexes") as verify,
+        ):
+            response = asyncio.run(index_check(request=MagicMock()))
+        verify.assert_not_called()
+        return response
+
+    def test_unverified_without_successful_check(self):
+        """Indexes nobody verified should not be reported as present."""
+        response = self.call(None)
+
+        assert response.all_present is None
+        assert response.missing == []
+
+    def test_reports_memoized_result(self):
+        """A successful check should be reported without querying again."""
+        response = self.call((False, ["diseases.idx_diseases_chapter"]))
+
+        assert response.all_present is False
+        assert response.missing == ["diseases.idx_diseases_chapter"]
+
+    def test_requires_internal_key(self):
+        """The index list names schema objects, so it is internal only."""
+        from fastapi.params import Depends
+
+        deps = [
+            p.default.dependency
+            for p in inspect.signature(
+                health.index_check.__wrapped__
+            ).parameters.values()
+            if isinstance(p.default, Depends)
+        ]
+
+        assert dependencies.require_internal_key in deps
@@ -0,0 +1,239 @@
+"""
+Tests for logging configuration.
+
+Tests the buffered rotating file handler and JSON formatter used by the
+logging pipeline.
+"""
+
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from api import logging_config
+from api.logging_config import (
+    BufferedRotatingFileHandler,
+    ExcInfoQueueHandler,
+    JSONFormatter,
+    add_file_handler,
+)
+
+
+def make_record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    """Build a log record for the given message."""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class TestBufferedRotatingFileHandler:
+    """Tests for BufferedRotatingFileHandler."""
+
+    def test_info_records_are_buffered(self, tmp_path):
+        """INFO records should not hit the file until flushed."""
+        log_file = tmp_path / "api.log"
+        handler = BufferedRotatingFileHandler(str(log_file), flush_interval=60)
+        try:
+            handler.emit(make_record("request logged"))
+            assert log_file.read_text() == ""
+
+            handler.flush()
+            assert "request logged" in log_file.read_text()
+        finally:
+            handler.close()
+
+    def test_error_records_flush_immediately(self, tmp_path):
+        """Records at flush_level should be written right away."""
+        log_file = tmp_path / "api.log"
+        handler = BufferedRotatingFileHandler(str(log_file), flush_interval=60)
+        try:
+            handler.emit(make_record("buffered"))
+            handler.emit(make_record("boom", level=logging.ERROR))
+            contents = log_file.read_text()
+            assert "buffered" in contents
+            assert "boom" in contents
+        finally:
+            handler.close()
+
+    def test_close_flushes_buffer(self, tmp_path):
+        """Closing the handler should write any buffered records."""
+        log_file = tmp_path / "api.log"
+        handler = BufferedRotatingFileHandler(str(log_file), flush_interval=60)
+        handler.emit(make_record("pending"))
+        handler.close()
+
+        assert "pending" in log_file.read_text()
+
+    def test_rolls_over_at_max_bytes(self, tmp_path):
+        """Handler should rotate once the tracked size exceeds maxBytes."""
+        log_file = tmp_path / "api.log"
+        handler = BufferedRotatingFileHandler(
+            str(log_file), maxBytes=100, backupCount=2, flush_interval=60
+        )
+        try:
+            for i in range(10):
+                handler.emit(make_record(f"message number {i:02d}"))
+            handler.flush()
+        finally:
+            handler.close()
+
+        assert (tmp_path / "api.log.1").exists()
+        assert log_file.stat().st_size <= 100
+
+    def test_rollover_counts_bytes_not_characters(self, tmp_path):
+        """Multi-byte characters should count toward maxBytes in bytes."""
+        log_file = tmp_path / "api.log"
+        handler = BufferedRotatingFileHandler(
+            str(log_file),
+            maxBytes=100,
+            backupCount=2,
+            flush_interval=60,
+            encoding="utf-8",
+        )
+        try:
+            # 30 characters, 60 bytes each
+            for _ in range(3):
+                handler.emit(make_record("ü" * 29))
+            handler.flush()
+        finally:
+            handler.close()
+
+        assert (tmp_path / "api.log.2").exists()
+        assert log_file.stat().st_size <= 100
+        assert (tmp_path / "api.log.1").stat().st_size <= 100
+
+
+class TestJSONFormatter:
+    """Tests for JSONFormatter."""
+
+    def test_formats_record_as_json(self):
+        """Records should serialize to a single JSON object."""
+        record = make_record("hello")
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        assert entry["msg"] == "hello"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test"
+        assert "t" in entry
+
+    def test_includes_extra_fields(self):
+        """Fields passed via extra= should become top-level keys."""
+        logger = logging.getLogger("test.json_formatter")
+        record = logger.makeRecord(
+            logger.name,
+            logging.INFO,
+            __file__,
+            1,
+            "%s %s",
+            ("GET", "/api/network"),
+            None,
+            extra={"status": 200, "duration_ms": 1.5},
+        )
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        assert entry["msg"] == "GET /api/network"
+        assert entry["status"] == 200
+        assert entry["duration_ms"] == 1.5
+        assert "args" not in entry
+
+
+class TestQueuePipeline:
+    """Tests for records passing through the queue to the listener."""
+
+    def log_through_queue(self, log) -> dict:
+        """Log via ExcInfoQueueHandler and return the listener's JSON entry."""
+        log_queue = queue.SimpleQueue()
+        stream = io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JSONFormatter())
+        listener = QueueListener(log_queue, output)
+
+        logger = logging.getLogger("test.queue_pipeline")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = ExcInfoQueueHandler(log_queue)
+        logger.addHandler(handler)
+        listener.start()
+        try:
+            log(logger)
+        finally:
+            listener.stop()
+            logger.removeHandler(handler)
+
+        return json.loads(stream.getvalue())
+
+    def test_exception_kept_as_own_field(self):
+        """Tracebacks should reach the JSON formatter as "exc", not inside msg."""
+
+        def log(logger):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed %s", "lookup")
+
+        entry = self.log_through_queue(log)
+
+        assert entry["msg"] == "failed lookup"
+        assert "Traceback" in entry["exc"]
+        assert "ValueError: boom" in entry["exc"]
+
+    def test_arguments_merged_before_queueing(self):
+        """Arguments should be resolved on the calling thread."""
+        values = ["before"]
+
+        def log(logger):
+            logger.info("value %s", values)
+            values[0] = "after"
+
+        entry = self.log_through_queue(log)
+
+        assert entry["msg"] == "value ['before']"
+        assert "exc" not in entry
+
+
+class TestAddFileHandler:
+    """Tests for attaching the file handler at startup."""
+
+    def test_creates_directory_and_attaches_handler(self, tmp_path, monkeypatch):
+        """The log directory should be created and the handler registered."""
+        console = logging.StreamHandler()
+        listener = QueueListener(queue.SimpleQueue(), console)
+        monkeypatch.setattr(logging_config, "_listener", listener)
+        monkeypatch.setattr(logging_config, "_file_handler", None)
+        monkeypatch.setattr(logging_config, "_formatter", logging.Formatter())
+        log_dir = tmp_path / "nested" / "logs"
+
+        add_file_handler(str(log_dir))
+        try:
+            assert log_dir.is_dir()
+            assert listener.handlers[0] is console
+            assert isinstance(listener.handlers[1], BufferedRotatingFileHandler)
+
+            # A second call must not attach another handler
+            add_file_handler(str(log_dir))
+            assert len(listener.handlers) == 2
+        finally:
+            listener.handlers[1].close()
+
+    def test_noop_before_configure(self, tmp_path, monkeypatch):
+        """Without a configured pipeline nothing should be created."""
+        monkeypatch.setattr(logging_config, "_listener", None)
+        monkeypatch.setattr(logging_config, "_file_handler", None)
+
+        add_file_handler(str(tmp_path / "logs"))
+
+        assert not (tmp_path / "logs").exists()
+
+
+class TestConfigureOnStartup:
+    """Tests that logging is configured at startup rather than at import."""
+
+    def test_importing_app_leaves_logging_alone(self):
+        """Importing the app should not install handlers or start the listener."""
+        import api.main  # noqa: F401
+
+        assert logging_config._listener is None
+        assert not any(
+            isinstance(h, QueueHandler) for h in logging.getLogger().handlers
+        )
@@ -0,0 +1,28 @@
+"""
+Tests for the application factory.
+
+Smoke tests that the app module imports and serves its root endpoints, so
+errors in create_application() fail the suite rather than server startup.
+"""
+
+from fastapi.testclient import TestClient
+
+import api.main
+
+
+class TestCreateApplication:
+    """Tests for create_application and the module-level app."""
+
+    def test_openapi_schema_lists_every_router(self):
+        """The OpenAPI schema should build and include each router's paths."""
+        paths = api.main.app.openapi()["paths"]
+
+        for path in ("/", "/api", "/api/health", "/api/network", "/api/chapters"):
+            assert path in paths
+
+    def test_api_info_endpoint(self):
+        """The /api info endpoint should answer without the lifespan."""
+        response = TestClient(api.main.app).get("/api")
+
+        assert response.status_code == 200
+        assert response.json()
@@ -0,0 +1,343 @@
+"""
+Tests for network routes helpers.
+
+Tests the row-to-model transforms for network nodes and edges, the
+network_snapshot RPC and the concurrent node and edge query fallback, and
+the data version behind the network ETag.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import Request
+from postgrest.exceptions import APIError
+from pydantic_core import to_json
+
+from api import dependencies
+from api.routes import network
+from api.routes.network import _EDGE_LIST_ADAPTER, _NODE_LIST_ADAPTER, _edge_fields
+from api.services.cache import cache_response
+
+
+@pytest.fixture(autouse=True)
+def reset_data_version():
+    """Start each test with no cached data version."""
+    network._data_version = None
+    network._data_version_expires = 0.0
+    yield
+    network._data_version = None
+    network._data_version_expires = 0.0
+
+
+def make_client(node_rows, edge_rows, delay=0.0):
+    """Build a Supabase client mock answering the node and edge queries.
+
+    The network_snapshot RPC is reported as not deployed, so the route falls
+    back to the table queries.
+    """
+    in_flight = {"now": 0, "max": 0}
+
+    def make_execute(rows):
+        async def execute():
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(delay)
+            in_flight["now"] -= 1
+            return MagicMock(data=rows)
+
+        return execute
+
+    nodes = MagicMock()
+    nodes.select.return_value.eq.return_value.execute = AsyncMock(
+        side_effect=make_execute(node_rows)
+    )
+    edges = MagicMock()
+    edges.select.return_value.gte.return_value.order.return_value.execute = AsyncMock(
+        side_effect=make_execute(edge_rows)
+    )
+
+    client = MagicMock()
+    client.rpc.return_value.execute = AsyncMock(
+        side_effect=APIError(
+            {"code": dependencies._RPC_NOT_FOUND, "message": "missing"}
+        )
+    )
+    client.table.side_effect = lambda name: nodes if name == "diseases" else edges
+    return client, in_flight
+
+
+def make_rpc_client(snapshot):
+    """Build a Supabase client mock answering the network_snapshot RPC."""
+    client = MagicMock()
+    client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=snapshot))
+    return client
+
+
+class TestNetworkTransforms:
+    """Tests for turning PostgREST rows into network models."""
+
+    def test_node_rows_validate_directly(self):
+        """Node rows should map onto NetworkNode without renaming."""
+        rows = [
+            {
+                "id": 1,
+                "icd_code": "E11",
+                "name_english": "Diabetes",
+                "vector_x": 1,
+                "vector_y": 0.5,
+                "vector_z": None,
+            }
+        ]
+
+        nodes = _NODE_LIST_ADAPTER.validate_python(rows)
+
+        assert nodes[0].icd_code == "E11"
+        assert nodes[0].vector_x == 1.0
+        assert nodes[0].name_german is None
+
+    def test_edge_fields_flatten_embedded_diseases(self):
+        """Embedded disease columns should become source/target fields."""
+        row = {
+            "source": 1,
+            "target": 2,
+            "odds_ratio": 2.5,
+            "p_value": 0.01,
+            "disease_1": {"icd_code": "E11", "name_english": "Diabetes"},
+            "disease_2": {"icd_code": "I10", "name_english": "Hypertension"},
+        }
+
+        edge = _EDGE_LIST_ADAPTER.validate_python([_edge_fields(row)])[0]
+
+        assert (edge.source, edge.target) == (1, 2)
+        assert (edge.source_icd, edge.target_icd) == ("E11", "I10")
+        assert edge.target_name == "Hypertension"
+        assert edge.relationship_strength is None
+
+    def test_edges_are_slotted(self):
+        """Edges should carry no per-instance __dict__ and keep field order."""
+        row = {"source": 1, "target": 2, "odds_ratio": 2.0}
+
+        edge = _EDGE_LIST_ADAPTER.validate_python([_edge_fields(row)])[0]
+
+        assert not hasattr(edge, "__dict__")
+        assert list(json.loads(to_json(edge))) == [
+            "source",
+            "target",
+            "source_icd",
+            "target_icd",
+            "source_name",
+            "target_name",
+            "odds_ratio",
+            "p_value",
+            "relationship_strength",
+            "patient_count_total",
+        ]
+
+    def test_edge_fields_tolerate_missing_embed(self):
+        """A missing embedded disease should give an empty ICD code."""
+        row = {"source": 1, "target": 2, "odds_ratio": 2.0}
+
+        edge = _EDGE_LIST_ADAPTER.validate_python([_edge_fields(row)])[0]
+
+        assert edge.source_icd == ""
+        assert edge.source_name is None
+
+
+class TestGetNetwork:
+    """Tests for the get_network route body."""
+
+    def call(self, client):
+        # Unwrap the cache and rate limit decorators to call the route body
+        route = network.get_network.__wrapped__.__wrapped__
+        return asyncio.run(
+            route(
+                request=MagicMock(),
+                min_odds_ratio=1.5,
+                max_edges=None,
+                chapter_filter=None,
+                client=client,
+            )
+        )
+
+    def test_queries_run_concurrently(self):
+        """Node and edge queries should be in flight at the same time."""
+        client, in_flight = make_client(
+            [{"id": 1, "icd_code": "E11"}],
+            [{"source": 1, "target": 2, "odds_ratio": 2.0}],
+            delay=0.01,
+        )
+
+        result = self.call(client)
+
+        assert in_flight["max"] == 2
+        assert result.metadata.total_nodes == 1
+        assert result.metadata.total_edges == 1
+
+    def test_no_nodes_returns_empty_network(self):
+        """Edges should be dropped when no nodes match."""
+        client, _ = make_client([], [{"source": 1, "target": 2, "odds_ratio": 2.0}])
+
+        result = self.call(client)
+
+        assert result.nodes == [] and result.edges == []
+        assert result.metadata.total_edges == 0
+
+    def test_snapshot_rpc_serves_nodes_and_edges(self):
+        """One RPC call should provide both nodes and flattened edges."""
+        client = make_rpc_client(
+            {
+                "nodes": [{"id": 1, "icd_code": "E11"}, {"id": 2, "icd_code": "I10"}],
+                "edges": [
+                    {
+                        "source": 1,
+                        "target": 2,
+                        "source_icd": "E11",
+                        "target_icd": "I10",
+                        "odds_ratio": 2.0,
+                    }
+                ],
+            }
+        )
+
+        result = self.call(client)
+
+        client.rpc.assert_called_once_with(
+            "network_snapshot",
+            {"min_odds_ratio": 1.5, "max_edges": None, "chapter": None},
+        )
+        client.table.assert_not_called()
+        assert result.metadata.total_nodes == 2
+        assert result.edges[0].target_icd == "I10"
+
+    def test_missing_rpc_falls_back_once(self):
+        """After PGRST202 the RPC should not be retried on later requests."""
+        client, _ = make_client([{"id": 1, "icd_code": "E11"}], [])
+
+        self.call(client)
+        self.call(client)
+
+        assert "network_snapshot" in dependencies._missing_rpcs
+        client.rpc.assert_called_once()
+
+    def test_other_rpc_errors_propagate(self):
+        """Errors other than a missing function should not be swallowed."""
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "57014", "message": "timeout"})
+        )
+
+        with pytest.raises(APIError):
+            self.call(client)
+
+        assert "network_snapshot" not in dependencies._missing_rpcs
+
+
+class TestNetworkDataVersion:
+    """Tests for _network_data_version."""
+
+    def call(self, client):
+        with patch.object(network, "get_db", AsyncMock(return_value=client)):
+            return asyncio.run(network._network_data_version(MagicMock()))
+
+    def test_version_reused_within_ttl(self):
+        """The version should be read at most once per _DATA_VERSION_TTL."""
+        client = MagicMock()
+        execute = AsyncMock(return_value=MagicMock(data="2026-01-01T00:00:00+00:00"))
+        client.rpc.return_value.execute = execute
+
+        first = self.call(client)
+        second = self.call(client)
+
+        assert first == second == "2026-01-01T00:00:00+00:00"
+        client.rpc.assert_called_with("network_data_version", {})
+        execute.assert_awaited_once()
+
+    def test_missing_rpc_disables_versioning(self):
+        """Without migration 006 the version should be unknown, not an error."""
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": dependencies._RPC_NOT_FOUND, "message": "x"})
+        )
+
+        assert self.call(client) is None
+        assert self.call(client) is None
+        client.rpc.assert_called_once()
+
+    def test_read_failure_returns_none_and_backs_off(self):
+        """A failed read should not raise, and should not be retried at once."""
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=httpx.ConnectError("connection refused")
+        )
+
+        assert self.call(client) is None
+        assert self.call(client) is None
+        client.rpc.assert_called_once()
+
+    def test_concurrent_expiry_shares_one_refresh(self):
+        """Requests arriving while the version refreshes should wait for it."""
+        client = MagicMock()
+
+        async def execute():
+            await asyncio.sleep(0.01)
+            return MagicMock(data=7)
+
+        client.rpc.return_value.execute = AsyncMock(side_effect=execute)
+
+        async def run():
+            return await asyncio.gather(
+                *(network._network_data_version(MagicMock()) for _ in range(5))
+            )
+
+        with patch.object(network, "get_db", AsyncMock(return_value=client)):
+            versions = asyncio.run(run())
+
+        assert versions == ["7"] * 5
+        client.rpc.assert_called_once()
+
+    def test_cached_entry_served_when_version_read_fails(self):
+        """A database hiccup on the version read should still serve the cache."""
+        route = cache_response(
+            "test_network_version_failure",
+            ttl_seconds=3600,
+            data_version=network._network_data_version,
+        )(network.get_network.__wrapped__.__wrapped__)
+        snapshot_client = make_rpc_client(
+            {"nodes": [{"id": 1, "icd_code": "E11"}], "edges": []}
+        )
+        version_client = MagicMock()
+        version_client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=1)
+        )
+
+        request = MagicMock(spec=Request)
+        request.url.path = "/api/network"
+        request.query_params = {}
+        request.headers = {}
+
+        def call():
+            return asyncio.run(
+                route(
+                    request=request,
+                    min_odds_ratio=1.5,
+                    max_edges=None,
+                    chapter_filter=None,
+                    client=snapshot_client,
+                )
+            )
+
+        with patch.object(network, "get_db", AsyncMock(return_value=version_client)):
+            assert call().headers["X-Cache"] == "MISS"
+
+            # The version expires and the next read fails
+            network._data_version_expires = 0.0
+            version_client.rpc.return_value.execute.side_effect = httpx.ReadTimeout(
+                "timed out"
+            )
+            response = call()
+
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "HIT"
@@ -11,6 +11,7 @@ from fastapi import Request
 from slowapi.errors import RateLimitExceeded
 
 from api.rate_limit import (
+    _settings,
     custom_rate_limit_handler,
     get_rate_limit_string,
     get_client_ip_for_rate_limit,
@@ -39,6 +40,12 @@ class TestRateLimitString:
         result = get_rate_limit_string()
         assert "100" in result
 
+    def test_constant_matches_settings(self):
+        """The shared constant should equal the settings-derived string."""
+        from api.rate_limit import RATE_LIMIT_STRING
+
+        assert RATE_LIMIT_STRING == get_rate_limit_string()
+
 
 class TestCustomRateLimitHandler:
     """Tests for custom_rate_limit_handler function."""
@@ -50,9 +57,7 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 60
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         assert response.status_code == 429
 
@@ -63,9 +68,7 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 120
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         body = json.loads(response.body)
 
@@ -81,9 +84,7 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 60
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         assert "Retry-After" in response.headers
         assert "X-RateLimit-Limit" in response.headers
@@ -97,9 +98,7 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 30  # 30 seconds
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         assert response.headers["Retry-After"] == "30"
 
@@ -110,13 +109,11 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 60
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         body = json.loads(response.body)
 
-        assert "100" in body["error"]["message"]
+        assert str(_settings.api_rate_limit) in body["error"]["message"]
         assert "minute" in body["error"]["message"]
 
     @pytest.mark.asyncio
@@ -126,17 +123,47 @@ class TestCustomRateLimitHandler:
         mock_exc = MagicMock(spec=RateLimitExceeded)
         mock_exc.retry_after = 60
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.api_rate_limit = 100
-            response = await custom_rate_limit_handler(mock_request, mock_exc)
+        response = await custom_rate_limit_handler(mock_request, mock_exc)
 
         body = json.loads(response.body)
 
         assert body["error"]["details"]["period"] == "minute"
-        assert body["error"]["details"]["limit"] == 100
+        assert body["error"]["details"]["limit"] == _settings.api_rate_limit
         assert body["error"]["details"]["retry_after_seconds"] == 60
 
 
+class TestRetryAfterFromWindow:
+    """Tests for Retry-After derived from the exceeded limit's window."""
+
+    @pytest.mark.asyncio
+    async def test_retry_after_from_window_stats(self):
+        """Retry-After should reflect when the moving window frees a slot."""
+        from limits import parse
+
+        item = parse("2/minute")
+        args = ["rl", "10.0.0.99", "test_retry_after_window"]
+        limiter.limiter.clear(item, *args)
+        assert limiter.limiter.hit(item, *args)
+        assert limiter.limiter.hit(item, *args)
+
+        request = make_request(client_host="10.0.0.99")
+        request.state.view_rate_limit = (item, args)
+        mock_exc = MagicMock(spec=RateLimitExceeded)
+
+        try:
+            response = await custom_rate_limit_handler(request, mock_exc)
+        finally:
+            limiter.limiter.clear(item, *args)
+
+        retry_after = int(response.headers["Retry-After"])
+        assert 1 <= retry_after <= 60
+        assert (
+            json.loads(response.body)["error"]["details"]["retry_after_seconds"]
+            == retry_after
+        )
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
 class TestLimiterConfiguration:
     """Tests for limiter configuration."""
 
@@ -154,86 +181,125 @@ class TestLimiterConfiguration:
         assert limiter._key_func is not None
         assert limiter._key_func == get_client_ip_for_rate_limit
 
+    def test_limiter_uses_moving_window(self):
+        """Limiter should default to the moving-window strategy."""
+        assert limiter._strategy == "moving-window"
+
+    def test_every_router_endpoint_is_rate_limited(self):
+        """Each route in the API routers should carry a rate limit or be exempt."""
+        from fastapi.routing import APIRoute
+
+        from api.routes import calculate, chapters, diseases, health, network
+
+        for module in (calculate, chapters, diseases, health, network):
+            for route in module.router.routes:
+                if not isinstance(route, APIRoute):
+                    continue
+                name = f"{route.endpoint.__module__}.{route.endpoint.__name__}"
+                assert (
+                    name in limiter._route_limits or name in limiter._exempt_routes
+                ), f"{route.path} is unlimited"
+
+    def test_only_probes_are_exempt(self):
+        """Readiness and liveness probes are the only exempt routes."""
+        import api.routes.health  # noqa: F401 - registers the exemptions
+
+        exempt = {n for n in limiter._exempt_routes if n.startswith("api.routes.")}
+
+        assert exempt == {
+            "api.routes.health.readiness_check",
+            "api.routes.health.liveness_check",
+        }
+
+    def test_route_limits_are_parsed_once(self):
+        """Route limits should be static, so slowapi parses them at import."""
+        import api.routes.calculate  # noqa: F401
+        import api.routes.diseases  # noqa: F401
+
+        assert "api.routes.diseases.list_diseases" in limiter._route_limits
+        assert not any(
+            name.startswith("api.routes.") for name in limiter._dynamic_route_limits
+        )
+
+    def test_calculate_risk_costs_more_than_reads(self):
+        """Risk calculations should spend the configured cost per call."""
+        import api.routes.calculate  # noqa: F401 - registers the route limit
+        from api.config import get_settings
+
+        limits = limiter._route_limits["api.routes.calculate.calculate_risk"]
+
+        assert limits[0].cost == get_settings().rate_limit_calculate_cost
+
+    def test_memory_storage_has_no_fallback(self):
+        """In-memory fallback only applies when counters live in shared storage."""
+        assert limiter._storage_uri == "memory://"
+        assert limiter._in_memory_fallback_enabled is False
+
+
+def make_request(
+    client_host: str | None = "192.168.1.100",
+    forwarded_for: str | None = None,
+) -> Request:
+    """Build a request from a minimal ASGI scope."""
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode("latin-1")))
+    return Request(
+        {
+            "type": "http",
+            "headers": headers,
+            "client": (client_host, 50000) if client_host else None,
+        }
+    )
+
 
 class TestGetClientIpForRateLimit:
     """Tests for get_client_ip_for_rate_limit function."""
 
+    @staticmethod
+    def get_ip(request: Request, trust_proxy: bool) -> str:
+        """Run get_client_ip_for_rate_limit with a patched trust_proxy setting."""
+        with patch("api.rate_limit._settings") as mock_settings:
+            mock_settings.trust_proxy = trust_proxy
+            return get_client_ip_for_rate_limit(request)
+
     def test_returns_direct_client_ip_when_trust_proxy_false(self):
         """Should return direct client IP when trust_proxy is False."""
-        mock_request = MagicMock()
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {"X-Forwarded-For": "10.0.0.1"}
-
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = get_client_ip_for_rate_limit(mock_request)
+        request = make_request(forwarded_for="10.0.0.1")
 
         # Should ignore X-Forwarded-For and use direct client
-        assert result == "192.168.1.100"
+        assert self.get_ip(request, trust_proxy=False) == "192.168.1.100"
 
     def test_uses_x_forwarded_for_when_trust_proxy_true(self):
         """Should use X-Forwarded-For when trust_proxy is True."""
-        mock_request = MagicMock()
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {"X-Forwarded-For": "203.0.113.50, 70.41.3.18"}
-
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = get_client_ip_for_rate_limit(mock_request)
+        request = make_request(forwarded_for="203.0.113.50, 70.41.3.18")
 
         # Should use first IP from X-Forwarded-For
-        assert result == "203.0.113.50"
+        assert self.get_ip(request, trust_proxy=True) == "203.0.113.50"
 
     def test_handles_single_x_forwarded_for_ip(self):
         """Should handle single IP in X-Forwarded-For header."""
-        mock_request = MagicMock()
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {"X-Forwarded-For": "203.0.113.100"}
-
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = get_client_ip_for_rate_limit(mock_request)
+        request = make_request(forwarded_for="203.0.113.100")
 
-        assert result == "203.0.113.100"
+        assert self.get_ip(request, trust_proxy=True) == "203.0.113.100"
 
     def test_strips_whitespace_from_forwarded_ip(self):
         """Should strip whitespace from X-Forwarded-For IP."""
-        mock_request = MagicMock()
-        mock_request.headers = {"X-Forwarded-For": "  203.0.113.100  , 10.0.0.1"}
+        request = make_request(forwarded_for="  203.0.113.100  , 10.0.0.1")
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = get_client_ip_for_rate_limit(mock_request)
-
-        assert result == "203.0.113.100"
+        assert self.get_ip(request, trust_proxy=True) == "203.0.113.100"
 
     def test_returns_direct_ip_when_no_forwarded_header(self):
         """Should use client IP when no X-Forwarded-For header present."""
-        mock_request = MagicMock()
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {}
-
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = get_client_ip_for_rate_limit(mock_request)
+        request = make_request()
 
-        assert result == "192.168.1.100"
+        assert self.get_ip(request, trust_proxy=True) == "192.168.1.100"
 
     def test_returns_unknown_when_no_client(self):
         """Should return 'unknown' when client info is not available."""
-        mock_request = MagicMock()
-        mock_request.client = None
-        mock_request.headers = {}
-
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = get_client_ip_for_rate_limit(mock_request)
+        request = make_request(client_host=None)
 
-        assert result == "unknown"
+        assert self.get_ip(request, trust_proxy=False) == "unknown"
 
     def test_spoofing_prevented_when_trust_proxy_false(self):
         """Should prevent IP spoofing by ignoring X-Forwarded-For when trust_proxy is False.
@@ -241,14 +307,9 @@ class TestGetClientIpForRateLimit:
         This is a security-critical test. When trust_proxy is False, malicious clients
         cannot bypass rate limiting by setting a fake X-Forwarded-For header.
         """
-        mock_request = MagicMock()
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"  # Real IP
-        mock_request.headers = {"X-Forwarded-For": "fake.ip.address"}  # Spoofed
+        request = make_request(forwarded_for="fake.ip.address")  # Spoofed
 
-        with patch("api.rate_limit.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = get_client_ip_for_rate_limit(mock_request)
+        result = self.get_ip(request, trust_proxy=False)
 
         # Must use real client IP, not spoofed header
         assert result == "192.168.1.100"
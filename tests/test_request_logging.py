@@ -6,70 +6,86 @@ Tests the RequestLoggingMiddleware for proper logging and timing headers.
 
 import logging
 import pytest
-from unittest.mock import MagicMock, patch
-from starlette.requests import Request
+from unittest.mock import patch
 from starlette.responses import Response
 
 from api.middleware.request_logging import RequestLoggingMiddleware
 
 
-class TestRequestLoggingMiddleware:
-    """Tests for RequestLoggingMiddleware class."""
+def make_scope(
+    method: str = "GET",
+    path: str = "/test",
+    client: tuple | None = ("127.0.0.1", 50000),
+    headers: list | None = None,
+) -> dict:
+    """Build a minimal ASGI HTTP scope."""
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers or [],
+        "client": client,
+        "query_string": b"",
+    }
 
-    @pytest.mark.asyncio
-    async def test_adds_response_time_header(self):
-        """Middleware should add X-Response-Time header to responses."""
 
-        async def mock_app(scope, receive, send):
-            response = Response(content="OK", status_code=200)
-            await response(scope, receive, send)
+async def run_middleware(scope: dict, status_code: int = 200) -> list[dict]:
+    """Run the middleware around a simple app and capture sent messages."""
 
-        middleware = RequestLoggingMiddleware(mock_app)
+    async def app(scope, receive, send):
+        response = Response(content="OK", status_code=status_code)
+        await response(scope, receive, send)
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "GET"
-        mock_request.url.path = "/test"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "127.0.0.1"
-        mock_request.headers = {}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
 
-        mock_response = Response(content="OK", status_code=200)
+    messages = []
 
-        async def mock_call_next(request):
-            return mock_response
+    async def send(message):
+        messages.append(message)
 
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            response = await middleware.dispatch(mock_request, mock_call_next)
+    with patch("api.middleware.request_logging.get_runtime_settings") as mock_settings:
+        mock_settings.return_value.trust_proxy = False
+        middleware = RequestLoggingMiddleware(app)
 
-        assert "X-Response-Time" in response.headers
-        assert "ms" in response.headers["X-Response-Time"]
+    await middleware(scope, receive, send)
 
-    @pytest.mark.asyncio
-    async def test_logs_request_info(self, caplog):
-        """Middleware should log request method and path."""
+    return messages
 
-        async def mock_app(scope, receive, send):
-            pass
 
-        middleware = RequestLoggingMiddleware(mock_app)
+def response_headers(messages: list[dict]) -> dict[str, str]:
+    """Extract decoded response headers from captured ASGI messages."""
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return {k.decode(): v.decode() for k, v in start["headers"]}
+
+
+class TestRequestLoggingMiddleware:
+    """Tests for RequestLoggingMiddleware class."""
+
+    @pytest.mark.asyncio
+    async def test_adds_response_time_header(self):
+        """Middleware should add X-Response-Time header to responses."""
+        messages = await run_middleware(make_scope())
+
+        headers = response_headers(messages)
+        assert "x-response-time" in headers
+        assert "ms" in headers["x-response-time"]
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "POST"
-        mock_request.url.path = "/api/diseases"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.1"
-        mock_request.headers = {}
+    @pytest.mark.asyncio
+    async def test_preserves_response_body(self):
+        """Middleware should pass the response body through unchanged."""
+        messages = await run_middleware(make_scope())
 
-        mock_response = Response(content="OK", status_code=200)
+        body = b"".join(m.get("body", b"") for m in messages)
+        assert body == b"OK"
 
-        async def mock_call_next(request):
-            return mock_response
+    @pytest.mark.asyncio
+    async def test_logs_request_info(self, caplog):
+        """Middleware should log request method and path."""
+        scope = make_scope(method="POST", path="/api/diseases")
 
         with caplog.at_level(logging.INFO, logger="api.request_logging"):
-            with patch("api.middleware.request_logging.get_settings") as mock_settings:
-                mock_settings.return_value.trust_proxy = False
-                await middleware.dispatch(mock_request, mock_call_next)
+            await run_middleware(scope)
 
         log_messages = [record.message for record in caplog.records]
         request_logged = any(
@@ -80,28 +96,10 @@ class TestRequestLoggingMiddleware:
     @pytest.mark.asyncio
     async def test_logs_response_status(self, caplog):
         """Middleware should log response status code."""
-
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "GET"
-        mock_request.url.path = "/api/health"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "10.0.0.1"
-        mock_request.headers = {}
-
-        mock_response = Response(content="OK", status_code=201)
-
-        async def mock_call_next(request):
-            return mock_response
+        scope = make_scope(path="/api/health", client=("10.0.0.1", 50000))
 
         with caplog.at_level(logging.INFO, logger="api.request_logging"):
-            with patch("api.middleware.request_logging.get_settings") as mock_settings:
-                mock_settings.return_value.trust_proxy = False
-                await middleware.dispatch(mock_request, mock_call_next)
+            await run_middleware(scope, status_code=201)
 
         log_messages = [record.message for record in caplog.records]
         response_logged = any("201" in msg for msg in log_messages)
@@ -110,147 +108,118 @@ class TestRequestLoggingMiddleware:
     @pytest.mark.asyncio
     async def test_logs_response_time(self, caplog):
         """Middleware should log response time in ms."""
+        with caplog.at_level(logging.INFO, logger="api.request_logging"):
+            await run_middleware(make_scope(path="/api/test"))
 
-        async def mock_app(scope, receive, send):
-            pass
+        log_messages = [record.message for record in caplog.records]
+        # Response log should contain "ms" for milliseconds
+        response_logged = any("ms" in msg for msg in log_messages)
+        assert response_logged
 
-        middleware = RequestLoggingMiddleware(mock_app)
+    @pytest.mark.asyncio
+    async def test_logs_single_record_per_request(self, caplog):
+        """Middleware should emit one combined record including the client IP."""
+        scope = make_scope(path="/api/network", client=("10.0.0.7", 50000))
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "GET"
-        mock_request.url.path = "/api/test"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "127.0.0.1"
-        mock_request.headers = {}
+        with caplog.at_level(logging.INFO, logger="api.request_logging"):
+            await run_middleware(scope)
 
-        mock_response = Response(content="OK", status_code=200)
+        assert len(caplog.records) == 1
+        message = caplog.records[0].getMessage()
+        assert "GET /api/network - 200" in message
+        assert "IP: 10.0.0.7" in message
 
-        async def mock_call_next(request):
-            return mock_response
+    @pytest.mark.asyncio
+    async def test_attaches_structured_fields(self, caplog):
+        """Request fields should be attached to the record for JSON output."""
+        scope = make_scope(method="POST", path="/api/calculate-risk")
 
         with caplog.at_level(logging.INFO, logger="api.request_logging"):
-            with patch("api.middleware.request_logging.get_settings") as mock_settings:
-                mock_settings.return_value.trust_proxy = False
-                await middleware.dispatch(mock_request, mock_call_next)
+            await run_middleware(scope, status_code=201)
 
-        log_messages = [record.message for record in caplog.records]
-        # Response log should contain "ms" for milliseconds
-        response_logged = any("ms" in msg for msg in log_messages)
-        assert response_logged
+        record = caplog.records[0]
+        assert record.method == "POST"
+        assert record.path == "/api/calculate-risk"
+        assert record.status == 201
+        assert record.client_ip == "127.0.0.1"
+        assert record.duration_ms >= 0
+
+    @pytest.mark.asyncio
+    async def test_passes_through_non_http_scopes(self):
+        """Non-HTTP scopes (e.g. lifespan) should be forwarded untouched."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        middleware = RequestLoggingMiddleware(app)
+        await middleware({"type": "lifespan"}, None, None)
+
+        assert seen == ["lifespan"]
 
 
 class TestGetClientIP:
     """Tests for _get_client_ip method."""
 
-    def test_returns_direct_client_ip_when_trust_proxy_false(self):
-        """Should return direct client IP when trust_proxy is False."""
+    @staticmethod
+    def get_client_ip(scope: dict, trust_proxy: bool) -> str:
+        """Run _get_client_ip with a patched trust_proxy setting."""
 
         async def mock_app(scope, receive, send):
             pass
 
-        middleware = RequestLoggingMiddleware(mock_app)
+        with patch(
+            "api.middleware.request_logging.get_runtime_settings"
+        ) as mock_settings:
+            mock_settings.return_value.trust_proxy = trust_proxy
+            middleware = RequestLoggingMiddleware(mock_app)
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {"X-Forwarded-For": "10.0.0.1"}
+        return middleware._get_client_ip(scope)
 
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = middleware._get_client_ip(mock_request)
+    def test_returns_direct_client_ip_when_trust_proxy_false(self):
+        """Should return direct client IP when trust_proxy is False."""
+        scope = make_scope(
+            client=("192.168.1.100", 50000),
+            headers=[(b"x-forwarded-for", b"10.0.0.1")],
+        )
 
         # Should ignore X-Forwarded-For and return direct client
-        assert result == "192.168.1.100"
+        assert self.get_client_ip(scope, trust_proxy=False) == "192.168.1.100"
 
     def test_respects_x_forwarded_for_header_when_trust_proxy_true(self):
         """Should use X-Forwarded-For header when trust_proxy is True."""
+        scope = make_scope(
+            client=("10.0.0.1", 50000),
+            headers=[(b"x-forwarded-for", b"203.0.113.50, 70.41.3.18")],
+        )
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.client = MagicMock()
-        mock_request.client.host = "10.0.0.1"
-        mock_request.headers = {"X-Forwarded-For": "203.0.113.50, 70.41.3.18"}
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = middleware._get_client_ip(mock_request)
-
-        assert result == "203.0.113.50"
+        assert self.get_client_ip(scope, trust_proxy=True) == "203.0.113.50"
 
     def test_handles_single_x_forwarded_for(self):
         """Should handle single IP in X-Forwarded-For when trust_proxy is True."""
+        scope = make_scope(headers=[(b"x-forwarded-for", b"203.0.113.100")])
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.headers = {"X-Forwarded-For": "203.0.113.100"}
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = middleware._get_client_ip(mock_request)
-
-        assert result == "203.0.113.100"
+        assert self.get_client_ip(scope, trust_proxy=True) == "203.0.113.100"
 
     def test_returns_unknown_when_no_client(self):
         """Should return 'unknown' when client info is not available."""
+        scope = make_scope(client=None)
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.client = None
-        mock_request.headers = {}
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = middleware._get_client_ip(mock_request)
-
-        assert result == "unknown"
+        assert self.get_client_ip(scope, trust_proxy=False) == "unknown"
 
     def test_strips_whitespace_from_x_forwarded_for(self):
         """Should strip whitespace from X-Forwarded-For IP when trust_proxy is True."""
+        scope = make_scope(
+            headers=[(b"x-forwarded-for", b"  203.0.113.100  , 10.0.0.1")]
+        )
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.headers = {"X-Forwarded-For": "  203.0.113.100  , 10.0.0.1"}
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = middleware._get_client_ip(mock_request)
-
-        assert result == "203.0.113.100"
+        assert self.get_client_ip(scope, trust_proxy=True) == "203.0.113.100"
 
     def test_falls_back_to_direct_ip_when_no_forwarded_header(self):
         """Should use direct client IP when no X-Forwarded-For header present."""
+        scope = make_scope(client=("192.168.1.100", 50000))
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"
-        mock_request.headers = {}
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = True
-            result = middleware._get_client_ip(mock_request)
-
-        assert result == "192.168.1.100"
+        assert self.get_client_ip(scope, trust_proxy=True) == "192.168.1.100"
 
     def test_spoofing_prevented_when_trust_proxy_false(self):
         """Should prevent IP spoofing by ignoring X-Forwarded-For when trust_proxy is False.
@@ -258,20 +227,12 @@ class TestGetClientIP:
         This is a security-critical test. When trust_proxy is False, malicious clients
         cannot spoof their IP by setting a fake X-Forwarded-For header.
         """
+        scope = make_scope(
+            client=("192.168.1.100", 50000),  # Real IP
+            headers=[(b"x-forwarded-for", b"spoofed.ip.address")],  # Spoofed
+        )
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.client = MagicMock()
-        mock_request.client.host = "192.168.1.100"  # Real IP
-        mock_request.headers = {"X-Forwarded-For": "spoofed.ip.address"}  # Spoofed
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            result = middleware._get_client_ip(mock_request)
+        result = self.get_client_ip(scope, trust_proxy=False)
 
         # Must use real client IP, not spoofed header
         assert result == "192.168.1.100"
@@ -284,29 +245,9 @@ class TestResponseTimeHeader:
     @pytest.mark.asyncio
     async def test_response_time_format(self):
         """X-Response-Time should be in format like '0.12ms'."""
+        messages = await run_middleware(make_scope())
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "GET"
-        mock_request.url.path = "/test"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "127.0.0.1"
-        mock_request.headers = {}
-
-        mock_response = Response(content="OK", status_code=200)
-
-        async def mock_call_next(request):
-            return mock_response
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            response = await middleware.dispatch(mock_request, mock_call_next)
-
-        timing = response.headers["X-Response-Time"]
+        timing = response_headers(messages)["x-response-time"]
         # Should end with "ms"
         assert timing.endswith("ms")
         # Should be parseable as float (without ms suffix)
@@ -316,28 +257,8 @@ class TestResponseTimeHeader:
     @pytest.mark.asyncio
     async def test_response_time_is_positive(self):
         """Response time should be a positive number."""
+        messages = await run_middleware(make_scope())
 
-        async def mock_app(scope, receive, send):
-            pass
-
-        middleware = RequestLoggingMiddleware(mock_app)
-
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "GET"
-        mock_request.url.path = "/test"
-        mock_request.client = MagicMock()
-        mock_request.client.host = "127.0.0.1"
-        mock_request.headers = {}
-
-        mock_response = Response(content="OK", status_code=200)
-
-        async def mock_call_next(request):
-            return mock_response
-
-        with patch("api.middleware.request_logging.get_settings") as mock_settings:
-            mock_settings.return_value.trust_proxy = False
-            response = await middleware.dispatch(mock_request, mock_call_next)
-
-        timing = response.headers["X-Response-Time"]
+        timing = response_headers(messages)["x-response-time"]
         numeric_value = float(timing.replace("ms", ""))
         assert numeric_value >= 0
@@ -0,0 +1,73 @@
+"""
+Tests for orjson-backed response classes.
+
+Tests ORJSONResponse rendering and the pre-serialized JSON helpers.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_db
+from api.rate_limit import limiter
+from api.responses import ORJSONResponse, json_bytes_response, prerender_json
+from api.routes import diseases
+
+
+class TestORJSONResponse:
+    """Tests for ORJSONResponse rendering."""
+
+    def test_renders_compact_json(self):
+        """Body should be compact JSON bytes."""
+        response = ORJSONResponse({"name": "test", "count": 3})
+        assert response.body == b'{"name":"test","count":3}'
+        assert response.media_type == "application/json"
+
+    def test_renders_non_string_keys(self):
+        """Integer dict keys should be serialized as strings."""
+        response = ORJSONResponse({1: "a"})
+        assert json.loads(response.body) == {"1": "a"}
+
+
+class TestPrerenderedJson:
+    """Tests for pre-serialized JSON payload helpers."""
+
+    def test_prerender_matches_json(self):
+        """Pre-rendered bytes should round-trip to the original payload."""
+        payload = {"status": "operational", "documentation": None}
+        assert json.loads(prerender_json(payload)) == payload
+
+    def test_bytes_response_passthrough(self):
+        """Bytes response should reuse the body without re-encoding."""
+        body = prerender_json({"status": "ok"})
+        response = json_bytes_response(body, status_code=503)
+        assert response.body is body
+        assert response.status_code == 503
+        assert response.media_type == "application/json"
+
+
+class TestDefaultResponseClass:
+    """Tests for the application-wide orjson response class."""
+
+    def test_router_list_endpoint_renders_with_orjson(self):
+        """Uncached list endpoints should inherit ORJSONResponse from the app."""
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": 1, "icd_code": "E11"}])
+        )
+
+        app = FastAPI(default_response_class=ORJSONResponse)
+        app.state.limiter = limiter
+        app.include_router(diseases.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: client
+
+        with patch.object(
+            ORJSONResponse, "render", autospec=True, side_effect=ORJSONResponse.render
+        ) as render:
+            response = TestClient(app).get("/api/diseases/search/diabetes")
+
+        assert response.status_code == 200
+        assert response.json()[0]["icd_code"] == "E11"
+        render.assert_called_once()
@@ -88,6 +88,32 @@ class TestRiskCalculationRequest:
                 smoking=False,
             )
 
+    def test_malformed_icd_codes_rejected(self):
+        """Codes with characters outside letters, digits and dots are rejected."""
+        for code in ["E11,I10", "1E1", "E 11", "E11)"]:
+            with pytest.raises(ValueError, match="Invalid ICD code"):
+                RiskCalculationRequest(
+                    age=45,
+                    gender="male",
+                    bmi=25.0,
+                    existing_conditions=[code],
+                    exercise_level="moderate",
+                    smoking=False,
+                )
+
+    def test_duplicate_conditions_removed(self):
+        """Repeated codes should be kept once, in their original order."""
+        request = RiskCalculationRequest(
+            age=45,
+            gender="male",
+            bmi=25.0,
+            existing_conditions=["I10", "E11", "I10", "E11.9"],
+            exercise_level="moderate",
+            smoking=False,
+        )
+
+        assert request.existing_conditions == ["I10", "E11", "E11.9"]
+
     def test_too_many_conditions(self):
         """Test max conditions limit."""
         with pytest.raises(ValueError):
@@ -101,6 +127,56 @@ class TestRiskCalculationRequest:
             )
 
 
+class TestSchemaExports:
+    """Tests for the api.schemas package exports."""
+
+    def test_each_schema_defined_once(self):
+        """Every exported schema should come from exactly one schema module."""
+        import importlib
+
+        import api.schemas as schemas
+
+        modules = [
+            importlib.import_module(f"api.schemas.{name}")
+            for name in ("calculate", "diseases", "network")
+        ]
+
+        for name in schemas.__all__:
+            defining = [
+                m
+                for m in modules
+                if getattr(vars(m).get(name), "__module__", None) == m.__name__
+            ]
+            assert len(defining) == 1, f"{name} defined in {len(defining)} modules"
+            assert getattr(schemas, name) is getattr(defining[0], name)
+
+    def test_no_class_redefined_within_module(self):
+        """A second definition would silently shadow the first, examples and all."""
+        import ast
+        import importlib
+        import inspect
+
+        for name in ("calculate", "diseases", "network"):
+            module = importlib.import_module(f"api.schemas.{name}")
+            tree = ast.parse(inspect.getsource(module))
+            classes = [n.name for n in tree.body if isinstance(n, ast.ClassDef)]
+            assert len(classes) == len(set(classes)), f"duplicate class in {name}"
+
+    def test_documented_examples_validate(self):
+        """OpenAPI examples should stay valid instances of their models."""
+        from pydantic import TypeAdapter
+
+        import api.schemas as schemas
+
+        for name in schemas.__all__:
+            model = getattr(schemas, name)
+            # BaseModels carry model_config, pydantic dataclasses __pydantic_config__
+            config = getattr(model, "model_config", None) or model.__pydantic_config__
+            example = (config.get("json_schema_extra") or {}).get("example")
+            if example is not None:
+                TypeAdapter(model).validate_python(example)
+
+
 class TestRiskCalculator:
     """Test RiskCalculator service methods."""
 
@@ -0,0 +1,141 @@
+"""
+Tests for background risk calculation jobs.
+
+Tests the RiskJobStore lifecycle, failure reporting and job limits.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api.routes import calculate
+from api.services.risk_jobs import RiskJobStore
+
+
+async def wait_until_finished(store: RiskJobStore) -> None:
+    """Wait for all unfinished jobs in the store."""
+    await asyncio.gather(*store._tasks, return_exceptions=True)
+
+
+class TestRiskJobStore:
+    """Tests for RiskJobStore."""
+
+    @pytest.mark.asyncio
+    async def test_completed_job_holds_result(self):
+        """A finished calculation should be retrievable by job id."""
+        store = RiskJobStore(ttl=60, max_jobs=5)
+        result = object()
+
+        async def calculation():
+            return result
+
+        job = store.submit(calculation)
+        assert job.status == "pending"
+
+        await wait_until_finished(store)
+
+        assert store.get(job.job_id) is job
+        assert job.status == "completed"
+        assert job.result is result
+
+    @pytest.mark.asyncio
+    async def test_validation_error_message_is_kept(self):
+        """ValueErrors should be reported like the synchronous 400 response."""
+        store = RiskJobStore(ttl=60, max_jobs=5)
+
+        async def calculation():
+            raise ValueError("Unknown ICD codes: Z99")
+
+        job = store.submit(calculation)
+        await wait_until_finished(store)
+
+        assert job.status == "failed"
+        assert job.error == "Unknown ICD codes: Z99"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_is_hidden(self):
+        """Other errors should not leak their details to the client."""
+        store = RiskJobStore(ttl=60, max_jobs=5)
+
+        async def calculation():
+            raise RuntimeError("secret connection string")
+
+        job = store.submit(calculation)
+        await wait_until_finished(store)
+
+        assert job.status == "failed"
+        assert job.error == "Failed to calculate risk scores"
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_too_many_unfinished_jobs(self):
+        """Submissions beyond max_jobs unfinished jobs should be refused."""
+        store = RiskJobStore(ttl=60, max_jobs=1)
+        release = asyncio.Event()
+
+        async def calculation():
+            await release.wait()
+
+        assert store.submit(calculation) is not None
+        assert store.submit(calculation) is None
+
+        release.set()
+        await wait_until_finished(store)
+        assert store.submit(calculation) is not None
+        await store.cancel_all()
+
+    @pytest.mark.asyncio
+    async def test_queued_job_stays_pending_until_it_has_a_slot(self):
+        """Jobs waiting for a calculation slot should report pending."""
+        slots = asyncio.Semaphore(1)
+        store = RiskJobStore(ttl=60, max_jobs=5, slots=slots)
+        release = asyncio.Event()
+
+        async def calculation():
+            await release.wait()
+
+        await slots.acquire()
+        job = store.submit(calculation)
+        await asyncio.sleep(0)
+        assert job.status == "pending"
+
+        slots.release()
+        await asyncio.sleep(0)
+        assert job.status == "running"
+
+        release.set()
+        await wait_until_finished(store)
+        assert job.status == "completed"
+
+    def test_unknown_job_returns_none(self):
+        """Unknown job ids should not be found."""
+        store = RiskJobStore(ttl=60, max_jobs=1)
+
+        assert store.get("missing") is None
+
+
+class TestJobRoutesWithSeveralWorkers:
+    """Tests for the job endpoints when more than one worker is configured."""
+
+    @pytest.mark.asyncio
+    async def test_get_job_returns_503(self, monkeypatch):
+        """Polling should be refused rather than 404 on the wrong worker."""
+        monkeypatch.setattr(calculate, "_jobs_available", False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await calculate.get_risk_job.__wrapped__(request=None, job_id="any")
+
+        assert exc_info.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_submit_job_returns_503(self, monkeypatch):
+        """Submissions should be refused before a job is created."""
+        monkeypatch.setattr(calculate, "_jobs_available", False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await calculate.submit_risk_job.__wrapped__(
+                request=None, body=None, client=None
+            )
+
+        assert exc_info.value.status_code == 503
+        assert not calculate.job_store._jobs